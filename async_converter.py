@@ -0,0 +1,102 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Union
+from cache import ConversionCache
+from converter import ConfigConverter, ConversionError, code_version, describe_error
+from imports import has_imports
+
+def _read_bytes(input_path) -> bytes:
+    with open(input_path, 'rb') as f:
+        return f.read()
+
+def _convert_source(source: Union[str, bytes], input_path: Any, engine: str, mode: str,
+                    source_path: Optional[str] = None) -> str:
+    """Конвертация в рабочем процессе; ошибки приходят как ConversionError
+    
+    Импорты разрешаются относительно каталога source_path (абсолютного:
+    текущий каталог процесса пула может отличаться).
+    """
+    return ConfigConverter(engine=engine, mode=mode).convert_source(source, input_path,
+                                                                    source_path=source_path)
+
+class AsyncConfigConverter:
+    """Конвертер для сервисов на asyncio
+    
+    Файлы и кэш читаются в пуле потоков цикла событий, лексический анализ,
+    разбор и генерация выполняются в пуле процессов (или в переданном
+    executor). Число одновременных конвертаций ограничено max_concurrency.
+    Ошибки выбрасываются как ConversionError, процесс не завершается.
+    """
+    
+    def __init__(self, engine: str = 'char', mode: str = 'tomlkit',
+                 cache: Optional[ConversionCache] = None, max_concurrency: Optional[int] = None,
+                 executor: Optional[Executor] = None):
+        # Проверка параметров до первой конвертации
+        converter = ConfigConverter(engine=engine, mode=mode)
+        self.engine = converter.engine
+        self.mode = converter.mode
+        self.cache = cache
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self._executor = executor
+        self._owns_executor = executor is None
+        # Семафор создается в работающем цикле событий
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def convert_string(self, source: str) -> str:
+        """Конвертация строки из учебного языка в TOML"""
+        async with self._limit():
+            return await self._convert(source, '<string>')
+    
+    async def convert_file(self, input_path: Path) -> str:
+        """Конвертация файла; результат берется из кэша, если он задан"""
+        loop = asyncio.get_running_loop()
+        async with self._limit():
+            try:
+                raw = await loop.run_in_executor(None, _read_bytes, input_path)
+            except OSError as e:
+                raise ConversionError(describe_error(e, input_path)) from e
+            
+            source_path = os.path.abspath(input_path)
+            if self.cache is None:
+                return await self._convert(raw, input_path, source_path)
+            # Хэш не учитывает импортированные файлы: такие файлы конвертируются без кэша
+            if await loop.run_in_executor(None, has_imports, raw, self.engine):
+                return await self._convert(raw, input_path, source_path)
+            
+            key = self.cache.key(raw, code_version(), self.mode)
+            toml_output = await loop.run_in_executor(None, self.cache.get, key)
+            if toml_output is None:
+                toml_output = await self._convert(raw, input_path, source_path)
+                await loop.run_in_executor(None, self.cache.put, key, toml_output)
+            return toml_output
+    
+    async def convert_many(self, sources: Iterable[str]) -> List[str]:
+        """Параллельная конвертация строк в пределах max_concurrency"""
+        return list(await asyncio.gather(*(self.convert_string(source) for source in sources)))
+    
+    async def aclose(self):
+        """Остановка собственного пула процессов"""
+        if self._owns_executor and self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+    
+    async def __aenter__(self) -> 'AsyncConfigConverter':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    def _limit(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+    
+    async def _convert(self, source: Union[str, bytes], input_path: Any,
+                       source_path: Optional[str] = None) -> str:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _convert_source, source,
+                                          str(input_path), self.engine, self.mode, source_path)
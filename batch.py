@@ -0,0 +1,88 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from converter import ConfigConverter
+
+class BatchResult:
+    """Итог конвертации одного файла в пакетном режиме"""
+    __slots__ = ('input_path', 'output_path', 'error', 'seconds')
+    
+    def __init__(self, input_path: Path, output_path: Path, error: Optional[str], seconds: float):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.error = error
+        self.seconds = seconds
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+    
+    def __repr__(self):
+        status = 'ok' if self.ok else f"error: {self.error}"
+        return f"BatchResult({self.input_path} -> {self.output_path}, {status})"
+
+def collect_jobs(inputs: Iterable[Path], output_dir: Optional[Path] = None) -> List[Tuple[Path, Path]]:
+    """Пары (входной файл, выходной файл) для файлов и каталогов
+    
+    Из каталогов рекурсивно берутся файлы *.conf. Результат пишется рядом
+    с исходником с расширением .toml либо в output_dir; для каталогов
+    внутри output_dir сохраняется относительная структура. Файл, указанный
+    повторно, конвертируется один раз; разные файлы с одним результатом
+    (a/app.conf и b/app.conf при output_dir) — ValueError.
+    """
+    candidates = []
+    for input_path in inputs:
+        input_path = Path(input_path)
+        if input_path.is_dir():
+            for path in sorted(input_path.rglob('*.conf')):
+                relative = path.relative_to(input_path).with_suffix('.toml')
+                target = output_dir / input_path.name / relative if output_dir else path.with_suffix('.toml')
+                candidates.append((path, target))
+        else:
+            target = output_dir / input_path.with_suffix('.toml').name if output_dir else input_path.with_suffix('.toml')
+            candidates.append((input_path, target))
+    
+    jobs = []
+    sources: Dict[Path, Path] = {}
+    for input_path, target in candidates:
+        key = target.resolve()
+        source = sources.setdefault(key, input_path)
+        if source is input_path:
+            jobs.append((input_path, target))
+        elif source.resolve() != input_path.resolve():
+            raise ValueError(f"Файлы {source} и {input_path} конвертируются в один результат {target}")
+    return jobs
+
+def convert_one(input_path: Path, output_path: Path, options: Dict[str, Any]) -> BatchResult:
+    """Конвертация одного файла; любая ошибка возвращается в результате, а не завершает процесс"""
+    start = time.perf_counter()
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        ConfigConverter(**options).convert_to_path(input_path, output_path)
+        error = None
+    except Exception as e:
+        error = str(e)
+    return BatchResult(input_path, output_path, error, time.perf_counter() - start)
+
+def _convert_job(job: Tuple[Path, Path, Dict[str, Any]]) -> BatchResult:
+    return convert_one(*job)
+
+def convert_batch(jobs: List[Tuple[Path, Path]], workers: int = 1,
+                  options: Optional[Dict[str, Any]] = None) -> Iterator[BatchResult]:
+    """Конвертация набора файлов пулом процессов; результаты выдаются в порядке jobs
+    
+    Каждый процесс пула импортирует конвертер один раз и обрабатывает
+    много файлов, поэтому запуск интерпретатора не повторяется на файл.
+    """
+    options = options or {}
+    tasks = [(input_path, output_path, options) for input_path, output_path in jobs]
+    
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _convert_job(task)
+        return
+    
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_convert_job, tasks, chunksize=chunksize)
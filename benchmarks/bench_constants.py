@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Вычисление конфигураций с большим числом констант.
+
+Строит цепочку из N констант со ссылками вперед (c0 := ?(c1); ...) и
+N независимых констант, на которые ссылается словарь, и измеряет время
+построения графа зависимостей и ConstantEvaluator.evaluate_all.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from constants import ConstantEvaluator, ConstantGraph
+from lexer import Lexer
+from parser import ConstDeclarationNode, Parser
+
+def chain(count: int) -> str:
+    source = ''.join(f"c{index} := ?(c{index + 1}); " for index in range(count))
+    return source + f"c{count} := 1; {{ x -> ?(c0) }}"
+
+def independent(count: int) -> str:
+    declarations = ''.join(f"c{index} := << {index + 1}, ?(base) >>; " for index in range(count))
+    entries = '. '.join(f"k{index} -> ?(c{index})" for index in range(count))
+    return f"base := 1; {declarations}{{ {entries} }}"
+
+def run(name: str, source: str, repeat: int):
+    nodes = Parser(Lexer(source, engine='fast').iter_tokens()).parse()
+    declarations = [node for node in nodes if isinstance(node, ConstDeclarationNode)]
+    graph_times = []
+    evaluate_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ConstantGraph(declarations)
+        built = time.perf_counter()
+        ConstantEvaluator().evaluate_all(nodes)
+        evaluated = time.perf_counter()
+        graph_times.append(built - start)
+        evaluate_times.append(evaluated - built)
+    print(f"{name:<12} граф {min(graph_times) * 1000:8.2f} мс   "
+          f"evaluate_all {min(evaluate_times) * 1000:8.2f} мс")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--count', type=int, nargs='+', default=[10_000, 20_000, 40_000],
+                            help='Число констант')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Число повторов')
+    args = arg_parser.parse_args()
+    
+    for count in args.count:
+        print(f"Констант: {count}")
+        run('цепочка', chain(count), args.repeat)
+        run('независимые', independent(count), args.repeat)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Сравнение генерации TOML через tomlkit и в быстром режиме.
+
+Данные получаются вычислением синтетической конфигурации из множества
+секций с числами, массивами и вложенными таблицами.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from constants import ConstantEvaluator
+from lexer import Lexer
+from parser import Parser
+from toml_generator import TOMLGenerator
+
+def make_source(sections: int) -> str:
+    entries = []
+    for i in range(sections):
+        entries.append(
+            f"section{i} -> {{ id -> {i + 1}. port -> ?(base_port). "
+            f"limits -> << {i + 1}, 2, 3 >>. "
+            f"nested -> {{ depth -> 2. items -> << {{ a -> 1 }}, {{ a -> 2 }} >> }} }}"
+        )
+    return "base_port := 8000;\n{ " + ".\n".join(entries) + " }"
+
+def best_time(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--sections', type=int, default=2000, help='Число секций')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Число повторов')
+    args = arg_parser.parse_args()
+
+    nodes = Parser(Lexer(make_source(args.sections), engine='fast').iter_tokens()).parse()
+    data = ConstantEvaluator().evaluate_all(nodes)
+
+    tomlkit_time = best_time(lambda: TOMLGenerator().generate(data), args.repeat)
+    fast_time = best_time(lambda: TOMLGenerator(mode='fast').generate(data), args.repeat)
+
+    print(f"Секций:   {args.sections}")
+    print(f"tomlkit:  {tomlkit_time * 1000:10.1f} мс")
+    print(f"fast:     {fast_time * 1000:10.1f} мс")
+    print(f"Ускорение: {tomlkit_time / fast_time:9.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Чтение одного значения из большой конфигурации: get против полной конвертации.
+
+Генерирует конфигурацию (synth.generate) и сравнивает время
+ConfigConverter.get для путей разной глубины с convert_path (вычисление
+и генерация TOML всего файла). Значения сверяются с полным вычислением.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from converter import ConfigConverter
+from parallel import evaluate_serial
+from synth import generate
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--size', type=int, default=2_000_000, help='Размер конфигурации, символов')
+    arg_parser.add_argument('--engine', choices=('char', 'fast'), default='fast')
+    args = arg_parser.parse_args()
+    
+    source = generate(size=args.size, depth=3, array_length=8, constants=200, fanout=3)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'big.conf'
+        path.write_text(source, encoding='utf-8')
+        converter = ConfigConverter(engine=args.engine, mode='fast')
+        print(f"Размер: {len(source) / 1e6:.1f} МБ")
+        
+        elapsed, _ = timed(lambda: converter.convert_path(path))
+        print(f"convert_path{'':25} {elapsed * 1000:9.1f} мс")
+        
+        data = evaluate_serial(source, args.engine)
+        tables = [key for key, value in data.items() if isinstance(value, dict)]
+        keys = [tables[0], tables[len(tables) // 2], tables[-1]]
+        value = data[keys[-1]]
+        keys.append(keys[-1])
+        while isinstance(value, dict) and value:
+            last = list(value)[-1]
+            keys[-1] += '.' + last
+            value = value[last]
+        
+        for key in keys:
+            elapsed, result = timed(lambda: converter.get(path, key))
+            expected = data
+            for name in key.split('.'):
+                expected = expected[name]
+            status = 'совпадает' if result == expected else 'РАЗЛИЧАЕТСЯ'
+            print(f"get {key:<33} {elapsed * 1000:9.1f} мс   ({status})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Конвертация набора сервисов с общим импортируемым файлом констант.
+
+Генерирует общий файл с множеством констант и N небольших сервисов,
+импортирующих его, и сравнивает пакетную конвертацию с кэшем импортов
+(общий файл разбирается один раз) и с общими константами, вставленными
+в каждый сервис. Результаты сверяются.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from converter import ConfigConverter
+from imports import ModuleCache
+
+def shared_constants(count: int) -> str:
+    lines = []
+    for index in range(count):
+        if index % 3 == 2:
+            lines.append(f"c{index} := << ?(c{index - 1}), ?(c{index - 2}), {index} >>;")
+        elif index % 3 == 1:
+            lines.append(f"c{index} := {{ id -> {index}. base -> ?(c{index - 1}) }};")
+        else:
+            lines.append(f"c{index} := {index + 1};")
+    return '\n'.join(lines) + '\n'
+
+def service(number: int, constants: int) -> str:
+    refs = [(number * 7 + step * 13) % constants for step in range(8)]
+    entries = '.\n'.join(f"    v{step} -> ?(c{ref})" for step, ref in enumerate(refs))
+    return f"name := {number + 1};\n{{\n    id -> ?(name).\n{entries}\n}}\n"
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--services', type=int, default=100, help='Число сервисов')
+    arg_parser.add_argument('--constants', type=int, default=2000, help='Число общих констант')
+    arg_parser.add_argument('--engine', choices=('char', 'fast'), default='fast')
+    args = arg_parser.parse_args()
+    
+    shared = shared_constants(args.constants)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / 'common.conf').write_text(shared, encoding='utf-8')
+        imported, inlined = [], []
+        for number in range(args.services):
+            body = service(number, args.constants)
+            imported.append(root / f"import_{number}.conf")
+            imported[-1].write_text('import "common.conf";\n' + body, encoding='utf-8')
+            inlined.append(root / f"inline_{number}.conf")
+            inlined[-1].write_text(shared + body, encoding='utf-8')
+        
+        print(f"Сервисов: {args.services}, общих констант: {args.constants}, "
+              f"общий файл: {len(shared.encode('utf-8')) / 1024:.0f} КиБ")
+        converter = ConfigConverter(engine=args.engine, mode='fast')
+        start = time.perf_counter()
+        expected = [converter.convert_path(path).split('\n', 1)[1] for path in inlined]
+        inline_time = time.perf_counter() - start
+        print(f"константы в каждом файле {inline_time * 1000:9.1f} мс")
+        
+        modules = ModuleCache(engine=args.engine)
+        converter = ConfigConverter(engine=args.engine, mode='fast', modules=modules)
+        start = time.perf_counter()
+        results = [converter.convert_path(path).split('\n', 1)[1] for path in imported]
+        import_time = time.perf_counter() - start
+        status = 'совпадает' if results == expected else 'РАЗЛИЧАЕТСЯ'
+        print(f"импорт с кэшем           {import_time * 1000:9.1f} мс   "
+              f"(x{inline_time / import_time:.2f}, {status}; "
+              f"попаданий {modules.hits}, промахов {modules.misses})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Время загрузки конфигурации: исходный текст против двоичного формата confc.
+
+Генерирует конфигурацию из N таблиц с общими константами и сравнивает
+полный конвейер (лексер, парсер, вычисление констант) с confc.loads,
+с ленивой загрузкой confc.load(lazy=True) с чтением одной таблицы и
+время запуска интерпретатора с импортом нужных модулей в обоих случаях.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import confc
+from constants import ConstantEvaluator
+from lexer import Lexer
+from parser import Parser
+
+def config(count: int) -> str:
+    lines = ["ports := << 8080, 8081, 8082 >>;", "limits := { rps -> 1000. burst -> 50 };"]
+    for index in range(count):
+        lines.append(f"{{ service{index} -> {{ id -> {index + 1}. ports -> ?(ports). "
+                     f"limits -> ?(limits). replicas -> << {index + 1}, 2, 3 >> }} }}")
+    return '\n'.join(lines) + '\n'
+
+def best(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def startup(code: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=str(ROOT), check=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--count', type=int, default=20_000, help='Число таблиц')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Число повторов')
+    args = arg_parser.parse_args()
+    
+    source = config(args.count)
+    with tempfile.TemporaryDirectory() as tmp:
+        conf_path = os.path.join(tmp, 'app.conf')
+        confc_path = os.path.join(tmp, 'app.confc')
+        with open(conf_path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        
+        def pipeline():
+            with open(conf_path, 'r', encoding='utf-8') as f:
+                nodes = Parser(Lexer(f.read(), engine='fast').iter_tokens()).parse()
+            return ConstantEvaluator().evaluate_all(nodes)
+        
+        data = pipeline()
+        with open(confc_path, 'wb') as f:
+            confc.dump(data, f)
+        
+        key = f"service{args.count // 2}"
+        parse_time = best(pipeline, args.repeat)
+        load_time = best(lambda: confc.load(confc_path), args.repeat)
+        lazy_time = best(lambda: confc.load(confc_path, lazy=True)[key]['limits'], args.repeat)
+        
+        pipeline_start = startup(
+            "from lexer import Lexer\nfrom parser import Parser\nfrom constants import ConstantEvaluator\n"
+            f"ConstantEvaluator().evaluate_all(Parser(Lexer(open({conf_path!r}, encoding='utf-8').read(), "
+            "engine='fast').iter_tokens()).parse())", args.repeat)
+        lazy_start = startup(f"import confc\nconfc.load({confc_path!r}, lazy=True)[{key!r}]['limits']",
+                             args.repeat)
+        
+        print(f"Таблиц: {args.count}, исходник {len(source.encode('utf-8')) / 1e6:.1f} МБ, "
+              f"confc {os.path.getsize(confc_path) / 1e6:.1f} МБ")
+        print(f"лексер+парсер+константы   {parse_time * 1000:9.1f} мс")
+        print(f"confc.load                {load_time * 1000:9.1f} мс   (x{parse_time / load_time:.1f})")
+        print(f"confc.load(lazy) + ключ   {lazy_time * 1000:9.1f} мс   (x{parse_time / lazy_time:.1f})")
+        print(f"запуск с исходником       {pipeline_start * 1000:9.1f} мс")
+        print(f"запуск с confc (lazy)     {lazy_start * 1000:9.1f} мс")
+
+if __name__ == '__main__':
+    main()
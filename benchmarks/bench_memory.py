@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Память AST для конфигурации с большим числовым массивом.
+
+Сравнивает упакованное представление (PackedArrayNode на array('q'))
+с прежним представлением "один NumberNode на элемент".
+"""
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lexer import Lexer
+from parser import ArrayNode, NumberNode, Parser
+
+def make_source(length: int) -> str:
+    numbers = ', '.join(str(i % 9000 + 1) for i in range(length))
+    return f"{{ data -> {{ samples -> << {numbers} >> }} }}"
+
+def measure(build) -> int:
+    """Размер удерживаемых объектов после построения, в байтах"""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--length', type=int, default=500_000, help='Длина массива')
+    args = arg_parser.parse_args()
+
+    source = make_source(args.length)
+
+    def packed():
+        return Parser(Lexer(source, engine='fast').iter_tokens()).parse()
+
+    def unpacked():
+        nodes = packed()
+        array_node = nodes[0].entries[0].value.entries[0]
+        array_node.value = ArrayNode([NumberNode(v) for v in array_node.value.values])
+        return nodes
+
+    packed_bytes = measure(packed)
+    unpacked_bytes = measure(unpacked)
+
+    print(f"Элементов массива:        {args.length}")
+    print(f"NumberNode на элемент:    {unpacked_bytes / 2**20:8.2f} МиБ")
+    print(f"array('q'):               {packed_bytes / 2**20:8.2f} МиБ")
+    print(f"Сокращение:               {unpacked_bytes / max(packed_bytes, 1):8.1f}x")
+
+if __name__ == '__main__':
+    main()
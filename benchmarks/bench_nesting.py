@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Разбор и вычисление глубоко вложенных конфигураций.
+
+Строит массивы << << ... >> >> и словари { a -> { a -> ... } } заданной
+глубины и измеряет время Parser.parse_value и ConstantEvaluator.evaluate_node.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from constants import ConstantEvaluator
+from lexer import Lexer
+from parser import Parser
+
+def nested_array(depth: int) -> str:
+    return '<< ' * depth + '1' + ' >>' * depth
+
+def nested_dict(depth: int) -> str:
+    return '{ a -> ' * depth + '1' + ' }' * depth
+
+def run(name: str, source: str, repeat: int):
+    parse_times = []
+    evaluate_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        node = Parser(Lexer(source, engine='fast').iter_tokens()).parse_value()
+        parsed = time.perf_counter()
+        ConstantEvaluator().evaluate_node(node)
+        evaluated = time.perf_counter()
+        parse_times.append(parsed - start)
+        evaluate_times.append(evaluated - parsed)
+    print(f"{name:<8} разбор {min(parse_times) * 1000:8.2f} мс   "
+          f"вычисление {min(evaluate_times) * 1000:8.2f} мс")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--depth', type=int, default=10_000, help='Глубина вложенности')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Число повторов')
+    args = arg_parser.parse_args()
+
+    print(f"Глубина вложенности: {args.depth} (лимит рекурсии {sys.getrecursionlimit()})")
+    run('массивы', nested_array(args.depth), args.repeat)
+    run('словари', nested_dict(args.depth), args.repeat)
+
+if __name__ == '__main__':
+    main()
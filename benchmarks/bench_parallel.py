@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Параллельный разбор записей большого словаря верхнего уровня.
+
+Генерирует конфигурацию из констант и одного словаря с тысячами записей
+(synth.generate с single=True) и сравнивает evaluate_serial с
+evaluate_parallel при разном числе процессов. Результаты сверяются.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from parallel import evaluate_parallel, evaluate_serial, prescan
+from synth import generate
+
+def best(function, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--size', type=int, default=5_000_000, help='Размер конфигурации, символов')
+    arg_parser.add_argument('--workers', type=int, nargs='+',
+                            default=sorted({2, 4, os.cpu_count() or 1}), help='Число процессов')
+    arg_parser.add_argument('--engine', choices=('char', 'fast'), default='fast')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Число повторов')
+    args = arg_parser.parse_args()
+    
+    source = generate(size=args.size, depth=3, array_length=8, constants=500, fanout=3, single=True)
+    prescan_time, segments = best(lambda: prescan(source), args.repeat)
+    print(f"Размер: {len(source) / 1e6:.1f} МБ, записей: {sum(s.entries for s in segments)}, "
+          f"CPU: {os.cpu_count()}")
+    print(f"предварительный просмотр {prescan_time * 1000:9.1f} мс")
+    
+    serial_time, expected = best(lambda: evaluate_serial(source, args.engine), args.repeat)
+    print(f"последовательно          {serial_time * 1000:9.1f} мс")
+    for workers in args.workers:
+        elapsed, result = best(lambda: evaluate_parallel(source, args.engine, workers), args.repeat)
+        status = 'совпадает' if result == expected else 'РАЗЛИЧАЕТСЯ'
+        print(f"{workers:>2} процессов             {elapsed * 1000:9.1f} мс   "
+              f"(x{serial_time / elapsed:.2f}, {status})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Накладные расходы разбора с восстановлением после ошибок.
+
+Сравнивает строгий разбор корректной конфигурации из N записей с разбором
+той же конфигурации в режиме восстановления, а также время разбора с
+восстановлением, когда каждая K-я запись содержит синтаксическую ошибку.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lexer import Lexer
+from parser import Parser
+
+def config(count: int, broken_every: int = 0) -> str:
+    lines = []
+    for index in range(count):
+        value = f"{{ port -> {index + 1}. hosts -> << {index + 1}, 2, 3 >>. name -> ?(base) }}"
+        if broken_every and index % broken_every == 0:
+            value = f"{{ port -> . hosts -> << {index + 1}, , 3 >>. name -> ?(base) }}"
+        lines.append(f"k{index} := {value};")
+    return "base := 1;\n" + '\n'.join(lines) + "\n"
+
+def parse(source: str, engine: str, recover: bool):
+    lexer = Lexer(source, engine=engine, recover=recover)
+    parser = Parser(lexer.iter_tokens(), recover=recover, errors=lexer.errors)
+    parser.parse()
+    return parser.errors
+
+def measure(source: str, engine: str, recover: bool, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        errors = parse(source, engine, recover)
+        times.append(time.perf_counter() - start)
+    return min(times), len(errors)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--count', type=int, default=50_000, help='Число записей')
+    arg_parser.add_argument('--broken-every', type=int, default=100,
+                            help='Каждая K-я запись содержит ошибки')
+    arg_parser.add_argument('--engine', choices=('char', 'fast'), default='fast')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Число повторов')
+    args = arg_parser.parse_args()
+    
+    valid = config(args.count)
+    broken = config(args.count, args.broken_every)
+    strict, _ = measure(valid, args.engine, False, args.repeat)
+    recover, _ = measure(valid, args.engine, True, args.repeat)
+    with_errors, errors = measure(broken, args.engine, True, args.repeat)
+    
+    print(f"Записей: {args.count}, движок: {args.engine}")
+    print(f"строгий разбор          {strict * 1000:9.1f} мс")
+    print(f"с восстановлением       {recover * 1000:9.1f} мс   ({(recover / strict - 1) * 100:+.1f}%)")
+    print(f"с ошибками ({errors:>6})    {with_errors * 1000:9.1f} мс   "
+          f"({(with_errors / strict - 1) * 100:+.1f}%)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Задержка конвертации: HTTP-сервер с прогретыми процессами против запуска CLI.
+
+Запускает `cli.py serve` на свободном порту, отправляет последовательные
+запросы POST /convert и сравнивает p50/p99 задержки с запуском
+`cli.py --no-cache FILE` на каждую конвертацию.
+"""
+import argparse
+import http.client
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CLI = str(ROOT / 'cli.py')
+
+SOURCE = """' Конфигурация сервиса
+port := 8080;
+hosts := << 1, 2, 3 >>;
+{
+    server -> { port -> ?(port). hosts -> ?(hosts). limits -> { cpu -> 2. memory -> 512 } }.
+    client -> { retries -> 3. timeout -> 30 }
+}
+"""
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def report(name: str, latencies):
+    print(f"{name:<8} p50 {percentile(latencies, 0.5) * 1000:8.2f} мс   "
+          f"p99 {percentile(latencies, 0.99) * 1000:8.2f} мс")
+
+def bench_server(requests: int, workers: int):
+    process = subprocess.Popen([sys.executable, CLI, 'serve', '--port', '0', '-j', str(workers)],
+                               stderr=subprocess.PIPE, text=True)
+    try:
+        # Сервер сообщает адрес после прогрева рабочих процессов
+        match = re.search(r'http://([^:]+):(\d+)/', process.stderr.readline())
+        if not match:
+            raise RuntimeError("Сервер не сообщил адрес")
+        connection = http.client.HTTPConnection(match.group(1), int(match.group(2)))
+        body = SOURCE.encode('utf-8')
+        latencies = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            connection.request('POST', '/convert', body=body)
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+            if response.status != 200:
+                raise RuntimeError(f"Ответ сервера: {response.status}")
+        connection.close()
+        return latencies
+    finally:
+        process.terminate()
+        process.wait()
+
+def bench_cli(runs: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'config.conf'
+        path.write_text(SOURCE, encoding='utf-8')
+        latencies = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, CLI, '--no-cache', str(path)],
+                           check=True, stdout=subprocess.DEVNULL)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--requests', type=int, default=500, help='Число запросов к серверу')
+    arg_parser.add_argument('--runs', type=int, default=30, help='Число запусков CLI')
+    arg_parser.add_argument('--workers', type=int, default=2, help='Рабочие процессы сервера')
+    args = arg_parser.parse_args()
+    
+    report('сервер', bench_server(args.requests, args.workers))
+    report('CLI', bench_cli(args.runs))
+
+if __name__ == '__main__':
+    main()
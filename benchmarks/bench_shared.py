@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Генерация TOML для конфигурации с многократными ссылками на большой массив.
+
+Константа-массив из N элементов упоминается через ?(name) в M записях.
+Сравнивается генерация с повторным использованием уже сконвертированных
+значений (memoize=True) и без него. Построение массива tomlkit квадратично
+по длине, поэтому режим tomlkit без memoize по умолчанию не запускается.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from constants import ConstantEvaluator
+from lexer import Lexer
+from parser import Parser
+from toml_generator import GENERATOR_MODES, TOMLGenerator
+
+def make_source(size: int, references: int) -> str:
+    elements = ', '.join(str(index + 1) for index in range(size))
+    entries = '.\n'.join(f"section{index} -> {{ id -> {index + 1}. data -> ?(big) }}"
+                         for index in range(references))
+    return f"big := << {elements} >>;\n{{ {entries} }}"
+
+def measure(mode: str, memoize: bool, data) -> float:
+    start = time.perf_counter()
+    TOMLGenerator(mode=mode, memoize=memoize).generate(data)
+    return time.perf_counter() - start
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--size', type=int, default=10_000, help='Длина массива')
+    arg_parser.add_argument('--refs', type=int, default=1_000, help='Число ссылок на массив')
+    arg_parser.add_argument('--modes', nargs='+', choices=GENERATOR_MODES, default=list(GENERATOR_MODES),
+                            help='Режимы генератора')
+    arg_parser.add_argument('--tomlkit-baseline', action='store_true',
+                            help='Запустить tomlkit и без memoize (очень долго)')
+    args = arg_parser.parse_args()
+    
+    nodes = Parser(Lexer(make_source(args.size, args.refs), engine='fast').iter_tokens()).parse()
+    data = ConstantEvaluator().evaluate_all(nodes)
+    
+    print(f"Массив: {args.size} элементов, ссылок: {args.refs}")
+    for mode in args.modes:
+        shared = measure(mode, True, data)
+        print(f"{mode:<8} memoize  {shared * 1000:10.1f} мс")
+        if mode == 'tomlkit' and not args.tomlkit_baseline:
+            continue
+        plain = measure(mode, False, data)
+        print(f"{mode:<8} без него {plain * 1000:10.1f} мс   ускорение {plain / shared:6.1f}x")
+
+if __name__ == '__main__':
+    main()
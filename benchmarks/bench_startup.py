@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Время запуска CLI и импортируемые модули по данным `python -X importtime`.
+
+Для сценариев --help, --check и конвертации измеряет время запуска процесса
+и суммарное время импортов, показывает самые медленные модули и проверяет,
+что сценарии без генерации не импортируют tomlkit. С --max-import-ms и при
+запрещенных импортах завершается с кодом 1, чтобы ловить регрессии.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CLI = str(Path(__file__).resolve().parent.parent / 'cli.py')
+
+SOURCE = "port := 8080;\n{ server -> { port -> ?(port). hosts -> << 1, 2, 3 >> } }\n"
+
+def parse_importtime(stderr: str):
+    """Список (модуль, собственное время, накопленное время, уровень вложенности) в мкс"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), level))
+    return imports
+
+def run_scenario(name: str, args, forbidden, repeat: int, top: int):
+    walls = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, CLI] + args, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        walls.append(time.perf_counter() - start)
+    
+    result = subprocess.run([sys.executable, '-X', 'importtime', CLI] + args,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imports = parse_importtime(result.stderr)
+    total_ms = sum(cumulative for _, _, cumulative, level in imports if level == 0) / 1000
+    modules = {module for module, _, _, _ in imports}
+    found = sorted(module for module in modules
+                   if any(module == bad or module.startswith(bad + '.') for bad in forbidden))
+    
+    print(f"{name:<10} запуск {min(walls) * 1000:7.1f} мс   импорты {total_ms:7.1f} мс   "
+          f"модулей {len(modules)}")
+    for module, self_us, _, _ in sorted(imports, key=lambda item: -item[1])[:top]:
+        print(f"    {self_us / 1000:6.2f} мс  {module}")
+    if found:
+        print(f"    запрещенные импорты: {', '.join(found)}")
+    return total_ms, found
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Число запусков на сценарий')
+    arg_parser.add_argument('--top', type=int, default=5, help='Сколько самых медленных модулей показать')
+    arg_parser.add_argument('--max-import-ms', type=float,
+                            help='Порог суммарного времени импортов для --help и --check')
+    args = arg_parser.parse_args()
+    
+    if os.environ.get('PYTHONDONTWRITEBYTECODE'):
+        print("PYTHONDONTWRITEBYTECODE задан: время импортов включает компиляцию исходников")
+    
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'config.conf'
+        path.write_text(SOURCE, encoding='utf-8')
+        scenarios = [
+            ('--help', ['--help'], ('converter', 'tomlkit'), True),
+            ('--check', ['--check', str(path)], ('tomlkit', 'cache'), True),
+            ('convert', ['--no-cache', str(path)], (), False),
+        ]
+        for name, cli_args, forbidden, guarded in scenarios:
+            total_ms, found = run_scenario(name, cli_args, forbidden, args.repeat, args.top)
+            if found or (guarded and args.max_import_ms is not None and total_ms > args.max_import_ms):
+                failed = True
+    
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
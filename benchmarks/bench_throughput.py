@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Пропускная способность конвертации множества небольших конфигураций.
+
+Сравнивает новый ConfigConverter на каждую строку, один конвертер с
+convert_string, convert_many и один конвертер в пуле потоков.
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from converter import ConfigConverter
+from toml_generator import GENERATOR_MODES
+
+def make_sources(count: int):
+    return [
+        f"port := {8000 + index};\n"
+        f"{{ service{index} -> {{ port -> ?(port). hosts -> << {index + 1}, 2, 3 >>. "
+        f"limits -> {{ cpu -> 2. memory -> 512 }} }}. replicas -> {index % 5 + 1} }}"
+        for index in range(count)
+    ]
+
+def measure(name: str, func, count: int):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<22} {count / elapsed:10.0f} конфигураций/с")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--count', type=int, default=2000, help='Число конфигураций')
+    arg_parser.add_argument('--threads', type=int, default=4, help='Число потоков')
+    arg_parser.add_argument('--engine', choices=('char', 'fast'), default='fast', help='Движок лексера')
+    args = arg_parser.parse_args()
+    
+    sources = make_sources(args.count)
+    for mode in GENERATOR_MODES:
+        print(f"Генератор {mode}, конфигураций: {args.count}")
+        options = {'engine': args.engine, 'mode': mode}
+        converter = ConfigConverter(**options)
+        
+        measure('новый конвертер', lambda: [ConfigConverter(**options).convert_string(source)
+                                            for source in sources], args.count)
+        measure('convert_string', lambda: [converter.convert_string(source)
+                                           for source in sources], args.count)
+        measure('convert_many', lambda: converter.convert_many(sources), args.count)
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            measure(f'{args.threads} потока', lambda: list(pool.map(converter.convert_string, sources)),
+                    args.count)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Набор бенчмарков конвейера на синтетических конфигурациях с сохранением в JSON.
+
+Для каждой формы конфигурации (benchmarks/synth.py) отдельно измеряются
+Lexer.tokenize, Parser.parse, ConstantEvaluator.evaluate_all и
+TOMLGenerator.generate: лучшее время из нескольких повторов, пропускная
+способность по исходному тексту и пик памяти (tracemalloc, отдельным
+прогоном). С --baseline результаты сравниваются с сохраненным прогоном.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from constants import ConstantEvaluator
+from lexer import Lexer
+from parser import Parser
+from synth import generate
+from toml_generator import TOMLGenerator
+
+# Формы конфигураций: параметры synth.generate без размера
+SHAPES = {
+    'flat': {'depth': 1, 'array_length': 4, 'constants': 10, 'fanout': 1},
+    'deep': {'depth': 40, 'array_length': 2, 'constants': 10, 'fanout': 1},
+    'arrays': {'depth': 1, 'array_length': 500, 'constants': 10, 'fanout': 1},
+    'constants': {'depth': 2, 'array_length': 4, 'constants': 5000, 'fanout': 3},
+    'fanout': {'depth': 2, 'array_length': 4, 'constants': 100, 'fanout': 50},
+}
+
+STAGES = ('tokenize', 'parse', 'evaluate', 'generate')
+
+def stage_functions(source: str, engine: str, mode: str):
+    """Функции этапов; вход каждого этапа готовится заранее и в замер не входит"""
+    tokens = Lexer(source, engine=engine).tokenize()
+    nodes = Parser(tokens).parse()
+    data = ConstantEvaluator().evaluate_all(nodes)
+    return {
+        'tokenize': lambda: Lexer(source, engine=engine).tokenize(),
+        'parse': lambda: Parser(tokens).parse(),
+        'evaluate': lambda: ConstantEvaluator().evaluate_all(nodes),
+        'generate': lambda: TOMLGenerator(mode=mode).generate(data),
+    }
+
+def measure(function, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': min(times), 'peak_bytes': peak}
+
+def run_suite(shapes, size: int, engine: str, mode: str, repeat: int) -> dict:
+    results = {}
+    for name in shapes:
+        source = generate(size=size, **SHAPES[name])
+        megabytes = len(source.encode('utf-8')) / 1e6
+        functions = stage_functions(source, engine, mode)
+        results[name] = {'bytes': len(source.encode('utf-8'))}
+        for stage in STAGES:
+            result = measure(functions[stage], repeat)
+            result['mb_per_s'] = megabytes / result['seconds']
+            results[name][stage] = result
+            print(f"{name:<10} {stage:<9} {result['seconds'] * 1000:9.1f} мс "
+                  f"{result['mb_per_s']:8.2f} МБ/с  пик {result['peak_bytes'] / 2**20:8.1f} МиБ",
+                  file=sys.stderr)
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float) -> int:
+    """Печать отношения к базовому прогону; возвращает число регрессий"""
+    regressions = 0
+    print("\nСравнение с базовым прогоном (время / пик памяти):", file=sys.stderr)
+    for name, stages in results.items():
+        base_stages = baseline.get('results', {}).get(name)
+        if base_stages is None:
+            continue
+        for stage in STAGES:
+            current, base = stages[stage], base_stages.get(stage)
+            if base is None:
+                continue
+            time_ratio = current['seconds'] / base['seconds']
+            memory_ratio = current['peak_bytes'] / max(base['peak_bytes'], 1)
+            mark = ''
+            if time_ratio > 1 + threshold or memory_ratio > 1 + threshold:
+                mark = '  РЕГРЕССИЯ'
+                regressions += 1
+            print(f"{name:<10} {stage:<9} x{time_ratio:6.2f}  x{memory_ratio:6.2f}{mark}", file=sys.stderr)
+    return regressions
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--shape', choices=sorted(SHAPES), nargs='+', default=list(SHAPES),
+                            help='Формы конфигураций (по умолчанию все)')
+    arg_parser.add_argument('--size', type=int, default=1_000_000, help='Размер каждой конфигурации, символов')
+    arg_parser.add_argument('--engine', choices=('char', 'fast'), default='fast', help='Движок лексера')
+    arg_parser.add_argument('--mode', choices=('tomlkit', 'fast'), default='fast', help='Режим генератора TOML')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Число повторов')
+    arg_parser.add_argument('-o', '--output', type=Path, help='Файл для результатов в JSON')
+    arg_parser.add_argument('--baseline', type=Path, help='Сохраненный прогон для сравнения')
+    arg_parser.add_argument('--threshold', type=float, default=0.10,
+                            help='Допустимое ухудшение относительно базового прогона (по умолчанию 0.10)')
+    args = arg_parser.parse_args()
+    
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {'size': args.size, 'engine': args.engine, 'mode': args.mode, 'repeat': args.repeat},
+        'results': run_suite(args.shape, args.size, args.engine, args.mode, args.repeat),
+    }
+    
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        if baseline.get('parameters') != report['parameters']:
+            print("Внимание: параметры базового прогона отличаются", file=sys.stderr)
+        if compare(report['results'], baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Генератор синтетических конфигураций заданной формы.
+
+Форма задается размером текста, глубиной вложенности таблиц, длиной
+массивов, числом констант и числом ссылок на константы в каждой таблице.
+С single все таблицы — записи одного словаря верхнего уровня.
+Вывод детерминирован при одинаковых параметрах и seed.
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+def generate(size: int = 1_000_000, depth: int = 3, array_length: int = 10,
+             constants: int = 100, fanout: int = 2, seed: int = 0, single: bool = False) -> str:
+    """Текст конфигурации размером не меньше size символов"""
+    rng = random.Random(seed)
+    parts = []
+    # Константы: массивы чисел (четные) и словари со ссылками на предыдущие массивы
+    # (нечетные). Словарь внутри словаря в массиве tomlkit записать не может
+    for index in range(constants):
+        if index % 2:
+            parts.append(f"c{index} := {{ base -> ?(c{2 * rng.randrange((index + 1) // 2)}). "
+                         f"id -> {index + 1} }};\n")
+        else:
+            numbers = ', '.join(str(rng.randrange(1, 10_000)) for _ in range(min(array_length, 8)))
+            parts.append(f"c{index} := << {numbers} >>;\n")
+    if single:
+        parts.append("{\n")
+    length = sum(map(len, parts))
+    
+    table = 0
+    while length < size:
+        opening = []
+        for level in range(depth):
+            numbers = ', '.join(str(rng.randrange(1, 1_000_000)) for _ in range(array_length))
+            fields = [f"id -> {table * depth + level + 1}", f"items -> << {numbers} >>"]
+            if constants:
+                refs = ', '.join(f"?(c{rng.randrange(constants)})" for _ in range(fanout))
+                fields.append(f"refs -> << {refs} >>")
+            opening.append('{ ' + '. '.join(fields) + '. child -> ')
+        text = f"t{table} -> {''.join(opening)}{{}}{' }' * depth}"
+        if single:
+            text = ('.\n' if table else '') + text
+        else:
+            text = f"{{ {text} }}\n"
+        parts.append(text)
+        length += len(text)
+        table += 1
+    if single:
+        parts.append("\n}\n")
+    return ''.join(parts)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('output', type=Path, nargs='?', help='Выходной файл (по умолчанию - стандартный вывод)')
+    arg_parser.add_argument('--size', type=int, default=1_000_000, help='Размер текста, символов')
+    arg_parser.add_argument('--depth', type=int, default=3, help='Глубина вложенности таблиц')
+    arg_parser.add_argument('--array-length', type=int, default=10, help='Длина массивов')
+    arg_parser.add_argument('--constants', type=int, default=100, help='Число констант')
+    arg_parser.add_argument('--fanout', type=int, default=2, help='Ссылок на константы в каждой таблице')
+    arg_parser.add_argument('--single', action='store_true', help='Все таблицы в одном словаре верхнего уровня')
+    arg_parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора случайных чисел')
+    args = arg_parser.parse_args()
+    
+    source = generate(args.size, args.depth, args.array_length, args.constants, args.fanout, args.seed,
+                      args.single)
+    if args.output is None:
+        sys.stdout.write(source)
+    else:
+        args.output.write_text(source, encoding='utf-8')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, TextIO
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+def default_cache_dir() -> Path:
+    """Каталог кэша по умолчанию: $XDG_CACHE_HOME/config-converter или ~/.cache/config-converter"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'config-converter'
+
+class ConversionCache:
+    """Дисковый кэш сгенерированного TOML с вытеснением давно не использованных записей
+    
+    Ключ — SHA-256 от исходных байтов, версии конвертера и параметров,
+    влияющих на результат. Время последнего использования хранится в mtime
+    файла записи, поэтому кэш можно разделять между процессами.
+    """
+    
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+        # Оценка занятого места; пересчитывается при первой записи и при вытеснении
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    def __getstate__(self):
+        # Блокировка не передается в процессы пакетной конвертации
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    def key(self, source, *parts: str) -> str:
+        """Ключ записи для исходных байтов (bytes или mmap), версии конвертера и параметров конвертации"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(f"{part}\0".encode('utf-8'))
+        digest.update(source)
+        return digest.hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.toml"
+    
+    def get(self, key: str) -> Optional[str]:
+        """Результат из кэша или None; попадание обновляет время использования"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return text
+    
+    def reader(self, key: str) -> Optional[TextIO]:
+        """Запись кэша, открытая для потокового чтения, или None; попадание обновляет время использования"""
+        path = self._path(key)
+        try:
+            f = open(path, 'r', encoding='utf-8', newline='')
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Запись вытеснена другим процессом, но уже открыта
+            pass
+        return f
+    
+    def put(self, key: str, text: str):
+        """Атомарная запись результата и вытеснение старых записей при переполнении"""
+        with self.writer(key) as f:
+            f.write(text)
+    
+    @contextmanager
+    def writer(self, key: str) -> Iterator[TextIO]:
+        """Потоковая запись результата; запись появляется атомарно после выхода без ошибки"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                yield f
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        
+        with self._lock:
+            if self._size is None:
+                self._size = self.size()
+            else:
+                self._size += size
+            if self._size > self.max_bytes:
+                self.evict()
+    
+    def size(self) -> int:
+        """Суммарный размер записей кэша в байтах"""
+        total = 0
+        for entry in self._entries():
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+    
+    def evict(self):
+        """Удаление записей с самым старым временем использования до max_bytes"""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+    
+    def clear(self):
+        """Удаление всех записей"""
+        for entry in self._entries():
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+        self._size = 0
+    
+    def _entries(self):
+        try:
+            with os.scandir(self.cache_dir) as it:
+                return [entry for entry in it if entry.name.endswith('.toml')]
+        except FileNotFoundError:
+            return []
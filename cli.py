@@ -1,16 +1,40 @@
 #!/usr/bin/env python3
+import os
 import sys
 import argparse
 from pathlib import Path
-from converter import ConfigConverter
 
-def main():
+# Конвертер, tomlkit и остальные модули импортируются только там, где нужны:
+# --help, --example и --check запускаются без них
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    
+    # Подкоманды разбираются отдельно: позиционные input_file конфликтуют с subparsers
+    if argv and argv[0] == 'serve':
+        run_serve(argv[1:])
+        return
+    if argv and argv[0] == 'compile':
+        run_compile(argv[1:])
+        return
+    if argv and argv[0] == 'get':
+        run_get(argv[1:])
+        return
+    
     parser = argparse.ArgumentParser(
         description='Конвертер учебного конфигурационного языка в TOML',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Примеры:
   %(prog)s config.conf                    # Конвертация файла config.conf
+  %(prog)s -j 8 configs/ extra.conf       # Пакетная конвертация в 8 процессов
+  %(prog)s --watch configs/               # Переконвертация при изменении файлов
+  %(prog)s --check a.conf configs/        # Только проверка, все ошибки в каждом файле
+  %(prog)s --stats config.conf            # Время и память по этапам конвертации
+  %(prog)s --parallel 8 big.conf          # Разбор записей большого словаря в 8 процессов
+  %(prog)s serve --port 8080              # HTTP-сервер конвертации (POST /convert)
+  %(prog)s compile a.conf -o a.confc      # Двоичный файл значений для быстрой загрузки
+  %(prog)s get a.conf graphics.display    # Одно значение без конвертации всего файла
   %(prog)s --test                         # Запуск тестов
   %(prog)s --example                      # Показать примеры
         
@@ -25,10 +49,11 @@ def main():
     )
     
     parser.add_argument(
-        'input_file',
-        nargs='?',
+        'input_files',
+        nargs='*',
         type=Path,
-        help='Входной файл на учебном конфигурационном языке'
+        metavar='input_file',
+        help='Входные файлы на учебном конфигурационном языке или каталоги с файлами *.conf'
     )
     
     parser.add_argument(
@@ -37,6 +62,70 @@ def main():
         help='Выходной файл TOML (по умолчанию - стандартный вывод)'
     )
     
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        help='Пакетная конвертация в N процессов (результат пишется рядом с исходниками)'
+    )
+    
+    parser.add_argument(
+        '--output-dir',
+        type=Path,
+        help='Каталог для результатов пакетной конвертации'
+    )
+    
+    parser.add_argument(
+        '--parallel',
+        type=int,
+        metavar='N',
+        help='Разбирать записи больших словарей верхнего уровня одного файла в N процессов'
+    )
+    
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Следить за файлами и переконвертировать изменившиеся'
+    )
+    
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=1.0,
+        help='Интервал опроса файлов в режиме --watch, секунд (по умолчанию 1.0)'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        help='Каталог кэша результатов (по умолчанию ~/.cache/config-converter)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Не использовать кэш результатов'
+    )
+    
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='Только проверить файлы (разбор и разрешение констант) без генерации TOML'
+    )
+    
+    parser.add_argument(
+        '--stats', '--profile',
+        action='store_true',
+        help='Напечатать время, пик памяти и счетчики по этапам конвертации (без кэша)'
+    )
+    
+    parser.add_argument(
+        '--stats-json',
+        nargs='?',
+        const='-',
+        metavar='FILE',
+        help='Записать статистику этапов в JSON в FILE (без FILE - в стандартный поток ошибок)'
+    )
+    
     parser.add_argument(
         '--test',
         action='store_true',
@@ -49,13 +138,19 @@ def main():
         help='Показать примеры конфигураций'
     )
     
+    parser.add_argument(
+        '--mmap',
+        action='store_true',
+        help='Читать входной файл через mmap без копирования в память (для очень больших файлов)'
+    )
+    
     parser.add_argument(
         '--verbose',
         action='store_true',
         help='Подробный вывод'
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Показать примеры
     if args.example:
@@ -68,31 +163,225 @@ def main():
         return
     
     # Проверка обязательного аргумента
-    if not args.input_file:
+    if not args.input_files:
         parser.print_help()
         sys.exit(1)
     
+    options = {'input_mode': 'mmap' if args.mmap else 'text'}
+    
+    stats = None
+    if args.stats or args.stats_json:
+        if len(args.input_files) > 1 or args.input_files[0].is_dir() or args.check or args.watch:
+            parser.error("--stats и --stats-json работают только для конвертации одного файла")
+        from stats import ConversionStats
+        stats = ConversionStats()
+    
+    # Проверка без генерации
+    if args.check:
+        run_check(args, options)
+        return
+    
+    if not args.no_cache and stats is None:
+        from cache import ConversionCache
+        options['cache'] = ConversionCache(args.cache_dir)
+    
+    # Наблюдение за файлами
+    if args.watch:
+        if args.output:
+            parser.error("-o/--output нельзя использовать с --watch; используйте --output-dir")
+        run_watch(args, options)
+        return
+    
+    # Пакетная конвертация
+    batch_mode = (len(args.input_files) > 1 or args.input_files[0].is_dir()
+                  or args.jobs is not None or args.output_dir is not None)
+    if batch_mode:
+        if args.output:
+            parser.error("-o/--output нельзя использовать с несколькими файлами; используйте --output-dir")
+        run_batch(args, options)
+        return
+    
     # Конвертация
-    converter = ConfigConverter()
+    from converter import ConfigConverter, ConversionError
+    input_file = args.input_files[0]
+    if args.parallel:
+        options['workers'] = args.parallel
+    converter = ConfigConverter(**options)
     
     if args.verbose:
-        print(f"Конвертация файла: {args.input_file}", file=sys.stderr)
+        print(f"Конвертация файла: {input_file}", file=sys.stderr)
     
     try:
-        toml_output = converter.convert_file(args.input_file)
-        
         if args.output:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                f.write(toml_output)
+            converter.convert_to_path(input_file, args.output, stats)
             if args.verbose:
                 print(f"Результат сохранен в: {args.output}", file=sys.stderr)
         else:
+            toml_output = converter.convert_file(input_file, stats)
             print(toml_output)
+        
+        if stats is not None:
+            report_stats(stats, args)
             
+    except ConversionError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
     except Exception as e:
         print(f"Ошибка: {e}", file=sys.stderr)
         sys.exit(1)
 
+def report_stats(stats, args):
+    """Вывод статистики конвертации: текст в stderr и/или JSON"""
+    if args.stats:
+        print(stats.format(), file=sys.stderr)
+    if args.stats_json:
+        import json
+        text = json.dumps(stats.to_dict(), indent=2, ensure_ascii=False)
+        if args.stats_json == '-':
+            print(text, file=sys.stderr)
+        else:
+            Path(args.stats_json).write_text(text + '\n', encoding='utf-8')
+
+def run_check(args, options):
+    """Проверка файлов и каталогов с файлами *.conf; код выхода 1 при ошибках"""
+    from converter import ConfigConverter
+    
+    converter = ConfigConverter(**options)
+    checked = failed = 0
+    for input_path in args.input_files:
+        paths = sorted(input_path.rglob('*.conf')) if input_path.is_dir() else [input_path]
+        for path in paths:
+            checked += 1
+            errors = converter.validate(path)
+            if errors:
+                failed += 1
+            elif args.verbose:
+                print(f"{path}: ok", file=sys.stderr)
+            for error in errors:
+                print(f"{path}: {error}", file=sys.stderr)
+    
+    if args.verbose or failed:
+        print(f"Проверено: {checked}, с ошибками: {failed}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+def run_batch(args, options):
+    """Пакетная конвертация с отчетом по каждому файлу"""
+    from batch import collect_jobs, convert_batch
+    
+    try:
+        jobs = collect_jobs(args.input_files, args.output_dir)
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+    failed = 0
+    for result in convert_batch(jobs, workers=args.jobs or 1, options=options):
+        if result.ok:
+            if args.verbose:
+                print(f"{result.input_path} -> {result.output_path} "
+                      f"({result.seconds * 1000:.1f} мс)", file=sys.stderr)
+        else:
+            failed += 1
+            print(f"{result.input_path}: {result.error}", file=sys.stderr)
+    
+    print(f"Сконвертировано: {len(jobs) - failed}, с ошибками: {failed}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+def run_watch(args, options):
+    """Режим наблюдения: переконвертация изменившихся файлов с отчетом о задержке"""
+    from watcher import ConfigWatcher
+    
+    watcher = ConfigWatcher(args.input_files, args.output_dir, options, args.interval)
+    print("Наблюдение за файлами, Ctrl+C для выхода", file=sys.stderr)
+    
+    def report(result):
+        if result.ok:
+            print(f"{result.input_path} -> {result.output_path} "
+                  f"({result.seconds * 1000:.1f} мс)", file=sys.stderr)
+        else:
+            print(f"{result.input_path}: {result.error}", file=sys.stderr)
+    
+    try:
+        watcher.run(report)
+    except ValueError as e:
+        # Например, новый файл с тем же результатом, что у другого
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def run_serve(argv):
+    """Подкоманда serve: локальный HTTP-сервер конвертации"""
+    from server import serve
+    from toml_generator import GENERATOR_MODES
+    
+    parser = argparse.ArgumentParser(
+        prog='config-converter serve',
+        description='HTTP-сервер конвертации: POST /convert с текстом конфигурации возвращает TOML'
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Адрес (по умолчанию 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Порт (по умолчанию 8080, 0 - любой свободный)')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='Число рабочих процессов (по умолчанию - число CPU)')
+    parser.add_argument('--engine', choices=('char', 'fast'), default='fast',
+                        help='Движок лексера (по умолчанию fast)')
+    parser.add_argument('--mode', choices=GENERATOR_MODES, default='tomlkit',
+                        help='Режим генератора TOML (по умолчанию tomlkit)')
+    parser.add_argument('--verbose', action='store_true', help='Журнал запросов')
+    args = parser.parse_args(argv)
+    
+    serve(args.host, args.port, args.workers,
+          {'engine': args.engine, 'mode': args.mode}, verbose=args.verbose)
+
+def run_compile(argv):
+    """Подкоманда compile: вычисленные значения в двоичном формате confc"""
+    parser = argparse.ArgumentParser(
+        prog='config-converter compile',
+        description='Компиляция конфигурации в двоичный формат confc (загрузка: confc.load)'
+    )
+    parser.add_argument('input_file', type=Path, help='Входной файл на учебном конфигурационном языке')
+    parser.add_argument('-o', '--output', type=Path,
+                        help='Выходной файл (по умолчанию - входной с расширением .confc)')
+    parser.add_argument('--engine', choices=('char', 'fast'), default='fast',
+                        help='Движок лексера (по умолчанию fast)')
+    parser.add_argument('--verbose', action='store_true', help='Подробный вывод')
+    args = parser.parse_args(argv)
+    
+    from converter import ConfigConverter, ConversionError
+    output = args.output or args.input_file.with_suffix('.confc')
+    try:
+        ConfigConverter(engine=args.engine).compile_to_path(args.input_file, output)
+    except ConversionError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+    if args.verbose:
+        print(f"Результат сохранен в: {output}", file=sys.stderr)
+
+def run_get(argv):
+    """Подкоманда get: значение по пути ключей в виде фрагмента TOML"""
+    parser = argparse.ArgumentParser(
+        prog='config-converter get',
+        description='Вычисление одного значения по пути ключей через точку; '
+                    'остальные записи файла пропускаются без вычисления'
+    )
+    parser.add_argument('input_file', type=Path, help='Входной файл на учебном конфигурационном языке')
+    parser.add_argument('key', help='Путь ключей через точку, например graphics.display.width')
+    parser.add_argument('--engine', choices=('char', 'fast'), default='fast',
+                        help='Движок лексера (по умолчанию fast)')
+    args = parser.parse_args(argv)
+    
+    from converter import ConfigConverter, ConversionError
+    from toml_generator import TOMLGenerator
+    try:
+        value = ConfigConverter(engine=args.engine).get(args.input_file, args.key)
+    except ConversionError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+    sys.stdout.write(TOMLGenerator(mode='fast').fragment(value))
+
 def show_examples():
     """Показать примеры конфигураций"""
     print("Пример 1: Конфигурация веб-сервера")
@@ -0,0 +1,276 @@
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Any, BinaryIO, Dict, Iterator, List, Union
+
+# Двоичный формат предварительно вычисленной конфигурации (.confc).
+# Модуль не зависит от лексера, парсера и tomlkit: загрузка обходится без них.
+#
+# Заголовок: магия b'CNFC', версия формата (u16), резерв (u16); корневое
+# значение начинается сразу за заголовком. Все числа little-endian. Значение —
+# байт тега и данные:
+#   'i' int64 | 'I' u32 длина + целое в дополнительном коде | 'f' double
+#   'T'/'F' true/false | 's' u32 длина + UTF-8
+#   'q' u32 число + int64 * число (список целых, умещающихся в int64)
+#   'l' u32 число + u64 * число смещений элементов
+#   'd' u32 число + u64 * число смещений значений + (u32 длина + UTF-8) * число ключей
+# Смещения абсолютные, поэтому словарь разбирается без чтения значений, а
+# общий объект (значение константы, на которую много ссылок) хранится один раз.
+
+MAGIC = b'CNFC'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHH')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+def dumps(value: Any) -> bytes:
+    """Двоичное представление дерева значений (словари, списки, числа, строки)
+    
+    Дерево обходится с явным стеком, глубина вложенности не ограничена.
+    """
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, 0))
+    # Уже записанные объекты: id -> (объект, смещение)
+    written: Dict[int, Any] = {}
+    # Задания: (значение, позиция смещения для заполнения или -1 для корня)
+    stack = [(value, -1)]
+    
+    while stack:
+        value, slot = stack.pop()
+        
+        if isinstance(value, (dict, list, array)):
+            seen = written.get(id(value))
+            if seen is not None:
+                _U64.pack_into(out, slot, seen[1])
+                continue
+            written[id(value)] = (value, len(out))
+        if slot >= 0:
+            _U64.pack_into(out, slot, len(out))
+        
+        if isinstance(value, bool):
+            out += b'T' if value else b'F'
+        elif isinstance(value, int):
+            if _INT64_MIN <= value <= _INT64_MAX:
+                out += b'i' + _I64.pack(value)
+            else:
+                raw = value.to_bytes((value.bit_length() + 8) // 8, 'little', signed=True)
+                out += b'I' + _U32.pack(len(raw)) + raw
+        elif isinstance(value, float):
+            out += b'f' + _F64.pack(value)
+        elif isinstance(value, str):
+            raw = value.encode('utf-8')
+            out += b's' + _U32.pack(len(raw)) + raw
+        elif isinstance(value, (list, array)) and _packable(value):
+            packed = value if isinstance(value, array) else array('q', value)
+            out += b'q' + _U32.pack(len(packed)) + _little_endian(packed).tobytes()
+        elif isinstance(value, (list, array)):
+            out += b'l' + _U32.pack(len(value))
+            start = len(out)
+            out += bytes(8 * len(value))
+            for index in range(len(value) - 1, -1, -1):
+                stack.append((value[index], start + 8 * index))
+        elif isinstance(value, dict):
+            out += b'd' + _U32.pack(len(value))
+            start = len(out)
+            out += bytes(8 * len(value))
+            for key in value:
+                raw = str(key).encode('utf-8')
+                out += _U32.pack(len(raw)) + raw
+            items = list(value.values())
+            for index in range(len(items) - 1, -1, -1):
+                stack.append((items[index], start + 8 * index))
+        else:
+            raise TypeError(f"Неподдерживаемый тип значения: {type(value).__name__}")
+    
+    return bytes(out)
+
+def dump(value: Any, fp: BinaryIO):
+    """Запись двоичного представления в файловый объект"""
+    fp.write(dumps(value))
+
+def loads(data: Buffer) -> Any:
+    """Полное чтение двоичного представления в словари и списки"""
+    return _decode(data, _check_header(data))
+
+def load(path, lazy: bool = False) -> Any:
+    """Загрузка файла .confc
+    
+    При lazy=True файл отображается в память и корневой словарь
+    возвращается как LazyTable: вложенные таблицы разбираются при обращении.
+    Отображение принадлежит корневому LazyTable и освобождается его close()
+    или выходом из with; корень другого типа читается целиком сразу.
+    """
+    with open(path, 'rb') as f:
+        if not lazy:
+            return loads(f.read())
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        offset = _check_header(buffer)
+        if buffer[offset:offset + 1] == b'd':
+            return LazyTable(buffer, offset, owner=True)
+        value = _decode(buffer, offset)
+    except BaseException:
+        buffer.close()
+        raise
+    buffer.close()
+    return value
+
+class LazyTable(Mapping):
+    """Словарь поверх буфера .confc; значения читаются при обращении
+    
+    При создании читаются только ключи. Вложенные словари возвращаются
+    как LazyTable, остальные значения — полностью; прочитанное кэшируется.
+    Корень из load(lazy=True) владеет отображением файла: close() (или
+    выход из with) освобождает его, после чего непрочитанные значения
+    этого и вложенных словарей недоступны.
+    """
+    
+    def __init__(self, buffer: Buffer, offset: int, owner: bool = False):
+        self._buffer = buffer
+        self._owner = owner
+        count = _U32.unpack_from(buffer, offset + 1)[0]
+        start = offset + 5
+        offsets = struct.unpack_from(f'<{count}Q', buffer, start)
+        self._offsets: Dict[str, int] = {}
+        pos = start + 8 * count
+        for value_offset in offsets:
+            length = _U32.unpack_from(buffer, pos)[0]
+            key = bytes(buffer[pos + 4:pos + 4 + length]).decode('utf-8')
+            self._offsets[key] = value_offset
+            pos += 4 + length
+        self._values: Dict[str, Any] = {}
+    
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        offset = self._offsets[key]
+        if self._buffer[offset:offset + 1] == b'd':
+            value = LazyTable(self._buffer, offset)
+        else:
+            value = _decode(self._buffer, offset)
+        self._values[key] = value
+        return value
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._offsets)
+    
+    def __len__(self) -> int:
+        return len(self._offsets)
+    
+    def __contains__(self, key) -> bool:
+        return key in self._offsets
+    
+    def __repr__(self):
+        return f"LazyTable({list(self._offsets)})"
+    
+    def close(self):
+        """Освобождение отображения файла, если оно принадлежит этому словарю"""
+        if self._owner:
+            self._buffer.close()
+    
+    def __enter__(self) -> 'LazyTable':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Полностью прочитанный словарь"""
+        return {key: value.to_dict() if isinstance(value, LazyTable) else value
+                for key, value in self.items()}
+
+def _packable(values) -> bool:
+    """Непустой список только из целых (не bool) в пределах int64"""
+    if isinstance(values, array):
+        return values.typecode == 'q'
+    return bool(values) and all(type(item) is int and _INT64_MIN <= item <= _INT64_MAX
+                                for item in values)
+
+def _little_endian(values: array) -> array:
+    """Массив int64 в порядке байтов формата (копия только на big-endian)"""
+    if sys.byteorder == 'little':
+        return values
+    values = array(values.typecode, values)
+    values.byteswap()
+    return values
+
+def _check_header(buffer: Buffer) -> int:
+    """Проверка заголовка; возвращает смещение корневого значения"""
+    if len(buffer) < _HEADER.size:
+        raise ValueError("Неверный формат confc: файл слишком короткий")
+    magic, version, _ = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Неверный формат confc: нет сигнатуры CNFC")
+    if version != VERSION:
+        raise ValueError(f"Неподдерживаемая версия формата confc: {version}")
+    return _HEADER.size
+
+def _decode(buffer: Buffer, offset: int) -> Any:
+    """Чтение значения по смещению с явным стеком; общие объекты читаются один раз"""
+    root: List[Any] = [None]
+    decoded: Dict[int, Any] = {}
+    stack = [(offset, root, 0)]
+    
+    while stack:
+        offset, target, slot = stack.pop()
+        value = decoded.get(offset)
+        if value is not None:
+            target[slot] = value
+            continue
+        
+        tag = buffer[offset:offset + 1]
+        if tag == b'i':
+            value = _I64.unpack_from(buffer, offset + 1)[0]
+        elif tag == b'T' or tag == b'F':
+            value = tag == b'T'
+        elif tag == b'I':
+            length = _U32.unpack_from(buffer, offset + 1)[0]
+            value = int.from_bytes(buffer[offset + 5:offset + 5 + length], 'little', signed=True)
+        elif tag == b'f':
+            value = _F64.unpack_from(buffer, offset + 1)[0]
+        elif tag == b's':
+            length = _U32.unpack_from(buffer, offset + 1)[0]
+            value = bytes(buffer[offset + 5:offset + 5 + length]).decode('utf-8')
+        elif tag == b'q':
+            count = _U32.unpack_from(buffer, offset + 1)[0]
+            value = _little_endian(array('q', bytes(buffer[offset + 5:offset + 5 + 8 * count]))).tolist()
+            decoded[offset] = value
+        elif tag == b'l':
+            count = _U32.unpack_from(buffer, offset + 1)[0]
+            value = [None] * count
+            decoded[offset] = value
+            offsets = struct.unpack_from(f'<{count}Q', buffer, offset + 5)
+            for index in range(count - 1, -1, -1):
+                stack.append((offsets[index], value, index))
+        elif tag == b'd':
+            count = _U32.unpack_from(buffer, offset + 1)[0]
+            offsets = struct.unpack_from(f'<{count}Q', buffer, offset + 5)
+            pos = offset + 5 + 8 * count
+            value = {}
+            keys = []
+            for _ in range(count):
+                length = _U32.unpack_from(buffer, pos)[0]
+                key = bytes(buffer[pos + 4:pos + 4 + length]).decode('utf-8')
+                # Ключи заводятся заранее, чтобы сохранить порядок записей
+                value[key] = None
+                keys.append(key)
+                pos += 4 + length
+            decoded[offset] = value
+            for index in range(count - 1, -1, -1):
+                stack.append((offsets[index], value, keys[index]))
+        else:
+            raise ValueError(f"Неверный формат confc: неизвестный тег {tag!r} по смещению {offset}")
+        
+        target[slot] = value
+    
+    return root[0]
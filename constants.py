@@ -1,75 +1,430 @@
-from typing import Dict, Any, Union
+import copy
+from typing import Callable, Dict, Any, Iterable, Optional, Set, Tuple, Union
 from parser import *
 
-class ConstantEvaluator:
-    def __init__(self):
-        self.constants: Dict[str, Any] = {}
-        self.visited: set = set()
+def collect_references(node: ASTNode) -> List[str]:
+    """Имена констант, на которые ссылается поддерево, слева направо без повторов"""
+    names = {}
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ConstReferenceNode):
+            names[node.name] = None
+        elif isinstance(node, ConstDeclarationNode):
+            stack.append(node.value)
+        elif isinstance(node, DictNode):
+            stack.extend(entry.value for entry in reversed(node.entries))
+        elif isinstance(node, DictEntryNode):
+            stack.append(node.value)
+        elif isinstance(node, ArrayNode) and not isinstance(node, PackedArrayNode):
+            stack.extend(reversed(node.elements))
+    return list(names)
+
+class ConstantGraph:
+    """Граф зависимостей между объявлениями констант
     
-    def evaluate_node(self, node: ASTNode) -> Any:
-        """Рекурсивное вычисление значения узла AST"""
-        if isinstance(node, NumberNode):
-            return node.value
+    Вершины — объявления в порядке исходного текста. Ссылка разрешается в
+    ближайшее предыдущее объявление с этим именем, а если его нет — в
+    последнее объявление во всем тексте (ссылка вперед). Так повторное
+    объявление `x := << ?(x), 1 >>` по-прежнему ссылается на прежнее значение.
+    Построение, поиск циклов и топологическая сортировка линейны по числу
+    объявлений и ссылок.
+    """
+    
+    def __init__(self, declarations: List[ConstDeclarationNode],
+                 references: Optional[List[List[str]]] = None):
+        self.declarations = declarations
+        if references is None:
+            references = [collect_references(node.value) for node in declarations]
+        # Имя -> вершина последнего объявления с этим именем
+        self.latest: Dict[str, int] = {}
+        # Для каждой вершины: имя ссылки -> вершина, в которую она разрешена
+        self.targets: List[Dict[str, int]] = []
+        # Ссылки на имена без единого объявления: (вершина, имя)
+        self.undefined: List[Tuple[int, str]] = []
         
-        elif isinstance(node, ConstReferenceNode):
-            return self.evaluate_constant_reference(node.name)
+        forward = []
+        for vertex, node in enumerate(declarations):
+            targets = {}
+            for name in references[vertex]:
+                if name in self.latest:
+                    targets[name] = self.latest[name]
+                else:
+                    forward.append((vertex, name))
+            self.targets.append(targets)
+            self.latest[node.name] = vertex
+        for vertex, name in forward:
+            if name in self.latest:
+                self.targets[vertex][name] = self.latest[name]
+            else:
+                self.undefined.append((vertex, name))
         
-        elif isinstance(node, ArrayNode):
-            return [self.evaluate_node(element) for element in node.elements]
+        self.dependents: List[List[int]] = [[] for _ in declarations]
+        for vertex, targets in enumerate(self.targets):
+            for target in set(targets.values()):
+                self.dependents[target].append(vertex)
         
-        elif isinstance(node, DictNode):
-            result = {}
-            for entry in node.entries:
-                result[entry.key] = self.evaluate_node(entry.value)
-            return result
+        self.order = self._topological_order()
+        self.cycles = self._find_cycles() if len(self.order) < len(declarations) else []
+    
+    def check(self, known: Iterable[str] = ()):
+        """Ошибка для ссылок на неопределенные константы и для циклов"""
+        known = set(known)
+        for vertex, name in self.undefined:
+            if name not in known:
+                raise NameError(f"Неопределенная константа: {name}")
+        if self.cycles:
+            paths = '; '.join(' -> '.join(path) for path in self.cycles)
+            raise RuntimeError(f"Циклическая зависимость констант: {paths}")
+    
+    def affected(self, names: Iterable[str]) -> Set[int]:
+        """Вершины, значения которых меняются при изменении констант names"""
+        names = set(names)
+        return self.reachable(vertex for vertex, node in enumerate(self.declarations)
+                              if node.name in names)
+    
+    def reachable(self, vertices: Iterable[int]) -> Set[int]:
+        """Вершины vertices и все, что от них транзитивно зависит"""
+        stack = list(vertices)
+        seen = set(stack)
+        while stack:
+            for dependent in self.dependents[stack.pop()]:
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+        return seen
+    
+    def dependencies(self, vertices: Iterable[int]) -> Set[int]:
+        """Вершины vertices и все, от которых они транзитивно зависят"""
+        stack = list(vertices)
+        seen = set(stack)
+        while stack:
+            for target in self.targets[stack.pop()].values():
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return seen
+    
+    def affected_names(self, names: Iterable[str]) -> Set[str]:
+        """Имена констант, чьи итоговые значения зависят от констант names"""
+        affected = self.affected(names)
+        return {name for name, vertex in self.latest.items() if vertex in affected}
+    
+    def _topological_order(self) -> List[int]:
+        """Порядок Кана: зависимости раньше зависимых; вершины циклов не попадают"""
+        pending = [len(set(targets.values())) for targets in self.targets]
+        ready = [vertex for vertex in range(len(pending) - 1, -1, -1) if not pending[vertex]]
+        order = []
+        while ready:
+            vertex = ready.pop()
+            order.append(vertex)
+            for dependent in self.dependents[vertex]:
+                pending[dependent] -= 1
+                if not pending[dependent]:
+                    ready.append(dependent)
+        return order
+    
+    def _find_cycles(self) -> List[List[str]]:
+        """По одному циклу на каждую компоненту сильной связности (Тарьян без рекурсии)"""
+        count = len(self.declarations)
+        index = [None] * count
+        low = [0] * count
+        on_stack = [False] * count
+        component = [None] * count
+        scc_stack = []
+        components = []
+        counter = 0
         
-        elif isinstance(node, ConstDeclarationNode):
+        for root in range(count):
+            if index[root] is not None:
+                continue
+            work = [(root, iter(set(self.targets[root].values())))]
+            index[root] = low[root] = counter
+            counter += 1
+            scc_stack.append(root)
+            on_stack[root] = True
+            while work:
+                vertex, edges = work[-1]
+                for target in edges:
+                    if index[target] is None:
+                        index[target] = low[target] = counter
+                        counter += 1
+                        scc_stack.append(target)
+                        on_stack[target] = True
+                        work.append((target, iter(set(self.targets[target].values()))))
+                        break
+                    if on_stack[target]:
+                        low[vertex] = min(low[vertex], index[target])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[vertex])
+                    if low[vertex] == index[vertex]:
+                        members = []
+                        while True:
+                            member = scc_stack.pop()
+                            on_stack[member] = False
+                            component[member] = len(components)
+                            members.append(member)
+                            if member == vertex:
+                                break
+                        components.append(members)
+        
+        cycles = []
+        for number, members in enumerate(components):
+            start = min(members)
+            if len(members) == 1 and start not in self.targets[start].values():
+                continue
+            cycles.append((start, self._cycle_path(start, component, number)))
+        cycles.sort()
+        return [path for _, path in cycles]
+    
+    def _cycle_path(self, start: int, component: List[int], number: int) -> List[str]:
+        """Кратчайший путь по зависимостям от start обратно к start внутри компоненты"""
+        parents = {start: None}
+        queue = [start]
+        for vertex in queue:
+            for target in self.targets[vertex].values():
+                if target == start:
+                    path = []
+                    while vertex is not None:
+                        path.append(self.declarations[vertex].name)
+                        vertex = parents[vertex]
+                    path.reverse()
+                    return path + [self.declarations[start].name]
+                if component[target] == number and target not in parents:
+                    parents[target] = vertex
+                    queue.append(target)
+        return [self.declarations[start].name]
+
+class ConstantEvaluator:
+    def __init__(self, importer: Optional[Callable[[str], Dict[str, Any]]] = None):
+        self.constants: Dict[str, Any] = {}
+        # Загрузчик директив import: путь -> константы импортируемого файла
+        self.importer = importer
+        self.graph: Optional[ConstantGraph] = None
+        # Значения ссылок для объявления, вычисляемого по графу
+        self._scope: Optional[Dict[str, Any]] = None
+        self._outputs: List[Tuple[str, ASTNode]] = []
+        # Импортированные константы, еще не скопированные: имя -> общий объект кэша импортов
+        self._imported: Dict[str, Any] = {}
+        # Память deepcopy: общие объекты импортированных констант остаются общими и в копиях
+        self._copies: Dict[int, Any] = {}
+    
+    def evaluate_node(self, node: ASTNode) -> Any:
+        """Вычисление значения узла AST
+        
+        Вложенные массивы и словари обходятся с явным стеком заданий
+        (узел, контейнер результата, позиция), слева направо, как и при
+        рекурсивном обходе.
+        """
+        if isinstance(node, ConstDeclarationNode):
             # Вычисляем значение константы
             value = self.evaluate_node(node.value)
             self.constants[node.name] = value
             return None  # Объявления констант не возвращают значения
         
-        else:
-            raise ValueError(f"Неизвестный тип узла: {type(node)}")
+        root = [None]
+        stack = [(node, root, 0)]
+        
+        while stack:
+            node, target, slot = stack.pop()
+            
+            if isinstance(node, NumberNode):
+                target[slot] = node.value
+            
+            elif isinstance(node, ConstReferenceNode):
+                target[slot] = self.evaluate_constant_reference(node.name)
+            
+            elif isinstance(node, PackedArrayNode):
+                # Упаковка — внутреннее представление AST: результат всегда list
+                target[slot] = node.values.tolist()
+            
+            elif isinstance(node, ArrayNode):
+                result = [None] * len(node.elements)
+                target[slot] = result
+                for index in range(len(node.elements) - 1, -1, -1):
+                    stack.append((node.elements[index], result, index))
+            
+            elif isinstance(node, DictNode):
+                result = {}
+                # Ключи заводятся заранее, чтобы сохранить порядок записей
+                for entry in node.entries:
+                    result[entry.key] = None
+                target[slot] = result
+                for entry in reversed(node.entries):
+                    stack.append((entry.value, result, entry.key))
+            
+            else:
+                raise ValueError(f"Неизвестный тип узла: {type(node)}")
+        
+        return root[0]
     
     def evaluate_constant_reference(self, name: str) -> Any:
-        """Вычисление ссылки на константу с проверкой циклов"""
-        if name in self.visited:
-            raise RuntimeError(f"Циклическая зависимость констант: {name}")
-        
+        """Значение константы: разрешенное графом для текущего объявления или итоговое"""
+        if self._scope is not None and name in self._scope:
+            return self._scope[name]
         if name not in self.constants:
             raise NameError(f"Неопределенная константа: {name}")
+        value = self.constants[name]
+        if self._imported and self._imported.get(name) is value:
+            # Значения из кэша импортов общие для процесса: конвертация получает свою копию
+            del self._imported[name]
+            value = self.constants[name] = copy.deepcopy(value, self._copies)
+        return value
+    
+    def evaluate_graph(self, graph: ConstantGraph, values: Optional[List[Any]] = None,
+                       dirty: Optional[Set[int]] = None) -> List[Any]:
+        """Вычисление объявлений графа в топологическом порядке, каждое один раз
+        
+        values — ранее вычисленные значения вершин; при заданном dirty
+        пересчитываются только эти вершины, остальные берутся из values.
+        Возвращает значения всех вершин.
+        """
+        graph.check(self.constants)
+        values = list(values) if values is not None else [None] * len(graph.declarations)
+        try:
+            for vertex in graph.order:
+                if dirty is not None and vertex not in dirty:
+                    continue
+                self._scope = {name: values[target]
+                               for name, target in graph.targets[vertex].items()}
+                values[vertex] = self.evaluate_node(graph.declarations[vertex].value)
+        finally:
+            self._scope = None
+        for name, vertex in graph.latest.items():
+            self.constants[name] = values[vertex]
+        return values
+    
+    def import_constants(self, nodes: List[ASTNode]):
+        """Константы файлов из директив import в порядке текста; свои объявления их перекрывают
+        
+        Значения копируются при первом обращении к константе, а не при
+        импорте: файл обычно использует малую часть импортированного.
+        """
+        for node in nodes:
+            if isinstance(node, ImportNode):
+                if self.importer is None:
+                    raise ImportError(f"Импорт недоступен без загрузчика: {node.path}")
+                imported = self.importer(node.path)
+                self.constants.update(imported)
+                self._imported.update(imported)
+    
+    def evaluate_constants(self, nodes: List[ASTNode]) -> Dict[str, Any]:
+        """Импорт и вычисление констант по графу зависимостей без значений верхнего уровня"""
+        self.import_constants(nodes)
+        declarations = [node for node in nodes if isinstance(node, ConstDeclarationNode)]
+        self.graph = ConstantGraph(declarations)
+        self.evaluate_graph(self.graph)
+        return self.constants
+    
+    def evaluate_referenced(self, nodes: List[ASTNode], names: Iterable[str]) -> Dict[str, Any]:
+        """Вычисление только тех констант, от которых транзитивно зависят имена names
+        
+        Импорты загружаются, лишь если нужное имя не объявлено в самом
+        файле. Неопределенные константы и циклы проверяются только среди
+        нужных объявлений: ошибки в остальных не мешают.
+        """
+        declarations = [node for node in nodes if isinstance(node, ConstDeclarationNode)]
+        self.graph = graph = ConstantGraph(declarations)
+        names = list(names)
+        needed = graph.dependencies(graph.latest[name] for name in names if name in graph.latest)
         
-        self.visited.add(name)
+        missing = [name for name in names if name not in graph.latest]
+        missing += [name for vertex, name in graph.undefined if vertex in needed]
+        if missing:
+            self.import_constants(nodes)
+            for name in missing:
+                if name not in self.constants:
+                    raise NameError(f"Неопределенная константа: {name}")
+        
+        blocked = {declarations[vertex].name for vertex in needed.difference(graph.order)}
+        if blocked:
+            paths = '; '.join(' -> '.join(path) for path in graph.cycles if blocked.intersection(path))
+            raise RuntimeError(f"Циклическая зависимость констант: {paths}")
+        
+        values: List[Any] = [None] * len(declarations)
         try:
-            value = self.constants[name]
-            # Если значение ещё не вычислено (если это AST узел)
-            if isinstance(value, ASTNode):
-                value = self.evaluate_node(value)
-                self.constants[name] = value
-            return value
+            for vertex in graph.order:
+                if vertex in needed:
+                    self._scope = {name: values[target]
+                                   for name, target in graph.targets[vertex].items()}
+                    values[vertex] = self.evaluate_node(declarations[vertex].value)
         finally:
-            self.visited.remove(name)
+            self._scope = None
+        for name, vertex in graph.latest.items():
+            if vertex in needed:
+                self.constants[name] = values[vertex]
+        return self.constants
     
     def evaluate_all(self, nodes: List[ASTNode]) -> Dict[str, Any]:
         """Вычисление всех узлов и возврат конечных значений"""
-        # Сначала обрабатываем объявления констант
-        for node in nodes:
-            if isinstance(node, ConstDeclarationNode):
-                self.evaluate_node(node)
+        # Сначала вычисляем константы по графу зависимостей
+        self.evaluate_constants(nodes)
         
         # Затем вычисляем все остальные значения
         results = {}
+        self._outputs = []
         for node in nodes:
-            if not isinstance(node, ConstDeclarationNode):
+            if not isinstance(node, (ConstDeclarationNode, ImportNode)):
                 # Для словарей собираем все пары ключ-значение
                 if isinstance(node, DictNode):
                     for entry in node.entries:
                         results[entry.key] = self.evaluate_node(entry.value)
+                        self._outputs.append((entry.key, entry.value))
                 else:
                     # Для остальных узлов (если они есть на верхнем уровне)
                     value = self.evaluate_node(node)
                     if value is not None:
                         results['_result'] = value
+                        self._outputs.append(('_result', node))
         
         return results
+    
+    def affected_outputs(self, name: str) -> List[str]:
+        """Ключи результата evaluate_all, которые меняются при изменении константы name"""
+        if self.graph is None:
+            return []
+        names = self.graph.affected_names([name]) | {name}
+        keys = {}
+        for key, node in self._outputs:
+            if names.intersection(collect_references(node)):
+                keys[key] = None
+        return list(keys)
+    
+    def validate(self, nodes: List[ASTNode]) -> List[Exception]:
+        """Все ошибки разрешения констант без вычисления значений
+        
+        Каждая ссылка на неопределенную константу (в объявлении или в
+        значении верхнего уровня), каждый цикл и каждый неудачный импорт
+        дают отдельную ошибку.
+        """
+        errors: List[Exception] = []
+        for node in nodes:
+            if isinstance(node, ImportNode):
+                try:
+                    self.import_constants([node])
+                except Exception as e:
+                    errors.append(e)
+        declarations = [node for node in nodes if isinstance(node, ConstDeclarationNode)]
+        graph = ConstantGraph(declarations)
+        for vertex, name in graph.undefined:
+            if name not in self.constants:
+                errors.append(NameError(f"Неопределенная константа: {name} "
+                                        f"(в объявлении {declarations[vertex].name})"))
+        for path in graph.cycles:
+            errors.append(RuntimeError(f"Циклическая зависимость констант: {' -> '.join(path)}"))
+        
+        for node in nodes:
+            if isinstance(node, (ConstDeclarationNode, ImportNode)):
+                continue
+            if isinstance(node, DictNode):
+                values = [(f"в ключе {entry.key}", entry.value) for entry in node.entries]
+            else:
+                values = [("в значении верхнего уровня", node)]
+            for where, value in values:
+                for name in collect_references(value):
+                    if name not in graph.latest and name not in self.constants:
+                        errors.append(NameError(f"Неопределенная константа: {name} ({where})"))
+        return errors
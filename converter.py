@@ -1,69 +1,407 @@
+import hashlib
+import io
+import mmap
+import os
+import shutil
 import sys
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 from lexer import Lexer
-from parser import Parser
+from parser import ImportNode, Parser
 from constants import ConstantEvaluator
-from toml_generator import TOMLGenerator
+from toml_generator import GENERATOR_MODES, TOMLGenerator, generated_header
+
+if TYPE_CHECKING:
+    from cache import ConversionCache
+    from imports import ModuleCache
+    from stats import ConversionStats
+
+__version__ = '1.1.0'
+
+# Модули, от кода которых зависит результат конвертации
+_PIPELINE_MODULES = ('lexer', 'parser', 'constants', 'imports', 'parallel', 'toml_generator', 'converter')
+_code_version: Optional[str] = None
+
+def code_version() -> str:
+    """Версия кода конвертации для ключей кэша результатов
+    
+    Хэш исходников модулей конвейера вместе с __version__: любая правка
+    лексера, парсера, вычислителя или генератора меняет ключи, и кэш,
+    переживший обновление, не отдает результат прежнего кода.
+    """
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256(__version__.encode('utf-8'))
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for name in _PIPELINE_MODULES:
+            try:
+                with open(os.path.join(directory, f"{name}.py"), 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                # Без исходников (например, только .pyc) остается __version__
+                digest.update(name.encode('utf-8'))
+        _code_version = f"{__version__}+{digest.hexdigest()[:16]}"
+    return _code_version
+
+INPUT_MODES = ('text', 'mmap')
+
+class ConversionError(Exception):
+    """Ошибка конвертации; текст совпадает с сообщением CLI"""
 
 class ConfigConverter:
-    def __init__(self):
-        self.lexer = None
-        self.parser = None
-        self.evaluator = ConstantEvaluator()
-        self.generator = TOMLGenerator()
+    """Конвертер учебного языка в TOML
     
-    def convert_file(self, input_path: Path) -> str:
+    Экземпляр хранит только настройки: лексер, парсер, вычислитель и
+    генератор создаются на каждый вызов, поэтому один конвертер можно
+    использовать для множества конвертаций и из нескольких потоков.
+    """
+    
+    def __init__(self, engine: str = 'char', mode: str = 'tomlkit', input_mode: str = 'text',
+                 cache: Optional['ConversionCache'] = None, workers: int = 1,
+                 modules: Optional['ModuleCache'] = None, imports: bool = True):
+        if input_mode not in INPUT_MODES:
+            raise ValueError(f"Неизвестный режим чтения: {input_mode}")
+        # Отображенный в память файл разбирается только быстрым движком лексера
+        self.engine = 'fast' if input_mode == 'mmap' else engine
+        self.input_mode = input_mode
+        self.cache = cache
+        if mode not in GENERATOR_MODES:
+            raise ValueError(f"Неизвестный режим генератора: {mode}")
+        self.mode = mode
+        # Больше одного процесса: записи больших словарей верхнего уровня
+        # разбираются и вычисляются параллельно (parallel.evaluate_parallel)
+        self.workers = workers
+        # Кэш импортируемых файлов; по умолчанию общий для процесса
+        self.modules = modules
+        # False — директивы import запрещены (текст из недоверенного источника)
+        self.imports = imports
+    
+    def convert_file(self, input_path: Path, stats: Optional['ConversionStats'] = None) -> str:
         """Конвертация файла из учебного языка в TOML"""
         try:
-            # Чтение исходного файла
-            with open(input_path, 'r', encoding='utf-8') as f:
-                source = f.read()
-            
-            # Лексический анализ
-            self.lexer = Lexer(source)
-            tokens = self.lexer.tokenize()
-            
-            # Синтаксический анализ
-            self.parser = Parser(tokens)
-            ast_nodes = self.parser.parse()
+            return self.convert_path(input_path, stats)
+        except ConversionError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+    
+    def convert_path(self, input_path: Path, stats: Optional['ConversionStats'] = None) -> str:
+        """Конвертация файла в TOML с исключением ConversionError вместо выхода из процесса
+        
+        Если передан stats, в него записываются время и память по этапам.
+        """
+        try:
+            if self.cache is not None and stats is None:
+                return self._convert_path_cached(input_path)
             
-            # Вычисление констант и генерация TOML
-            toml_output = self.generator.generate_from_nodes(ast_nodes, self.evaluator)
+            # Чтение исходного файла
+            with self._open_source(input_path, stats) as source:
+                data = self._evaluate_source(source, stats, input_path)
             
-            return toml_output
+            # Генерация TOML
+            with _stage(stats, 'generate'):
+                return TOMLGenerator(mode=self.mode).generate(data)
+        
+        except Exception as e:
+            raise ConversionError(describe_error(e, input_path)) from e
+    
+    def validate(self, input_path: Path) -> List[str]:
+        """Проверка файла без генерации TOML: список всех найденных ошибок
+        
+        Выполняются лексический и синтаксический анализ и разрешение ссылок
+        на константы. Разбор идет в режиме восстановления и собирает все
+        синтаксические ошибки; ошибки констант проверяются, только если
+        синтаксических нет. Пустой список означает, что файл корректен.
+        """
+        try:
+            with self._open_source(input_path) as source:
+                lexer = Lexer(source, engine=self.engine, recover=True)
+                parser = Parser(lexer.iter_tokens(), recover=True, errors=lexer.errors)
+                ast_nodes = parser.parse()
+        except Exception as e:
+            return [describe_error(e, input_path)]
+        if parser.errors:
+            return [describe_error(e, input_path) for e in parser.errors]
+        evaluator = ConstantEvaluator(self._importer(input_path))
+        return [describe_error(e, input_path) for e in evaluator.validate(ast_nodes)]
+    
+    def convert_to_stream(self, input: Union[Path, str, TextIO], out_fp: TextIO,
+                          stats: Optional['ConversionStats'] = None):
+        """Конвертация файла (путь или файловый объект) с потоковой записью TOML в out_fp
+        
+        Исходник полностью вычисляется до начала записи, поэтому при ошибке
+        в out_fp ничего не попадает. Ошибки выбрасываются как ConversionError.
+        """
+        input_path = getattr(input, 'name', input)
+        try:
+            if hasattr(input, 'read'):
+                with _stage(stats, 'read'):
+                    source = input.read()
+                source_path = input_path if isinstance(input_path, str) else None
+                data = self._evaluate_source(source, stats, source_path)
+            elif self.cache is not None and stats is None:
+                self._convert_path_cached(input, out_fp)
+                return
+            else:
+                with self._open_source(input, stats) as source:
+                    data = self._evaluate_source(source, stats, input)
             
-        except FileNotFoundError:
-            print(f"Ошибка: файл {input_path} не найден", file=sys.stderr)
-            sys.exit(1)
-        except SyntaxError as e:
-            print(f"Синтаксическая ошибка: {e}", file=sys.stderr)
-            sys.exit(1)
-        except NameError as e:
-            print(f"Ошибка имени: {e}", file=sys.stderr)
-            sys.exit(1)
-        except RuntimeError as e:
-            print(f"Ошибка времени выполнения: {e}", file=sys.stderr)
-            sys.exit(1)
+            with _stage(stats, 'generate'):
+                TOMLGenerator(mode=self.mode).write(data, out_fp)
+        
         except Exception as e:
-            print(f"Неожиданная ошибка: {e}", file=sys.stderr)
-            sys.exit(1)
+            raise ConversionError(describe_error(e, input_path)) from e
+    
+    def convert_to_path(self, input_path: Path, output_path: Path,
+                        stats: Optional['ConversionStats'] = None):
+        """Потоковая запись результата во временный файл с атомарной заменой output_path"""
+        output_path = Path(output_path)
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                self.convert_to_stream(input_path, f, stats)
+            os.replace(tmp_path, output_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+    
+    def compile_to_path(self, input_path: Path, output_path: Path):
+        """Вычисление файла и запись значений в двоичном формате confc с атомарной заменой output_path"""
+        import confc
+        
+        output_path = Path(output_path)
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        try:
+            try:
+                with self._open_source(input_path) as source:
+                    data = self._evaluate_source(source, source_path=input_path)
+            except Exception as e:
+                raise ConversionError(describe_error(e, input_path)) from e
+            with open(tmp_path, 'wb') as f:
+                confc.dump(data, f)
+            os.replace(tmp_path, output_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+    
+    def get(self, input_path: Path, key: str) -> Any:
+        """Значение по пути ключей через точку (graphics.display.width) без конвертации всего файла
+        
+        Остальные записи пропускаются без построения AST, вычисляются только
+        найденное поддерево и константы, от которых оно зависит. Ошибки и
+        отсутствующий ключ выбрасываются как ConversionError.
+        """
+        from query import query, split_key
+        
+        split_key(key)
+        try:
+            with self._open_source(input_path) as source:
+                return query(source, key, self.engine, self._importer(input_path))
+        except Exception as e:
+            raise ConversionError(describe_error(e, input_path)) from e
+    
+    def imported_files(self, input_path: Path) -> List[str]:
+        """Абсолютные пути файлов, которые input_path импортирует (транзитивно)
+        
+        Загруженные импорты берутся из кэша modules. Если загрузка не
+        удалась, файлы находятся по тексту (imports.import_paths), включая
+        отсутствующие: после их исправления или появления зависящий файл
+        нужно конвертировать заново.
+        """
+        from imports import has_imports, import_paths
+        
+        files: List[Tuple[str, int]] = []
+        importer = self._importer(input_path, files)
+        if importer is None:
+            return []
+        try:
+            with self._open_source(input_path) as source:
+                if not has_imports(source, self.engine):
+                    return []
+                nodes = Parser(Lexer(source, engine=self.engine).iter_tokens()).parse()
+            for node in nodes:
+                if isinstance(node, ImportNode):
+                    importer(node.path)
+        except (OSError, SyntaxError, ValueError, ImportError):
+            return import_paths(input_path, self.engine)
+        return sorted({path for path, _ in files})
     
     def convert_string(self, source: str) -> str:
         """Конвертация строки из учебного языка в TOML"""
         try:
-            # Лексический анализ
-            self.lexer = Lexer(source)
-            tokens = self.lexer.tokenize()
-            
-            # Синтаксический анализ
-            self.parser = Parser(tokens)
-            ast_nodes = self.parser.parse()
-            
             # Вычисление констант и генерация TOML
-            toml_output = self.generator.generate_from_nodes(ast_nodes, self.evaluator)
-            
-            return toml_output
-            
+            return TOMLGenerator(mode=self.mode).generate(self._evaluate_source(source))
+        
         except Exception as e:
             raise ValueError(f"Ошибка конвертации: {e}")
+    
+    def convert_source(self, source: Union[str, bytes], input_path: Any = '<string>',
+                       stats: Optional['ConversionStats'] = None,
+                       source_path: Optional[Path] = None) -> str:
+        """Конвертация текста или байтов UTF-8 с исключением ConversionError
+        
+        source_path — файл, из которого прочитан source: импорты
+        разрешаются относительно его каталога.
+        """
+        try:
+            data = self._evaluate_source(source, stats, source_path)
+            with _stage(stats, 'generate'):
+                return TOMLGenerator(mode=self.mode).generate(data)
+        
+        except Exception as e:
+            raise ConversionError(describe_error(e, input_path)) from e
+    
+    def convert_many(self, sources: Iterable[str]) -> List[str]:
+        """Конвертация последовательности строк с одним генератором на весь вызов
+        
+        Результаты совпадают с convert_string для каждой строки; ошибка
+        сообщает номер исходника (с нуля).
+        """
+        generator = TOMLGenerator(mode=self.mode)
+        results = []
+        for index, source in enumerate(sources):
+            try:
+                results.append(generator.generate(self._evaluate_source(source)))
+            except Exception as e:
+                raise ValueError(f"Ошибка конвертации исходника {index}: {e}")
+        return results
+    
+    def _convert_path_cached(self, input_path, out_fp: Optional[TextIO] = None) -> Optional[str]:
+        """Конвертация через кэш, ключ которого — хэш исходных байтов
+        
+        Файл отображается в память: хэш и поиск импортов не копируют его,
+        а в режиме mmap по тому же буферу идет и разбор. Результат пишется
+        в кэш потоково и копируется из него в out_fp, а без out_fp
+        возвращается строкой. Строка заголовка со временем генерации
+        заменяется текущей, так что попадание не выдает старое время.
+        Файлы с импортами (по AST, см. has_imports) конвертируются без кэша
+        результатов: хэш не учитывает импортированные файлы (их разбор
+        кэшируется в modules).
+        """
+        from imports import has_imports
+        
+        generator = TOMLGenerator(mode=self.mode)
+        with self._map_source(input_path) as raw:
+            source = raw if self.input_mode == 'mmap' else str(raw, 'utf-8')
+            if has_imports(source, self.engine):
+                data = self._evaluate_source(source, source_path=input_path)
+                if out_fp is None:
+                    return generator.generate(data)
+                generator.write(data, out_fp)
+                return None
+            
+            key = self.cache.key(raw, code_version(), self.mode)
+            reader = self.cache.reader(key)
+            if reader is None:
+                data = self._evaluate_source(source, source_path=input_path)
+                with self.cache.writer(key) as f:
+                    generator.write(data, f)
+                # Запись могла быть сразу вытеснена при маленьком max_bytes
+                reader = self.cache.reader(key) or io.StringIO(generator.generate(data))
+        
+        with reader:
+            # Заголовок с временем генерации записи заменяется текущим
+            reader.readline()
+            header = f"# {generated_header()}\n"
+            if out_fp is None:
+                return header + reader.read()
+            out_fp.write(header)
+            shutil.copyfileobj(reader, out_fp)
+        return None
+    
+    @contextmanager
+    def _map_source(self, input_path) -> Iterator[Union[bytes, mmap.mmap]]:
+        """Байты файла, отображенные в память, без копирования; пустой файл — b''"""
+        with open(input_path, 'rb') as f:
+            # Пустой файл нельзя отобразить в память
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield buffer
+    
+    @contextmanager
+    def _open_source(self, input_path, stats: Optional['ConversionStats'] = None
+                     ) -> Iterator[Union[str, bytes, mmap.mmap]]:
+        """Исходный текст файла: строка или отображенный в память буфер
+        
+        В режиме mmap файл не копируется в str целиком: лексер разбирает
+        байты напрямую и декодирует только значения токенов.
+        """
+        if self.input_mode == 'text':
+            with open(input_path, 'r', encoding='utf-8') as f:
+                with _stage(stats, 'read'):
+                    source = f.read()
+                yield source
+            return
+        
+        with self._map_source(input_path) as buffer:
+            yield buffer
+    
+    def _importer(self, source_path: Optional[Path] = None, files: Optional[List[Tuple[str, int]]] = None):
+        """Загрузчик импортов файла source_path (None — текст без файла, импорты от текущего каталога)
+        
+        Пути разрешаются относительно каталога файла, а сам файл начинает
+        цепочку импортов, так что его импорт из импортированного файла —
+        цикл, а не повторный разбор. В files добавляются (путь, mtime_ns)
+        загруженных файлов. Без разрешения импортов — None.
+        """
+        if not self.imports:
+            return None
+        if self.modules is None:
+            from imports import default_modules
+            self.modules = default_modules()
+        if source_path is None:
+            return self.modules.importer(files=files)
+        source_path = os.path.abspath(source_path)
+        return self.modules.importer(os.path.dirname(source_path), (source_path,), files)
+    
+    def _evaluate_source(self, source: Union[str, bytes, mmap.mmap],
+                         stats: Optional['ConversionStats'] = None,
+                         source_path: Optional[Path] = None) -> Dict[str, Any]:
+        """Лексический и синтаксический анализ за один проход и вычисление констант
+        
+        Импорты разрешаются относительно каталога source_path — исходного файла.
+        """
+        importer = self._importer(source_path)
+        if stats is not None:
+            return self._evaluate_source_measured(source, stats, importer)
+        if self.workers > 1:
+            from parallel import evaluate_parallel
+            return evaluate_parallel(source, self.engine, self.workers, importer=importer)
+        ast_nodes = Parser(Lexer(source, engine=self.engine).iter_tokens()).parse()
+        return ConstantEvaluator(importer).evaluate_all(ast_nodes)
+    
+    def _evaluate_source_measured(self, source: Union[str, bytes, mmap.mmap],
+                                  stats: 'ConversionStats', importer=None) -> Dict[str, Any]:
+        """_evaluate_source с раздельным замером этапов: токены собираются в список до разбора"""
+        with stats.stage('lex'):
+            tokens = Lexer(source, engine=self.engine).tokenize()
+        stats.tokens += len(tokens)
+        with stats.stage('parse'):
+            ast_nodes = Parser(tokens).parse()
+        stats.count_nodes(ast_nodes)
+        evaluator = stats.evaluator(importer)
+        with stats.stage('evaluate'):
+            return evaluator.evaluate_all(ast_nodes)
+
+def _stage(stats: Optional['ConversionStats'], name: str):
+    """Замер этапа name в stats или пустой контекст без статистики"""
+    return nullcontext() if stats is None else stats.stage(name)
+
+def describe_error(error: Exception, input_path) -> str:
+    """Сообщение об ошибке конвертации в формате CLI"""
+    if isinstance(error, ImportError):
+        return f"Ошибка импорта: {error}"
+    elif isinstance(error, KeyError):
+        return f"Ошибка: ключ {error.args[0]} не найден в {input_path}"
+    elif isinstance(error, FileNotFoundError):
+        return f"Ошибка: файл {input_path} не найден"
+    elif isinstance(error, SyntaxError):
+        return f"Синтаксическая ошибка: {error}"
+    elif isinstance(error, NameError):
+        return f"Ошибка имени: {error}"
+    elif isinstance(error, RuntimeError):
+        return f"Ошибка времени выполнения: {error}"
+    else:
+        return f"Неожиданная ошибка: {error}"
@@ -0,0 +1,146 @@
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from lexer import Lexer
+from parser import ImportNode, Parser
+from constants import ConstantEvaluator
+
+class _Module:
+    """Вычисленные константы файла и версии всех файлов, от которых они зависят"""
+    __slots__ = ('constants', 'files')
+    
+    def __init__(self, constants: Dict[str, Any], files: List[Tuple[str, int]]):
+        self.constants = constants
+        # (путь, mtime_ns) самого файла и всех транзитивно импортированных
+        self.files = files
+    
+    def fresh(self) -> bool:
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime for path, mtime in self.files)
+        except OSError:
+            return False
+
+class ModuleCache:
+    """Кэш импортируемых файлов: каждый разбирается и вычисляется один раз
+    
+    Ключ — абсолютный путь; запись действительна, пока не изменилось время
+    модификации самого файла и всех импортированных им файлов. Кэш общий
+    для всех конвертаций процесса и безопасен при использовании из потоков.
+    """
+    
+    def __init__(self, engine: str = 'fast'):
+        self.engine = engine
+        self.hits = 0
+        self.misses = 0
+        self._modules: Dict[str, _Module] = {}
+        # Повторно входимая: загрузка файла загружает его импорты в том же потоке
+        self._lock = threading.RLock()
+    
+    def importer(self, base_dir: Optional[str] = None,
+                 chain: Tuple[str, ...] = (),
+                 files: Optional[List[Tuple[str, int]]] = None) -> Callable[[str], Mapping[str, Any]]:
+        """Загрузчик для ConstantEvaluator: пути разрешаются относительно base_dir
+        
+        Константы отдаются только для чтения: значения общие для всех
+        конвертаций процесса, и ConstantEvaluator копирует их при первом
+        обращении.
+        """
+        base_dir = base_dir if base_dir is not None else os.getcwd()
+        
+        def load(path: str) -> Mapping[str, Any]:
+            module = self.load(os.path.join(base_dir, path), chain)
+            if files is not None:
+                files.extend(module.files)
+            return MappingProxyType(module.constants)
+        
+        return load
+    
+    def load(self, path: str, chain: Tuple[str, ...] = ()) -> _Module:
+        """Константы файла path из кэша или после разбора; chain — цепочка импортирующих файлов"""
+        path = os.path.abspath(path)
+        if path in chain:
+            cycle = chain[chain.index(path):] + (path,)
+            raise ImportError(f"Циклический импорт: {' -> '.join(map(os.path.basename, cycle))}")
+        
+        with self._lock:
+            module = self._modules.get(path)
+            if module is not None and module.fresh():
+                self.hits += 1
+                return module
+            
+            self.misses += 1
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                with open(path, 'r', encoding='utf-8') as f:
+                    source = f.read()
+            except FileNotFoundError:
+                raise ImportError(f"Импортируемый файл не найден: {path}") from None
+            
+            files = [(path, mtime)]
+            evaluator = ConstantEvaluator(self.importer(os.path.dirname(path), chain + (path,), files))
+            try:
+                nodes = Parser(Lexer(source, engine=self.engine).iter_tokens()).parse()
+                module = _Module(evaluator.evaluate_constants(nodes), files)
+            except ImportError:
+                raise
+            except Exception as e:
+                raise ImportError(f"Ошибка в импортируемом файле {path}: {e}") from e
+            self._modules[path] = module
+            return module
+    
+    def clear(self):
+        with self._lock:
+            self._modules.clear()
+
+def has_imports(source, engine: str = 'fast') -> bool:
+    """Есть ли в тексте (str, bytes, mmap) директива import — по AST, как при конвертации
+    
+    Текст без слова import не разбирается: директивы в нем быть не может.
+    Текст с синтаксической ошибкой считается текстом с импортом, чтобы
+    его конвертация шла мимо кэша и сообщила ошибку как обычно.
+    """
+    if source.find('import' if isinstance(source, str) else b'import') < 0:
+        return False
+    try:
+        nodes = Parser(Lexer(source, engine=engine).iter_tokens()).parse()
+    except (SyntaxError, ValueError):
+        return True
+    return any(isinstance(node, ImportNode) for node in nodes)
+
+def import_paths(path: str, engine: str = 'fast') -> List[str]:
+    """Абсолютные пути файлов, транзитивно импортируемых файлом path, по тексту без вычисления
+    
+    Отсутствующие и синтаксически неверные файлы входят в список, но их
+    импорты не просматриваются; циклы не мешают.
+    """
+    found: List[str] = []
+    pending = [os.path.abspath(path)]
+    seen = set(pending)
+    while pending:
+        current = pending.pop()
+        try:
+            with open(current, 'r', encoding='utf-8') as f:
+                source = f.read()
+            if not has_imports(source, engine):
+                continue
+            nodes = Parser(Lexer(source, engine=engine).iter_tokens()).parse()
+        except (OSError, SyntaxError, ValueError):
+            continue
+        for node in nodes:
+            if isinstance(node, ImportNode):
+                target = os.path.abspath(os.path.join(os.path.dirname(current), node.path))
+                if target not in seen:
+                    seen.add(target)
+                    found.append(target)
+                    pending.append(target)
+    return found
+
+_default_modules: Optional[ModuleCache] = None
+
+def default_modules() -> ModuleCache:
+    """Общий кэш импортов процесса"""
+    global _default_modules
+    if _default_modules is None:
+        _default_modules = ModuleCache()
+    return _default_modules
@@ -0,0 +1,256 @@
+import re
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set
+from constants import ConstantEvaluator, ConstantGraph, collect_references
+from lexer import Lexer, TokenType
+from parser import ASTNode, DictNode, Parser
+
+_WORD_CHAR = re.compile(r'\w')
+
+class _Item:
+    """Элемент верхнего уровня с границами в исходном тексте
+    
+    kind: 'const' — объявление константы, 'import' — директива импорта,
+    'entry' — запись словаря верхнего уровня, 'value' — прочее значение
+    верхнего уровня.
+    """
+    __slots__ = ('kind', 'start', 'end', 'node', 'references', 'value')
+    
+    def __init__(self, kind: str, start: int, end: int, node: ASTNode):
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.node = node
+        self.references = collect_references(node)
+        self.value = None
+
+class EditResult:
+    """Что было перестроено при применении правки"""
+    __slots__ = ('full_reparse', 'reparsed', 'constants', 'entries')
+    
+    def __init__(self, full_reparse: bool, reparsed: int = 0,
+                 constants: Optional[List[str]] = None, entries: Optional[List[str]] = None):
+        self.full_reparse = full_reparse
+        self.reparsed = reparsed
+        self.constants = constants or []
+        self.entries = entries or []
+    
+    def __repr__(self):
+        return (f"EditResult(full_reparse={self.full_reparse}, reparsed={self.reparsed}, "
+                f"constants={self.constants}, entries={self.entries})")
+
+class IncrementalDocument:
+    """Документ с инкрементальным повторным разбором после правок
+    
+    Единицы повторного разбора — объявления констант, записи словарей
+    верхнего уровня и прочие значения верхнего уровня. Правка внутри одной
+    такой единицы переразбирает только ее текст, остальные поддеревья
+    переиспользуются. Повторно вычисляются только измененные единицы и те,
+    что (транзитивно) ссылаются на изменившиеся константы. Правка, задевающая
+    структуру вокруг единиц, приводит к полному разбору.
+    
+    Директивы import загружаются importer, как у ConstantEvaluator.
+    Импортированные файлы перечитываются только при полном разборе
+    (reparse, правка директивы): между ними правки видят те же константы.
+    """
+    
+    def __init__(self, source: str, importer: Optional[Callable[[str], Mapping[str, Any]]] = None):
+        self.source = source
+        self.items: List[_Item] = []
+        self.constants: Dict[str, Any] = {}
+        self.importer = importer
+        # Путь директивы -> константы, загруженные при последнем полном разборе
+        self._imports: Dict[str, Mapping[str, Any]] = {}
+        self._valid = False
+        self.reparse()
+    
+    @property
+    def result(self) -> Dict[str, Any]:
+        """Значения верхнего уровня, как у ConstantEvaluator.evaluate_all"""
+        results = {}
+        for item in self.items:
+            if item.kind == 'entry':
+                results[item.node.key] = item.value
+            elif item.kind == 'value':
+                if isinstance(item.node, DictNode):
+                    # Пустой словарь верхнего уровня не дает значений
+                    continue
+                if item.value is not None:
+                    results['_result'] = item.value
+        return results
+    
+    def reparse(self) -> EditResult:
+        """Полный разбор и вычисление текущего текста"""
+        self._valid = False
+        self._imports = {}
+        self.items = self._parse_items(self.source)
+        self._evaluate(changed=set(range(len(self.items))))
+        self._valid = True
+        return EditResult(True, reparsed=len(self.items),
+                          constants=[item.node.name for item in self.items if item.kind == 'const'],
+                          entries=[item.node.key for item in self.items if item.kind == 'entry'])
+    
+    def apply_edit(self, offset: int, removed: int, inserted: str) -> EditResult:
+        """Замена removed символов с позиции offset на inserted и обновление результата"""
+        if offset < 0 or removed < 0 or offset + removed > len(self.source):
+            raise ValueError(f"Правка вне текста: {offset}+{removed}")
+        
+        self.source = self.source[:offset] + inserted + self.source[offset + removed:]
+        delta = len(inserted) - removed
+        
+        index = self._find_item(offset, offset + removed) if self._valid else None
+        if index is None:
+            return self.reparse()
+        
+        item = self.items[index]
+        new_end = item.end + delta
+        new_node = self._reparse_item(item, new_end)
+        if new_node is None:
+            return self.reparse()
+        
+        old_name = item.node.name if item.kind == 'const' else None
+        self.items[index] = _Item(item.kind, item.start, new_end, new_node)
+        for later in self.items[index + 1:]:
+            later.start += delta
+            later.end += delta
+        
+        dirty_names = {old_name, new_node.name} if item.kind == 'const' else set()
+        dirty_names.discard(None)
+        self._valid = False
+        constants, entries = self._evaluate(changed={index}, dirty_names=dirty_names)
+        self._valid = True
+        return EditResult(False, reparsed=1, constants=constants, entries=entries)
+    
+    def _find_item(self, start: int, end: int) -> Optional[int]:
+        """Индекс единицы, целиком содержащей измененный участок"""
+        for index, item in enumerate(self.items):
+            if item.start <= start and end <= item.end:
+                return index
+            if item.start > start:
+                break
+        return None
+    
+    def _reparse_item(self, item: _Item, new_end: int) -> Optional[ASTNode]:
+        """Разбор текста одной единицы; None, если правка вышла за ее пределы"""
+        text = self.source[item.start:new_end]
+        # Комментарий может поглотить текст за пределами единицы,
+        # а символы слова на границе — слиться с соседними лексемами
+        if not text.strip() or "'" in text:
+            return None
+        before = self.source[item.start - 1:item.start] if item.start else ''
+        after = self.source[new_end:new_end + 1]
+        if (before and _WORD_CHAR.match(before) and _WORD_CHAR.match(text[0])) or \
+           (after and _WORD_CHAR.match(after) and _WORD_CHAR.match(text[-1])):
+            return None
+        
+        # Правка директивы импорта перечитывает импорты полным разбором
+        if item.kind == 'import':
+            return None
+        try:
+            parser = Parser(Lexer(text, engine='fast').iter_tokens())
+            if item.kind == 'const':
+                node = parser.parse_const_declaration()
+            elif item.kind == 'entry':
+                node = parser.parse_dict_entry()
+            else:
+                if ((parser.current_token.type == TokenType.IDENTIFIER and
+                        parser.stream.peek().type == TokenType.ASSIGN) or parser._at_import()):
+                    return None
+                node = parser.parse_value()
+                # Словарь верхнего уровня разбивается на записи только полным разбором
+                if isinstance(node, DictNode):
+                    return None
+            if parser.current_token.type != TokenType.EOF:
+                return None
+        except SyntaxError:
+            return None
+        return node
+    
+    def _parse_items(self, source: str) -> List[_Item]:
+        """Разбор текста на единицы верхнего уровня с их границами"""
+        tokens = Lexer(source, engine='fast').tokenize()
+        line_starts = [0] + [match.end() for match in re.finditer('\n', source)]
+        
+        def start_of(token):
+            return line_starts[token.line - 1] + token.column - 1
+        
+        parser = Parser(tokens)
+        
+        def end_of_consumed():
+            last = tokens[parser.pos - 1]
+            return start_of(last) + len(last.value)
+        
+        items = []
+        while parser.current_token.type != TokenType.EOF:
+            start = start_of(parser.current_token)
+            if (parser.current_token.type == TokenType.IDENTIFIER and
+                    parser.stream.peek().type == TokenType.ASSIGN):
+                node = parser.parse_const_declaration()
+                items.append(_Item('const', start, end_of_consumed(), node))
+            elif parser._at_import():
+                node = parser.parse_import()
+                items.append(_Item('import', start, end_of_consumed(), node))
+            elif parser.current_token.type == TokenType.DICT_START:
+                # Записи словаря верхнего уровня становятся отдельными единицами
+                parser.eat(TokenType.DICT_START)
+                entries = []
+                if parser.current_token.type != TokenType.DICT_END:
+                    while True:
+                        entry_start = start_of(parser.current_token)
+                        entry = parser.parse_dict_entry()
+                        entries.append(_Item('entry', entry_start, end_of_consumed(), entry))
+                        if parser.current_token.type != TokenType.DOT:
+                            break
+                        parser.eat(TokenType.DOT)
+                parser.eat(TokenType.DICT_END)
+                if entries:
+                    items.extend(entries)
+                else:
+                    items.append(_Item('value', start, end_of_consumed(), DictNode([])))
+            else:
+                node = parser.parse_value()
+                items.append(_Item('value', start, end_of_consumed(), node))
+        return items
+    
+    def _evaluate(self, changed: Set[int], dirty_names: Optional[Set[str]] = None):
+        """Вычисление измененных единиц и зависящих от изменившихся констант
+        
+        Константы вычисляются по графу зависимостей ConstantGraph, как в
+        ConstantEvaluator.evaluate_all; неизмененные берут сохраненное значение.
+        """
+        dirty_names = set(dirty_names or ())
+        declarations = [(index, item) for index, item in enumerate(self.items) if item.kind == 'const']
+        graph = ConstantGraph([item.node for _, item in declarations],
+                              [item.references for _, item in declarations])
+        seeds = [vertex for vertex, (index, item) in enumerate(declarations)
+                 if index in changed or dirty_names.intersection(item.references)]
+        dirty = graph.reachable(seeds)
+        
+        evaluator = ConstantEvaluator(self._import if self.importer is not None else None)
+        evaluator.import_constants([item.node for item in self.items if item.kind == 'import'])
+        values = evaluator.evaluate_graph(graph, [item.value for _, item in declarations], dirty)
+        constants = []
+        for vertex in sorted(dirty):
+            item = declarations[vertex][1]
+            item.value = values[vertex]
+            dirty_names.add(item.node.name)
+            constants.append(item.node.name)
+        
+        entries = []
+        for index, item in enumerate(self.items):
+            if item.kind in ('const', 'import'):
+                continue
+            if index in changed or dirty_names.intersection(item.references):
+                value_node = item.node.value if item.kind == 'entry' else item.node
+                item.value = evaluator.evaluate_node(value_node)
+                if item.kind == 'entry':
+                    entries.append(item.node.key)
+        
+        self.constants = evaluator.constants
+        return constants, entries
+    
+    def _import(self, path: str) -> Mapping[str, Any]:
+        """Константы импортируемого файла, загруженные при последнем полном разборе"""
+        constants = self._imports.get(path)
+        if constants is None:
+            constants = self._imports[path] = self.importer(path)
+        return constants
@@ -1,6 +1,8 @@
 import re
+from collections import deque
 from enum import Enum
-from typing import List, Tuple, Optional
+from mmap import mmap
+from typing import Iterable, Iterator, List, Tuple, Optional, Union
 
 class TokenType(Enum):
     COMMENT = 'COMMENT'
@@ -21,6 +23,8 @@ class TokenType(Enum):
     EOF = 'EOF'
 
 class Token:
+    __slots__ = ('type', 'value', 'line', 'column')
+    
     def __init__(self, type: TokenType, value: str, line: int, column: int):
         self.type = type
         self.value = value
@@ -30,13 +34,178 @@ class Token:
     def __repr__(self):
         return f"Token({self.type}, '{self.value}', {self.line}:{self.column})"
 
+# Мастер-шаблон быстрого движка: пропуск пробелов и комментариев, затем
+# одна альтернатива на каждый вид лексемы. Порядок альтернатив важен:
+# многосимвольные операторы проверяются раньше MISMATCH.
+_MASTER_PATTERN = re.compile(r"""
+    (?:\s+|'[^\n]*)*
+    (?:
+        (?P<NUMBER>[1-9]\d*)
+      | (?P<IDENTIFIER>[^\W\d]\w*)
+      | (?P<CONST_START>\?\()
+      | (?P<ARRAY_START><<)
+      | (?P<ARRAY_END>>>)
+      | (?P<ASSIGN>:=)
+      | (?P<ARROW>->)
+      | (?P<DICT_START>\{)
+      | (?P<DICT_END>\})
+      | (?P<DOT>\.)
+      | (?P<SEMICOLON>;)
+      | (?P<COMMA>,)
+      | (?P<CONST_END>\))
+      | (?P<STRING>"[^"\n]*")
+      | (?P<EOF>\Z)
+      | (?P<MISMATCH>.)
+    )
+""", re.VERBOSE | re.DOTALL)
+
+# Тот же шаблон для байтового буфера (bytes, mmap). Байты >= 0x80 относятся
+# к идентификатору или продолжают число (не-ASCII цифры вроде '٣'); такие
+# участки декодируются и доразбираются _scan_text, чтобы не-ASCII буквы,
+# цифры и пробелы обрабатывались как в текстовом режиме.
+_MASTER_PATTERN_BYTES = re.compile(rb"""
+    (?:[\s\x1c-\x1f]+|'[^\n]*)*
+    (?:
+        (?P<NUMBER>[1-9][0-9]*(?:[\x80-\xff][A-Za-z0-9_\x80-\xff]*)?)
+      | (?P<IDENTIFIER>[A-Za-z_\x80-\xff][A-Za-z0-9_\x80-\xff]*)
+      | (?P<CONST_START>\?\()
+      | (?P<ARRAY_START><<)
+      | (?P<ARRAY_END>>>)
+      | (?P<ASSIGN>:=)
+      | (?P<ARROW>->)
+      | (?P<DICT_START>\{)
+      | (?P<DICT_END>\})
+      | (?P<DOT>\.)
+      | (?P<SEMICOLON>;)
+      | (?P<COMMA>,)
+      | (?P<CONST_END>\))
+      | (?P<STRING>"[^"\n]*")
+      | (?P<EOF>\Z)
+      | (?P<MISMATCH>.)
+    )
+""", re.VERBOSE | re.DOTALL)
+
+_GROUP_TYPES = {token_type.name: token_type for token_type in TokenType}
+
+def _scan_text(text: str, line: int = 1, line_start: int = 0,
+               errors: Optional[List[SyntaxError]] = None):
+    """Сканирование строки мастер-шаблоном
+    
+    Выдает токены без EOF и возвращает (строка, столбец) конца текста.
+    Отрицательный line_start сдвигает столбцы первой строки. Если задан
+    errors, неизвестные символы записываются туда и пропускаются.
+    """
+    match_at = _MASTER_PATTERN.match
+    count = text.count
+    group_types = _GROUP_TYPES
+    pos = 0
+    
+    while True:
+        match = match_at(text, pos)
+        kind = match.lastgroup
+        start, end = match.span(kind)
+        # Позиция вычисляется только по пропущенному участку перед токеном
+        if start != pos:
+            newlines = count('\n', pos, start)
+            if newlines:
+                line += newlines
+                line_start = text.rindex('\n', pos, start) + 1
+        pos = end
+        
+        if kind == 'EOF':
+            return line, pos - line_start + 1
+        
+        value = text[start:end]
+        # \w шире str.isalpha(): символы вроде '²' не начинают идентификатор
+        if kind == 'IDENTIFIER' and not (value[0].isalpha() or value[0] == '_'):
+            kind = 'MISMATCH'
+            value = value[0]
+        if kind == 'MISMATCH':
+            error = SyntaxError(
+                f"Неизвестный символ: '{value}' в {line}:{start - line_start + 1}"
+            )
+            if errors is None:
+                raise error
+            errors.append(error)
+            pos = start + 1
+            continue
+        yield Token(group_types[kind], value, line, start - line_start + 1)
+
+def _char_length(segment: bytes) -> int:
+    """Длина участка UTF-8 в символах"""
+    if segment.isascii():
+        return len(segment)
+    return len(segment.decode('utf-8', 'replace'))
+
+def _scan_bytes(buffer, errors: Optional[List[SyntaxError]] = None):
+    """Сканирование байтового буфера; декодируются только значения токенов
+    
+    Столбцы считаются в символах, как в текстовом режиме.
+    Выдает токены без EOF и возвращает (строка, столбец) конца буфера.
+    """
+    match_at = _MASTER_PATTERN_BYTES.match
+    group_types = _GROUP_TYPES
+    line = 1
+    pos = 0
+    # Последняя позиция в текущей строке с известным столбцом
+    base_pos = 0
+    base_column = 1
+    
+    while True:
+        match = match_at(buffer, pos)
+        kind = match.lastgroup
+        start, end = match.span(kind)
+        if start != pos:
+            skipped = buffer[pos:start]
+            newline = skipped.rfind(b'\n')
+            if newline >= 0:
+                line += skipped.count(b'\n')
+                base_pos = pos + newline + 1
+                base_column = 1
+        column = base_column + _char_length(buffer[base_pos:start])
+        base_pos, base_column = start, column
+        pos = end
+        
+        if kind == 'EOF':
+            return line, column
+        
+        raw = buffer[start:end]
+        if not raw.isascii():
+            # Не-ASCII участок разбирается текстовым шаблоном
+            word = raw.decode('utf-8')
+            yield from _scan_text(word, line, 1 - column, errors)
+            base_pos, base_column = end, column + len(word)
+            continue
+        
+        value = raw.decode('ascii')
+        if kind == 'MISMATCH':
+            error = SyntaxError(f"Неизвестный символ: '{value}' в {line}:{column}")
+            if errors is None:
+                raise error
+            errors.append(error)
+            continue
+        yield Token(group_types[kind], value, line, column)
+
+LEXER_ENGINES = ('char', 'fast')
+
 class Lexer:
-    def __init__(self, text: str):
+    def __init__(self, text: Union[str, bytes, mmap], engine: str = 'char',
+                 recover: bool = False):
+        if engine not in LEXER_ENGINES:
+            raise ValueError(f"Неизвестный движок лексера: {engine}")
+        # Байтовый буфер (bytes, mmap) в UTF-8 быстрый движок разбирает напрямую
+        if not isinstance(text, str) and engine == 'char':
+            text = bytes(text).decode('utf-8')
         self.text = text
+        self.engine = engine
         self.pos = 0
         self.line = 1
         self.column = 1
         self.current_char = self.text[0] if text else None
+        self._fast_scanner = None
+        # В режиме восстановления неизвестные символы пропускаются, а ошибки
+        # копятся в errors (его же можно передать в Parser(errors=...))
+        self.errors: Optional[List[SyntaxError]] = [] if recover else None
         
     def advance(self):
         """Перемещаемся к следующему символу"""
@@ -74,8 +243,9 @@ class Lexer:
             result += self.current_char
             self.advance()
             
-            # Последующие цифры
-            while self.current_char and self.current_char.isdigit():
+            # Последующие цифры: десятичные, как \d быстрого движка и int();
+            # isdigit() пропустил бы надстрочные '²', которые int() не разбирает
+            while self.current_char and self.current_char.isdecimal():
                 result += self.current_char
                 self.advance()
                 
@@ -100,6 +270,14 @@ class Lexer:
         else:
             raise SyntaxError(f"Ожидался идентификатор в {self.line}:{start_col}")
     
+    def string(self, end: int) -> Token:
+        """Чтение строки в кавычках; end — позиция закрывающей кавычки"""
+        start_col = self.column
+        result = self.text[self.pos:end + 1]
+        while self.pos <= end:
+            self.advance()
+        return Token(TokenType.STRING, result, self.line, start_col)
+    
     def peek(self, n: int = 1) -> Optional[str]:
         """Заглядываем вперед на n символов"""
         peek_pos = self.pos + n
@@ -109,6 +287,11 @@ class Lexer:
     
     def get_next_token(self) -> Token:
         """Получение следующего токена"""
+        if self.engine == 'fast':
+            if self._fast_scanner is None:
+                self._fast_scanner = self._scan_fast()
+            return next(self._fast_scanner)
+        
         while self.current_char is not None:
             # Пропускаем пробелы
             if self.current_char.isspace():
@@ -129,6 +312,12 @@ class Lexer:
             if self.current_char.isalpha() or self.current_char == '_':
                 return self.identifier()
             
+            # Строка в двойных кавычках до конца строки текста (путь в import)
+            if self.current_char == '"':
+                end = self.text.find('"', self.pos + 1)
+                if end >= 0 and '\n' not in self.text[self.pos + 1:end]:
+                    return self.string(end)
+            
             # Многобуквенные операторы
             if self.current_char == '?':
                 if self.peek() == '(':
@@ -188,12 +377,48 @@ class Lexer:
                 self.advance()
                 return Token(TokenType.CONST_END, char, self.line, start_col)
             else:
-                raise SyntaxError(f"Неизвестный символ: '{char}' в {self.line}:{start_col}")
+                error = SyntaxError(f"Неизвестный символ: '{char}' в {self.line}:{start_col}")
+                if self.errors is None:
+                    raise error
+                self.errors.append(error)
+                self.advance()
         
         return Token(TokenType.EOF, '', self.line, self.column)
     
+    def _scan_fast(self) -> Iterator[Token]:
+        """Сканирование мастер-шаблоном; строка и столбец считаются по переводам строк"""
+        if isinstance(self.text, str):
+            end = yield from _scan_text(self.text, errors=self.errors)
+        else:
+            end = yield from _scan_bytes(self.text, self.errors)
+        
+        self.pos = len(self.text)
+        self.line, self.column = end
+        while True:
+            yield Token(TokenType.EOF, '', self.line, self.column)
+    
+    def iter_tokens(self) -> Iterator[Token]:
+        """Ленивая выдача токенов до EOF включительно"""
+        if self.engine == 'fast':
+            scanner = self._scan_fast()
+        else:
+            scanner = iter(self.get_next_token, None)
+        
+        for token in scanner:
+            yield token
+            if token.type == TokenType.EOF:
+                return
+    
     def tokenize(self) -> List[Token]:
         """Получение всех токенов"""
+        if self.engine == 'fast':
+            tokens = []
+            for token in self._scan_fast():
+                tokens.append(token)
+                if token.type == TokenType.EOF:
+                    break
+            return tokens
+        
         tokens = []
         while True:
             token = self.get_next_token()
@@ -201,3 +426,33 @@ class Lexer:
             if token.type == TokenType.EOF:
                 break
         return tokens
+
+class TokenStream:
+    """Поток токенов с ограниченным буфером заглядывания вперед"""
+    
+    def __init__(self, tokens: Iterable[Token], lookahead: int = 2):
+        self._tokens = iter(tokens)
+        self._buffer: deque = deque()
+        self._lookahead = lookahead
+        self._eof: Optional[Token] = None
+    
+    def peek(self, n: int = 0) -> Token:
+        """Токен на n позиций впереди текущего, не потребляя его"""
+        if n >= self._lookahead:
+            raise ValueError(f"Заглядывание на {n} превышает буфер {self._lookahead}")
+        
+        while len(self._buffer) <= n:
+            if self._eof is not None:
+                return self._eof
+            token = next(self._tokens)
+            if token.type == TokenType.EOF:
+                self._eof = token
+            self._buffer.append(token)
+        return self._buffer[n]
+    
+    def next(self) -> Token:
+        """Потребление текущего токена"""
+        token = self.peek()
+        if self._buffer:
+            self._buffer.popleft()
+        return token
@@ -0,0 +1,173 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from lexer import Lexer, TokenType
+from parser import ConstDeclarationNode, DictNode, ImportNode, Parser
+from constants import ConstantEvaluator
+
+# Предварительный просмотр видит только скобки, разделители записей,
+# присваивания, строки и комментарии; порядок альтернатив как у лексера:
+# '->' раньше '>>'
+_PRESCAN = re.compile(r"'[^\n]*|\"[^\"\n]*\"|->|:=|<<|>>|[{};.]")
+# Пробелы и комментарии между ':=' и значением
+_GAP = re.compile(r"(?:\s+|'[^\n]*)*")
+_CLOSERS = {'}': '{', '>>': '<<'}
+
+# Меньше записей разбирается последовательно: запуск пула дороже выигрыша
+MIN_ENTRIES = 1000
+
+class _Segment:
+    """Словарь верхнего уровня: границы в тексте и позиции точек между записями"""
+    __slots__ = ('start', 'end', 'dots')
+    
+    def __init__(self, start: int):
+        self.start = start
+        self.end = start
+        self.dots: List[int] = []
+    
+    @property
+    def entries(self) -> int:
+        return len(self.dots) + 1 if self.end - self.start > 2 else 0
+
+def prescan(text: str) -> Optional[List[_Segment]]:
+    """Словари верхнего уровня (кроме значений объявлений) по глубине скобок
+    
+    Значение объявления — словарь, перед которым на верхнем уровне стоит
+    ':='. Возвращает None, если скобки не сбалансированы: такой текст
+    разбирается последовательно, чтобы ошибка совпала с обычной.
+    """
+    segments: List[_Segment] = []
+    stack: List[str] = []
+    assign_end = -1
+    
+    for match in _PRESCAN.finditer(text):
+        value = match.group()
+        if value[0] in "'\"" or value == '->':
+            continue
+        if value == '{' or value == '<<':
+            if not stack and value == '{':
+                declared = assign_end >= 0 and _GAP.match(text, assign_end).end() == match.start()
+                current = _Segment(match.start())
+                if not declared:
+                    segments.append(current)
+            stack.append(value)
+        elif value == '}' or value == '>>':
+            if not stack or stack.pop() != _CLOSERS[value]:
+                return None
+            if not stack and value == '}':
+                current.end = match.end()
+        elif value == '.' and len(stack) == 1 and stack[0] == '{':
+            current.dots.append(match.start())
+        elif value == ':=' and not stack:
+            assign_end = match.end()
+    
+    if stack:
+        return None
+    return segments
+
+Importer = Optional[Callable[[str], Dict[str, Any]]]
+
+def evaluate_serial(source, engine: str = 'fast', importer: Importer = None) -> Dict[str, Any]:
+    """Обычный путь: разбор и вычисление в одном процессе"""
+    ast_nodes = Parser(Lexer(source, engine=engine).iter_tokens()).parse()
+    return ConstantEvaluator(importer).evaluate_all(ast_nodes)
+
+def evaluate_parallel(source, engine: str = 'fast', workers: Optional[int] = None,
+                      min_entries: int = MIN_ENTRIES, importer: Importer = None) -> Dict[str, Any]:
+    """Разбор и вычисление записей словарей верхнего уровня в пуле процессов
+    
+    Константы и остальные элементы разбираются и вычисляются в текущем
+    процессе по тексту, где тела словарей заменены пробелами (позиции не
+    меняются). Записи делятся на непрерывные участки текста, которые
+    процессы пула разбирают и вычисляют с уже вычисленными константами.
+    Результаты собираются в порядке исходного текста. При любой ошибке
+    текст разбирается последовательно, поэтому результат и ошибки
+    совпадают с evaluate_serial.
+    """
+    workers = workers or os.cpu_count() or 1
+    if not isinstance(source, str):
+        source = bytes(source).decode('utf-8')
+    segments = prescan(source) if workers > 1 else None
+    if not segments or sum(segment.entries for segment in segments) < min_entries:
+        return evaluate_serial(source, engine, importer)
+    
+    try:
+        return _evaluate_segments(source, segments, engine, workers, importer)
+    except Exception:
+        return evaluate_serial(source, engine, importer)
+
+def _evaluate_segments(source: str, segments: List[_Segment], engine: str, workers: int,
+                       importer: Importer) -> Dict[str, Any]:
+    # Каркас: тела словарей заменены пробелами с сохранением переводов строк
+    parts = []
+    position = 0
+    for segment in segments:
+        body = source[segment.start + 1:segment.end - 1]
+        parts.append(source[position:segment.start + 1])
+        parts.append(re.sub(r'[^\n]', ' ', body))
+        position = segment.end - 1
+    parts.append(source[position:])
+    skeleton = Parser(Lexer(''.join(parts), engine=engine).iter_tokens()).parse()
+    
+    placeholders = [node for node in skeleton if isinstance(node, DictNode)]
+    if len(placeholders) != len(segments) or any(node.entries for node in placeholders):
+        raise ValueError("Каркас не совпадает со словарями предварительного просмотра")
+    evaluator = ConstantEvaluator(importer)
+    evaluator.evaluate_constants([node for node in skeleton
+                                  if isinstance(node, (ConstDeclarationNode, ImportNode))])
+    
+    # Непрерывные участки записей, примерно по четыре на процесс
+    tasks = []
+    owners = []
+    target = max(1, sum(segment.entries for segment in segments) // (workers * 4))
+    for number, segment in enumerate(segments):
+        bounds = [segment.start] + segment.dots + [segment.end - 1]
+        for first in range(0, segment.entries, target):
+            last = min(first + target, segment.entries)
+            tasks.append((source[bounds[first] + 1:bounds[last]], last - first))
+            owners.append(number)
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(evaluator.constants, engine)) as executor:
+        chunks = list(executor.map(_evaluate_chunk, tasks,
+                                   chunksize=max(1, len(tasks) // (workers * 4))))
+    
+    entries: List[List[Tuple[str, Any]]] = [[] for _ in segments]
+    for number, pairs in zip(owners, chunks):
+        entries[number].extend(pairs)
+    
+    # Слияние в порядке элементов верхнего уровня, как в evaluate_all
+    results = {}
+    placeholder = iter(entries)
+    for node in skeleton:
+        if isinstance(node, (ConstDeclarationNode, ImportNode)):
+            continue
+        if isinstance(node, DictNode):
+            for key, value in next(placeholder):
+                results[key] = value
+        else:
+            value = evaluator.evaluate_node(node)
+            if value is not None:
+                results['_result'] = value
+    return results
+
+_worker_constants: Dict[str, Any] = {}
+_worker_engine = 'fast'
+
+def _init_worker(constants: Dict[str, Any], engine: str):
+    """Константы передаются в процесс пула один раз"""
+    global _worker_constants, _worker_engine
+    _worker_constants = constants
+    _worker_engine = engine
+
+def _evaluate_chunk(task: Tuple[str, int]) -> List[Tuple[str, Any]]:
+    """Разбор участка записей как словаря и вычисление значений записей"""
+    text, count = task
+    parser = Parser(Lexer('{' + text + '\n}', engine=_worker_engine).iter_tokens())
+    node = parser.parse_value()
+    if parser.current_token.type != TokenType.EOF or len(node.entries) != count:
+        raise SyntaxError("Участок записей разобран не так, как в целом словаре")
+    evaluator = ConstantEvaluator()
+    evaluator.constants = _worker_constants
+    return [(entry.key, evaluator.evaluate_node(entry.value)) for entry in node.entries]
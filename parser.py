@@ -1,10 +1,13 @@
-from typing import Dict, List, Any, Union
-from lexer import Token, TokenType, Lexer
+from array import array
+from typing import Dict, Iterable, List, Any, Optional, Union
+from lexer import Token, TokenType, TokenStream, Lexer
 
 class ASTNode:
-    pass
+    __slots__ = ()
 
 class NumberNode(ASTNode):
+    __slots__ = ('value',)
+    
     def __init__(self, value: int):
         self.value = value
     
@@ -12,6 +15,8 @@ class NumberNode(ASTNode):
         return f"Number({self.value})"
 
 class IdentifierNode(ASTNode):
+    __slots__ = ('name',)
+    
     def __init__(self, name: str):
         self.name = name
     
@@ -19,13 +24,31 @@ class IdentifierNode(ASTNode):
         return f"Identifier({self.name})"
 
 class ArrayNode(ASTNode):
+    __slots__ = ('elements',)
+    
     def __init__(self, elements: List[ASTNode]):
         self.elements = elements
     
     def __repr__(self):
         return f"Array({self.elements})"
 
+class PackedArrayNode(ArrayNode):
+    """Массив из одних чисел, хранящийся в array('q') без узла на элемент"""
+    __slots__ = ('values',)
+    
+    def __init__(self, values: array):
+        self.values = values
+    
+    @property
+    def elements(self) -> List[ASTNode]:
+        return [NumberNode(value) for value in self.values]
+    
+    def __repr__(self):
+        return f"Array({self.elements})"
+
 class DictEntryNode(ASTNode):
+    __slots__ = ('key', 'value')
+    
     def __init__(self, key: str, value: ASTNode):
         self.key = key
         self.value = value
@@ -34,6 +57,8 @@ class DictEntryNode(ASTNode):
         return f"DictEntry({self.key} -> {self.value})"
 
 class DictNode(ASTNode):
+    __slots__ = ('entries',)
+    
     def __init__(self, entries: List[DictEntryNode]):
         self.entries = entries
     
@@ -41,6 +66,8 @@ class DictNode(ASTNode):
         return f"Dict({self.entries})"
 
 class ConstDeclarationNode(ASTNode):
+    __slots__ = ('name', 'value')
+    
     def __init__(self, name: str, value: ASTNode):
         self.name = name
         self.value = value
@@ -49,44 +76,91 @@ class ConstDeclarationNode(ASTNode):
         return f"Const({self.name} := {self.value})"
 
 class ConstReferenceNode(ASTNode):
+    __slots__ = ('name',)
+    
     def __init__(self, name: str):
         self.name = name
     
     def __repr__(self):
         return f"ConstRef(?(self.name))"
 
+class ImportNode(ASTNode):
+    """Директива import "путь"; — константы другого файла"""
+    __slots__ = ('path',)
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def __repr__(self):
+        return f"Import({self.path!r})"
+
+# Токены, на которых разбор с восстановлением продолжается после ошибки
+_SYNC_TOKENS = frozenset((TokenType.DOT, TokenType.COMMA, TokenType.SEMICOLON,
+                          TokenType.DICT_END, TokenType.ARRAY_END, TokenType.EOF))
+
+# Токены, с которых может начинаться элемент верхнего уровня
+_ITEM_START_TOKENS = frozenset((TokenType.NUMBER, TokenType.CONST_START,
+                                TokenType.ARRAY_START, TokenType.DICT_START))
+
+# Точка продолжения разбора: ключ словаря на вершине стека
+_KEY = object()
+
 class Parser:
-    def __init__(self, tokens: List[Token]):
-        self.tokens = tokens
+    def __init__(self, tokens: Iterable[Token], recover: bool = False,
+                 errors: Optional[List[SyntaxError]] = None):
+        # Список токенов или ленивый поток (например, Lexer.iter_tokens()):
+        # в памяти держится только текущий токен и один токен заглядывания
+        self.stream = tokens if isinstance(tokens, TokenStream) else TokenStream(tokens)
         self.pos = 0
-        self.current_token = self.tokens[0]
+        self.current_token = self.stream.next()
         self.constants: Dict[str, Any] = {}
+        # В режиме восстановления синтаксические ошибки копятся в errors, а разбор
+        # продолжается с ближайшего '.', ',', ';', '}' или '>>'. Список можно
+        # разделить с Lexer(recover=True), чтобы ошибки шли в порядке текста
+        self.recover = recover
+        self.errors: List[SyntaxError] = [] if errors is None else errors
     
     def eat(self, token_type: TokenType):
         """Потребление токена ожидаемого типа"""
         if self.current_token.type == token_type:
             self.pos += 1
-            if self.pos < len(self.tokens):
-                self.current_token = self.tokens[self.pos]
+            if self.current_token.type != TokenType.EOF:
+                self.current_token = self.stream.next()
         else:
-            raise SyntaxError(
-                f"Ожидался {token_type}, получен {self.current_token.type} "
-                f"в {self.current_token.line}:{self.current_token.column}"
-            )
+            raise self._unexpected(token_type)
+    
+    def _unexpected(self, token_type: TokenType) -> SyntaxError:
+        return SyntaxError(
+            f"Ожидался {token_type}, получен {self.current_token.type} "
+            f"в {self.current_token.line}:{self.current_token.column}"
+        )
     
     def parse(self) -> List[ASTNode]:
         """Основной метод парсинга"""
         nodes = []
         
         while self.current_token.type != TokenType.EOF:
-            # Проверяем, является ли это объявлением константы
-            if (self.current_token.type == TokenType.IDENTIFIER and 
-                self.pos + 1 < len(self.tokens) and 
-                self.tokens[self.pos + 1].type == TokenType.ASSIGN):
-                
-                nodes.append(self.parse_const_declaration())
-            else:
-                nodes.append(self.parse_value())
+            start = self.pos
+            try:
+                # Проверяем, является ли это объявлением константы
+                if (self.current_token.type == TokenType.IDENTIFIER and 
+                    self.stream.peek().type == TokenType.ASSIGN):
+                    
+                    nodes.append(self.parse_const_declaration())
+                elif self._at_import():
+                    nodes.append(self.parse_import())
+                else:
+                    recorded = len(self.errors)
+                    nodes.append(self.parse_value())
+                    # Значение, восстановленное до ';', не оставляет лишней ошибки
+                    if (len(self.errors) > recorded and
+                            self.current_token.type == TokenType.SEMICOLON):
+                        self._advance()
+            except SyntaxError as error:
+                if not self.recover:
+                    raise
+                self._record(error)
+                self._skip_to_next_item(start)
         
         return nodes
     
@@ -97,27 +171,171 @@ class Parser:
         self.eat(TokenType.ASSIGN)
         
         value = self.parse_value()
-        self.eat(TokenType.SEMICOLON)
+        if self.recover and self.current_token.type != TokenType.SEMICOLON:
+            # Объявление сохраняется, разбор продолжается со следующего токена
+            self._record(self._unexpected(TokenType.SEMICOLON))
+        else:
+            self.eat(TokenType.SEMICOLON)
         
         return ConstDeclarationNode(name_token.value, value)
     
+    def _at_import(self) -> bool:
+        return (self.current_token.type == TokenType.IDENTIFIER and
+                self.current_token.value == 'import' and
+                self.stream.peek().type == TokenType.STRING)
+    
+    def parse_import(self) -> ImportNode:
+        """Парсинг директивы импорта: import "путь";"""
+        self.eat(TokenType.IDENTIFIER)
+        path_token = self.current_token
+        self.eat(TokenType.STRING)
+        self.eat(TokenType.SEMICOLON)
+        return ImportNode(path_token.value[1:-1])
+    
     def parse_value(self) -> ASTNode:
-        """Парсинг значения: число | массив | словарь | ссылка на константу"""
-        token = self.current_token
+        """Парсинг значения: число | массив | словарь | ссылка на константу
         
-        if token.type == TokenType.NUMBER:
-            return self.parse_number()
-        elif token.type == TokenType.CONST_START:
-            return self.parse_const_reference()
-        elif token.type == TokenType.ARRAY_START:
-            return self.parse_array()
-        elif token.type == TokenType.DICT_START:
-            return self.parse_dict()
-        else:
-            raise SyntaxError(
-                f"Ожидалось значение, получен {token.type} "
-                f"в {token.line}:{token.column}"
-            )
+        Вложенные массивы и словари разбираются с явным стеком, поэтому
+        глубина вложенности не ограничена стеком вызовов Python.
+        """
+        stack = []
+        resume = None
+        
+        while True:
+            try:
+                return self._parse_value(stack, resume)
+            except SyntaxError as error:
+                if not self.recover or not stack:
+                    raise
+                self._record(error)
+                resume = self._synchronize(stack)
+    
+    def _parse_value(self, stack: list, resume: Any = None) -> ASTNode:
+        """Цикл разбора parse_value; resume — точка продолжения после ошибки
+        
+        None — начало значения, _KEY — ключ словаря на вершине стека,
+        узел — готовое значение, которое поднимается по стеку.
+        """
+        while True:
+            if resume is None:
+                token = self.current_token
+                
+                # Начало очередного значения
+                if token.type == TokenType.NUMBER:
+                    node = self.parse_number()
+                elif token.type == TokenType.CONST_START:
+                    node = self.parse_const_reference()
+                elif token.type == TokenType.ARRAY_START:
+                    self.eat(TokenType.ARRAY_START)  # <<
+                    if self.current_token.type != TokenType.ARRAY_END:
+                        stack.append(_ArrayBuilder())
+                        continue
+                    self.eat(TokenType.ARRAY_END)  # >>
+                    node = ArrayNode([])
+                elif token.type == TokenType.DICT_START:
+                    self.eat(TokenType.DICT_START)  # {
+                    if self.current_token.type != TokenType.DICT_END:
+                        stack.append(_DictBuilder(self.parse_dict_key()))
+                        continue
+                    self.eat(TokenType.DICT_END)  # }
+                    node = DictNode([])
+                else:
+                    raise SyntaxError(
+                        f"Ожидалось значение, получен {token.type} "
+                        f"в {token.line}:{token.column}"
+                    )
+            elif resume is _KEY:
+                resume = None
+                stack[-1].key = self.parse_dict_key()
+                continue
+            else:
+                node, resume = resume, None
+            
+            # Готовое значение поднимается по стеку, закрывая завершенные контейнеры
+            while stack:
+                builder = stack[-1]
+                builder.add(node)
+                if isinstance(builder, _ArrayBuilder):
+                    if self.current_token.type == TokenType.COMMA:
+                        self.eat(TokenType.COMMA)
+                        break
+                    self.eat(TokenType.ARRAY_END)  # >>
+                else:
+                    if self.current_token.type == TokenType.DOT:
+                        self.eat(TokenType.DOT)
+                        builder.key = self.parse_dict_key()
+                        break
+                    self.eat(TokenType.DICT_END)  # }
+                stack.pop()
+                node = builder.build()
+            else:
+                return node
+    
+    def _record(self, error: SyntaxError):
+        """Запись ошибки режима восстановления без повторов"""
+        if not self.errors or self.errors[-1] is not error:
+            self.errors.append(error)
+    
+    def _advance(self):
+        """Пропуск текущего токена без проверки типа"""
+        self.eat(self.current_token.type)
+    
+    def _synchronize(self, stack: list) -> Any:
+        """Продолжение разбора значения после ошибки
+        
+        Токены пропускаются до ближайшего '.', ',', '}', '>>', для которого
+        на стеке есть открытый словарь или массив, либо до ';' или конца.
+        Незакрытые контейнеры выше найденного закрываются с уже разобранными
+        элементами. Возвращает точку продолжения для _parse_value.
+        """
+        while True:
+            token_type = self.current_token.type
+            if token_type in _SYNC_TOKENS:
+                if token_type in (TokenType.SEMICOLON, TokenType.EOF):
+                    depth = 0
+                else:
+                    builder_type = (_DictBuilder if token_type in (TokenType.DOT, TokenType.DICT_END)
+                                    else _ArrayBuilder)
+                    depth = next((index + 1 for index in range(len(stack) - 1, -1, -1)
+                                  if isinstance(stack[index], builder_type)), None)
+                if depth is not None:
+                    break
+            self._advance()
+        
+        # Контейнеры выше найденного закрываются как есть
+        node = None
+        while len(stack) > depth:
+            builder = stack.pop()
+            if node is not None:
+                builder.add(node)
+            node = builder.build()
+        if not stack:
+            return node
+        if node is not None:
+            stack[-1].add(node)
+        
+        self._advance()
+        if token_type == TokenType.DOT:
+            return _KEY
+        if token_type == TokenType.COMMA:
+            return None
+        # '}' или '>>' закрывает найденный контейнер, значение поднимается дальше
+        return stack.pop().build()
+    
+    def _skip_to_next_item(self, start: int):
+        """Пропуск токенов до следующего элемента верхнего уровня после ошибки"""
+        if self.pos == start:
+            self._advance()
+        while self.current_token.type != TokenType.EOF:
+            token_type = self.current_token.type
+            if token_type == TokenType.SEMICOLON:
+                self._advance()
+                return
+            if token_type in _ITEM_START_TOKENS or self._at_import() or (
+                    token_type == TokenType.IDENTIFIER and
+                    self.stream.peek().type == TokenType.ASSIGN):
+                return
+            self._advance()
     
     def parse_number(self) -> NumberNode:
         """Парсинг числа"""
@@ -143,36 +361,24 @@ class Parser:
     
     def parse_array(self) -> ArrayNode:
         """Парсинг массива: << значение, значение, ... >>"""
-        self.eat(TokenType.ARRAY_START)  # <<
-        
-        elements = []
-        if self.current_token.type != TokenType.ARRAY_END:
-            elements.append(self.parse_value())
-            
-            while self.current_token.type == TokenType.COMMA:
-                self.eat(TokenType.COMMA)
-                elements.append(self.parse_value())
-        
-        self.eat(TokenType.ARRAY_END)  # >>
-        return ArrayNode(elements)
+        if self.current_token.type != TokenType.ARRAY_START:
+            self.eat(TokenType.ARRAY_START)
+        return self.parse_value()
     
     def parse_dict(self) -> DictNode:
         """Парсинг словаря: { имя -> значение. имя -> значение. ... }"""
-        self.eat(TokenType.DICT_START)  # {
-        
-        entries = []
-        if self.current_token.type != TokenType.DICT_END:
-            entries.append(self.parse_dict_entry())
-            
-            while self.current_token.type == TokenType.DOT:
-                self.eat(TokenType.DOT)
-                entries.append(self.parse_dict_entry())
-        
-        self.eat(TokenType.DICT_END)  # }
-        return DictNode(entries)
+        if self.current_token.type != TokenType.DICT_START:
+            self.eat(TokenType.DICT_START)
+        return self.parse_value()
     
     def parse_dict_entry(self) -> DictEntryNode:
         """Парсинг записи словаря: имя -> значение"""
+        key = self.parse_dict_key()
+        value = self.parse_value()
+        return DictEntryNode(key, value)
+    
+    def parse_dict_key(self) -> str:
+        """Парсинг ключа записи словаря: имя ->"""
         if self.current_token.type != TokenType.IDENTIFIER:
             raise SyntaxError(
                 f"Ожидался идентификатор, получен {self.current_token.type} "
@@ -182,6 +388,43 @@ class Parser:
         key_token = self.current_token
         self.eat(TokenType.IDENTIFIER)
         self.eat(TokenType.ARROW)
-        
-        value = self.parse_value()
-        return DictEntryNode(key_token.value, value)
+        return key_token.value
+
+class _ArrayBuilder:
+    """Незавершенный массив на стеке парсера"""
+    __slots__ = ('values', 'elements')
+    
+    def __init__(self):
+        # Пока встречаются только числа, копим их в упакованном виде
+        self.values = array('q')
+        self.elements = None
+    
+    def add(self, node: ASTNode):
+        if self.elements is None and type(node) is NumberNode:
+            try:
+                self.values.append(node.value)
+                return
+            except OverflowError:
+                pass
+        if self.elements is None:
+            self.elements = [NumberNode(value) for value in self.values]
+        self.elements.append(node)
+    
+    def build(self) -> ArrayNode:
+        if self.elements is None:
+            return PackedArrayNode(self.values)
+        return ArrayNode(self.elements)
+
+class _DictBuilder:
+    """Незавершенный словарь на стеке парсера"""
+    __slots__ = ('key', 'entries')
+    
+    def __init__(self, key: str):
+        self.key = key
+        self.entries: List[DictEntryNode] = []
+    
+    def add(self, node: ASTNode):
+        self.entries.append(DictEntryNode(self.key, node))
+    
+    def build(self) -> DictNode:
+        return DictNode(self.entries)
@@ -0,0 +1,189 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from lexer import Lexer, TokenType
+from parser import ASTNode, Parser
+from constants import ConstantEvaluator, collect_references
+from parallel import prescan
+
+# Найденное значение: узел и оставшиеся ключи пути (если узел не словарь в тексте)
+Found = Optional[Tuple[ASTNode, List[str]]]
+
+# Ключ ни разу не встретился в словаре (в отличие от None — встретился, но пути нет)
+_ABSENT = object()
+
+# Ключ записи словаря сразу после '{' или '.', с пробелами и комментариями как у лексера
+_ENTRY_KEY = re.compile(r"(?:\s+|'[^\n]*)*([^\W\d]\w*)(?:\s+|'[^\n]*)*->")
+
+_OPENERS = {TokenType.DICT_START: TokenType.DICT_END, TokenType.ARRAY_START: TokenType.ARRAY_END}
+
+def split_key(key: str) -> List[str]:
+    """Путь ключей через точку: 'a.b.c' -> ['a', 'b', 'c']"""
+    keys = key.split('.')
+    if not all(keys):
+        raise ValueError(f"Пустой ключ в пути: {key!r}")
+    return keys
+
+class QueryParser(Parser):
+    """Парсер, строящий AST только для объявлений и значения по пути ключей
+    
+    Записи словарей с другими ключами и прочие значения верхнего уровня
+    пропускаются по токенам без построения узлов; в пропущенном тексте
+    проверяется только парность скобок.
+    """
+    
+    def find(self, keys: List[str]) -> Tuple[List[ASTNode], Found]:
+        """Объявления и импорты файла и последнее значение по пути keys, как в evaluate_all
+        
+        Строка и столбец элемента верхнего уровня с последним вхождением
+        ключа сохраняются в found_at (None, если ключ не встретился).
+        """
+        nodes: List[ASTNode] = []
+        found: Found = None
+        self.found_at: Optional[Tuple[int, int]] = None
+        
+        while self.current_token.type != TokenType.EOF:
+            position = (self.current_token.line, self.current_token.column)
+            if (self.current_token.type == TokenType.IDENTIFIER and
+                    self.stream.peek().type == TokenType.ASSIGN):
+                nodes.append(self.parse_const_declaration())
+            elif self._at_import():
+                nodes.append(self.parse_import())
+            elif self.current_token.type == TokenType.DICT_START:
+                # Словари верхнего уровня сливаются: ключ из более позднего заменяет прежний
+                result = self._find_in_dict(keys)
+                if result is not _ABSENT:
+                    found, self.found_at = result, position
+            elif keys[0] == '_result':
+                found, self.found_at = (self.parse_value(), keys[1:]), position
+            else:
+                self.skip_value()
+        
+        return nodes, found
+    
+    def _find_in_dict(self, keys: List[str]) -> Any:
+        """Значение по пути keys в словаре с текущего '{'; последняя запись с ключом побеждает"""
+        self.eat(TokenType.DICT_START)
+        if self.current_token.type == TokenType.DICT_END:
+            self.eat(TokenType.DICT_END)
+            return _ABSENT
+        
+        result = _ABSENT
+        while True:
+            key = self.parse_dict_key()
+            if key != keys[0]:
+                self.skip_value()
+            elif len(keys) > 1 and self.current_token.type == TokenType.DICT_START:
+                result = self._find_in_dict(keys[1:])
+                if result is _ABSENT:
+                    result = None
+            else:
+                result = (self.parse_value(), keys[1:])
+            
+            if self.current_token.type != TokenType.DOT:
+                break
+            self.eat(TokenType.DOT)
+        self.eat(TokenType.DICT_END)
+        return result
+    
+    def skip_value(self):
+        """Пропуск значения по токенам с проверкой только парности скобок"""
+        closers: List[TokenType] = []
+        while True:
+            token_type = self.current_token.type
+            if token_type in _OPENERS:
+                closers.append(_OPENERS[token_type])
+            elif not closers:
+                if token_type == TokenType.CONST_START:
+                    self.parse_const_reference()
+                    return
+                if token_type != TokenType.NUMBER:
+                    raise SyntaxError(
+                        f"Ожидалось значение, получен {token_type} "
+                        f"в {self.current_token.line}:{self.current_token.column}"
+                    )
+            elif token_type in (TokenType.DICT_END, TokenType.ARRAY_END):
+                if token_type != closers[-1]:
+                    raise self._unexpected(closers[-1])
+                closers.pop()
+            elif token_type == TokenType.EOF:
+                raise self._unexpected(closers[-1])
+            self._advance()
+            if not closers:
+                return
+
+def query(source, key: str, engine: str = 'fast',
+          importer: Optional[Callable[[str], Dict[str, Any]]] = None) -> Any:
+    """Значение по пути ключей через точку без вычисления остальной конфигурации
+    
+    Вычисляются только найденное поддерево и константы, на которые оно
+    транзитивно ссылается. Если значение на пути — ссылка на константу
+    или массив, оно вычисляется целиком и путь продолжается по результату.
+    Отсутствующий ключ — KeyError с полным путем.
+    """
+    keys = split_key(key)
+    if not isinstance(source, str):
+        source = bytes(source).decode('utf-8')
+    segments = prescan(source)
+    if segments is None:
+        # Несбалансированные скобки: разбор по токенам дает обычную ошибку
+        nodes, found = QueryParser(Lexer(source, engine=engine).iter_tokens()).find(keys)
+    else:
+        nodes, found = _find_in_segments(source, segments, keys, engine)
+    if found is None:
+        raise KeyError(key)
+    
+    node, rest = found
+    evaluator = ConstantEvaluator(importer)
+    evaluator.evaluate_referenced(nodes, collect_references(node))
+    value = evaluator.evaluate_node(node)
+    for name in rest:
+        if not isinstance(value, dict) or name not in value:
+            raise KeyError(key)
+        value = value[name]
+    return value
+
+def _find_in_segments(source: str, segments, keys: List[str], engine: str) -> Tuple[List[ASTNode], Found]:
+    """Поиск по словарям верхнего уровня из prescan без лексического анализа их тел
+    
+    Объявления и остальные элементы разбираются по каркасу, где тела
+    словарей заменены переводами строк. Ключи записей словарей сверяются
+    регулярным выражением с конца, и разбирается только последняя запись
+    с нужным ключом, с сохранением строк и столбцов исходного текста.
+    Из вхождений в каркасе и в словарях побеждает последнее по тексту.
+    """
+    parts = []
+    starts = []
+    position = 0
+    length = 0
+    for segment in segments:
+        parts.append(source[position:segment.start + 1])
+        parts.append('\n' * source.count('\n', segment.start + 1, segment.end - 1))
+        starts.append(length + segment.start - position)
+        length += len(parts[-2]) + len(parts[-1])
+        position = segment.end - 1
+    parts.append(source[position:])
+    skeleton = ''.join(parts)
+    parser = QueryParser(Lexer(skeleton, engine=engine).iter_tokens())
+    nodes, found = parser.find(keys)
+    
+    # Строки и столбцы словарей в каркасе: порядок позиций в нем тот же, что в тексте
+    line = skeleton.count('\n') + 1
+    following = len(skeleton)
+    for segment, offset in zip(reversed(segments), reversed(starts)):
+        line -= skeleton.count('\n', offset, following)
+        following = offset
+        if parser.found_at is not None and parser.found_at > (line, offset - skeleton.rfind('\n', 0, offset)):
+            break
+        bounds = [segment.start] + segment.dots + [segment.end - 1]
+        for index in range(segment.entries - 1, -1, -1):
+            start = bounds[index]
+            match = _ENTRY_KEY.match(source, start + 1, bounds[index + 1])
+            if match is None or match.group(1) != keys[0]:
+                continue
+            # Запись как словарь из одной записи на прежнем месте в тексте
+            line_start = source.rfind('\n', 0, start) + 1
+            text = ('\n' * source.count('\n', 0, start) + ' ' * (start - line_start) +
+                    '{' + source[start + 1:bounds[index + 1]] + '}')
+            result = QueryParser(Lexer(text, engine=engine).iter_tokens())._find_in_dict(keys)
+            return nodes, None if result is _ABSENT else result
+    return nodes, found
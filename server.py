@@ -0,0 +1,147 @@
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from converter import ConfigConverter, ConversionError
+
+# Исходник для прогрева рабочих процессов: импорт tomlkit и первый проход всех стадий
+_WARM_UP_SOURCE = "x := 1; { a -> ?(x). b -> << 1, 2 >>. c -> { d -> 3 } }"
+
+_worker_converter: Optional[ConfigConverter] = None
+
+def _init_worker(options: Dict[str, Any]):
+    """Инициализация рабочего процесса: конвертер создается и прогревается один раз
+    
+    Импорты запрещены: путь в теле запроса иначе читал бы любые файлы сервера.
+    """
+    global _worker_converter
+    _worker_converter = ConfigConverter(**dict(options, imports=False))
+    _worker_converter.convert_source(_WARM_UP_SOURCE)
+
+def _ping(delay: float) -> None:
+    # Задание занимает процесс, чтобы пул запустил все рабочие процессы сразу
+    time.sleep(delay)
+
+def _convert_text(source: bytes) -> Tuple[str, float]:
+    """Конвертация в рабочем процессе; возвращает TOML и время конвертации"""
+    start = time.perf_counter()
+    toml_output = _worker_converter.convert_source(source, '<request>')
+    return toml_output, time.perf_counter() - start
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    """POST /convert: текст на учебном языке в теле запроса, TOML в ответе
+    
+    Заголовок Server-Timing содержит время ожидания в очереди пула (queue),
+    конвертации в рабочем процессе (convert) и всей обработки (total), мс.
+    """
+    server: 'ConversionServer'
+    protocol_version = 'HTTP/1.1'
+    # Заголовки и тело уходят отдельными пакетами; без TCP_NODELAY ответ ждет отложенного ACK
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        if self.path == '/health':
+            self._reply(200, 'ok\n')
+        else:
+            self._reply(404, f"Неизвестный путь: {self.path}\n")
+    
+    def do_POST(self):
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            length = None
+        if self.path != '/convert':
+            if length is not None and 0 <= length <= self.server.max_body:
+                # Тело отбрасывается, и соединение годно для следующего запроса
+                self.rfile.read(length)
+                self._reply(404, f"Неизвестный путь: {self.path}\n")
+            else:
+                self._reject(404, f"Неизвестный путь: {self.path}\n")
+            return
+        if length is None:
+            self._reject(411, "Нужен заголовок Content-Length\n")
+            return
+        if length < 0:
+            self._reject(400, f"Неверный Content-Length: {length}\n")
+            return
+        if length > self.server.max_body:
+            self._reject(413, f"Тело запроса больше {self.server.max_body} байт\n")
+            return
+        body = self.rfile.read(length)
+        
+        try:
+            toml_output, convert_seconds = self.server.pool.submit(_convert_text, body).result()
+            status = 200
+        except ConversionError as e:
+            toml_output, convert_seconds = f"{e}\n", None
+            status = 422
+        except Exception as e:
+            # Например, аварийно завершившийся рабочий процесс
+            toml_output, convert_seconds = f"Ошибка сервера: {e}\n", None
+            status = 500
+        
+        total = time.perf_counter() - start
+        timing = [f"total;dur={total * 1000:.2f}"]
+        if convert_seconds is not None:
+            timing[:0] = [f"queue;dur={(total - convert_seconds) * 1000:.2f}",
+                          f"convert;dur={convert_seconds * 1000:.2f}"]
+        self._reply(status, toml_output, {'Server-Timing': ', '.join(timing)})
+    
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+    
+    def _reject(self, status: int, text: str):
+        """Ответ с ошибкой без чтения тела запроса
+        
+        Соединение закрывается: иначе непрочитанное тело разбиралось бы
+        как следующий запрос.
+        """
+        self.close_connection = True
+        self._reply(status, text, {'Connection': 'close'})
+    
+    def _reply(self, status: int, text: str, headers: Optional[Dict[str, str]] = None):
+        data = text.encode('utf-8')
+        content_type = 'application/toml' if status == 200 and self.path == '/convert' else 'text/plain'
+        self.send_response(status)
+        self.send_header('Content-Type', f"{content_type}; charset=utf-8")
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+class ConversionServer(ThreadingHTTPServer):
+    """HTTP-сервер конвертации с пулом заранее прогретых рабочих процессов"""
+    daemon_threads = True
+    
+    def __init__(self, address: Tuple[str, int], workers: int = 2,
+                 options: Optional[Dict[str, Any]] = None, max_body: int = 16 * 1024 * 1024,
+                 verbose: bool = False):
+        super().__init__(address, ConversionHandler)
+        self.max_body = max_body
+        self.verbose = verbose
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                        initargs=(options or {},))
+        # Все процессы запускаются и прогреваются до первого запроса
+        wait([self.pool.submit(_ping, 0.05) for _ in range(workers)])
+    
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown()
+
+def serve(host: str = '127.0.0.1', port: int = 8080, workers: int = 2,
+          options: Optional[Dict[str, Any]] = None, verbose: bool = False):
+    """Запуск сервера до Ctrl+C"""
+    server = ConversionServer((host, port), workers, options, verbose=verbose)
+    host, port = server.server_address[:2]
+    print(f"Сервер конвертации: http://{host}:{port}/convert ({workers} процессов)",
+          file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -2,7 +2,7 @@ from setuptools import setup, find_packages
 
 setup(
     name="config-converter",
-    version="1.0.0",
+    version="1.1.0",
     description="Конвертер учебного конфигурационного языка в TOML",
     author="Ваше Имя",
     author_email="your.email@example.com",
@@ -0,0 +1,132 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from constants import ConstantEvaluator
+from parser import ArrayNode, ASTNode, ConstDeclarationNode, DictEntryNode, DictNode, PackedArrayNode
+
+# tracemalloc.reset_peak появился в Python 3.9; в 3.7-3.8 пик сбрасывается
+# вместе с трассами, уже собранными включившим трассировку кодом
+_reset_peak = getattr(tracemalloc, 'reset_peak', tracemalloc.clear_traces)
+
+class StageStats:
+    """Время и пик памяти одного этапа конвертации"""
+    __slots__ = ('seconds', 'peak_bytes')
+    
+    def __init__(self, seconds: float = 0.0, peak_bytes: int = 0):
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'seconds': self.seconds, 'peak_bytes': self.peak_bytes}
+
+class ConversionStats:
+    """Статистика одной конвертации по этапам
+    
+    Передается в методы ConfigConverter (stats=...); без нее конвейер
+    работает как обычно и ничего не измеряет. Со статистикой токены
+    собираются в список до разбора, чтобы время лексера и парсера
+    измерялось раздельно, а кэш результатов не используется.
+    Подкласс может переопределить record, чтобы получать этапы по мере
+    выполнения.
+    """
+    
+    def __init__(self, memory: bool = True):
+        # Пик памяти через tracemalloc заметно замедляет конвертацию
+        self.memory = memory
+        self.stages: Dict[str, StageStats] = {}
+        self.tokens = 0
+        self.nodes = 0
+        self.constants = 0
+        # Имя константы -> число обращений к ней при вычислении
+        self.references: Dict[str, int] = {}
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Замер времени и пика памяти блока как этапа name"""
+        tracing = self.memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif self.memory:
+            _reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if self.memory else 0
+            if tracing:
+                tracemalloc.stop()
+            self.record(name, seconds, peak)
+    
+    def record(self, name: str, seconds: float, peak_bytes: int):
+        """Учет завершенного этапа; повторный этап суммирует время"""
+        stage = self.stages.get(name)
+        if stage is None:
+            self.stages[name] = StageStats(seconds, peak_bytes)
+        else:
+            stage.seconds += seconds
+            stage.peak_bytes = max(stage.peak_bytes, peak_bytes)
+    
+    def evaluator(self, importer: Optional[Callable[[str], Dict[str, Any]]] = None) -> ConstantEvaluator:
+        """Вычислитель, считающий обращения к константам в self.references"""
+        return _CountingEvaluator(self.references, importer)
+    
+    def count_nodes(self, nodes: List[ASTNode]):
+        """Подсчет узлов AST и объявлений констант"""
+        count = 0
+        stack = list(nodes)
+        while stack:
+            node = stack.pop()
+            count += 1
+            if isinstance(node, ConstDeclarationNode):
+                self.constants += 1
+                stack.append(node.value)
+            elif isinstance(node, DictNode):
+                stack.extend(node.entries)
+            elif isinstance(node, DictEntryNode):
+                stack.append(node.value)
+            elif isinstance(node, ArrayNode) and not isinstance(node, PackedArrayNode):
+                stack.extend(node.elements)
+        self.nodes += count
+    
+    @property
+    def total_seconds(self) -> float:
+        return sum(stage.seconds for stage in self.stages.values())
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'stages': {name: stage.to_dict() for name, stage in self.stages.items()},
+            'total_seconds': self.total_seconds,
+            'tokens': self.tokens,
+            'nodes': self.nodes,
+            'constants': self.constants,
+            'references': dict(sorted(self.references.items(), key=lambda item: -item[1])),
+        }
+    
+    def format(self, top: int = 10) -> str:
+        """Отчет для человека"""
+        lines = ["Этап         время, мс   пик памяти, КиБ"]
+        for name, stage in self.stages.items():
+            peak = f"{stage.peak_bytes / 1024:15.1f}" if self.memory else f"{'-':>15}"
+            lines.append(f"{name:<10} {stage.seconds * 1000:11.2f} {peak}")
+        lines.append(f"{'всего':<10} {self.total_seconds * 1000:11.2f}")
+        lines.append(f"Токенов: {self.tokens}, узлов AST: {self.nodes}, констант: {self.constants}, "
+                     f"обращений к константам: {sum(self.references.values())}")
+        if self.references:
+            frequent = sorted(self.references.items(), key=lambda item: -item[1])[:top]
+            lines.append("Частые константы: " + ', '.join(f"{name} ({count})" for name, count in frequent))
+        return '\n'.join(lines)
+
+class _CountingEvaluator(ConstantEvaluator):
+    """Вычислитель со счетчиком обращений к константам"""
+    
+    def __init__(self, references: Dict[str, int],
+                 importer: Optional[Callable[[str], Dict[str, Any]]] = None):
+        super().__init__(importer)
+        self.references = references
+    
+    def evaluate_constant_reference(self, name: str) -> Any:
+        self.references[name] = self.references.get(name, 0) + 1
+        return super().evaluate_constant_reference(name)
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from async_converter import AsyncConfigConverter
+from cache import ConversionCache
+from converter import ConfigConverter, ConversionError
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Пул потоков, запоминающий наибольшее число одновременных заданий"""
+    def __init__(self):
+        super().__init__(max_workers=8)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.submitted = 0
+    
+    def submit(self, fn, *args):
+        self.submitted += 1
+        def job():
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            try:
+                time.sleep(0.01)
+                return fn(*args)
+            finally:
+                with self.lock:
+                    self.active -= 1
+        return super().submit(job)
+
+def body(toml_output):
+    return toml_output.split('\n', 1)[1]
+
+class TestAsyncConfigConverter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_process_pool(self):
+        """Тест конвертации в пуле процессов"""
+        source = "x := 5; { a -> ?(x). b -> << 1, 2 >> }"
+        path = self.root / 'config.conf'
+        path.write_text(source, encoding='utf-8')
+        
+        async def run():
+            async with AsyncConfigConverter(mode='fast', max_concurrency=2) as converter:
+                return await asyncio.gather(converter.convert_string(source), converter.convert_file(path))
+        
+        expected = body(ConfigConverter(mode='fast').convert_string(source))
+        self.assertEqual([body(result) for result in asyncio.run(run())], [expected, expected])
+    
+    def test_errors(self):
+        """Тест ошибок: исключение ConversionError вместо выхода из процесса"""
+        async def run(coroutine_factory):
+            with CountingExecutor() as executor:
+                converter = AsyncConfigConverter(executor=executor)
+                await coroutine_factory(converter)
+        
+        cases = [
+            (lambda converter: converter.convert_string("{ a -> ?(missing) }"), 'Ошибка имени'),
+            (lambda converter: converter.convert_string("{ a -> }"), 'Синтаксическая ошибка'),
+            (lambda converter: converter.convert_file(self.root / 'missing.conf'), 'не найден'),
+        ]
+        for factory, message in cases:
+            with self.subTest(message=message):
+                with self.assertRaises(ConversionError) as context:
+                    asyncio.run(run(factory))
+                self.assertIn(message, str(context.exception))
+    
+    def test_bounded_concurrency(self):
+        """Тест ограничения числа одновременных конвертаций"""
+        sources = [f"{{ key{index} -> {index + 1} }}" for index in range(20)]
+        
+        async def run(executor):
+            converter = AsyncConfigConverter(mode='fast', max_concurrency=3, executor=executor)
+            return await converter.convert_many(sources)
+        
+        with CountingExecutor() as executor:
+            results = asyncio.run(run(executor))
+        self.assertEqual(len(results), 20)
+        self.assertIn('key7 = 8', results[7])
+        self.assertEqual(executor.peak, 3)
+    
+    def test_cache(self):
+        """Тест повторной конвертации файла из кэша"""
+        path = self.root / 'config.conf'
+        path.write_text("{ a -> 1 }", encoding='utf-8')
+        cache = ConversionCache(self.root / 'cache')
+        
+        async def run(executor):
+            converter = AsyncConfigConverter(mode='fast', cache=cache, executor=executor)
+            first = await converter.convert_file(path)
+            second = await converter.convert_file(path)
+            return first, second
+        
+        with CountingExecutor() as executor:
+            first, second = asyncio.run(run(executor))
+            self.assertEqual(first, second)
+            # Вторая конвертация не доходит до пула
+            self.assertEqual(executor.submitted, 1)
+
+    def test_imports(self):
+        """Тест импортов относительно каталога файла и конвертации файла с импортами мимо кэша"""
+        (self.root / 'conf').mkdir()
+        (self.root / 'conf' / 'base.conf').write_text('port := 80;', encoding='utf-8')
+        path = self.root / 'conf' / 'service.conf'
+        path.write_text('import \' база\n"base.conf";\n{ port -> ?(port) }', encoding='utf-8')
+        cache = ConversionCache(self.root / 'cache')
+        
+        async def run(executor):
+            converter = AsyncConfigConverter(mode='fast', cache=cache, executor=executor)
+            first = await converter.convert_file(path)
+            (self.root / 'conf' / 'base.conf').write_text('port := 81;', encoding='utf-8')
+            os.utime(self.root / 'conf' / 'base.conf', ns=(1, 1))
+            return first, await converter.convert_file(path)
+        
+        with CountingExecutor() as executor:
+            first, second = asyncio.run(run(executor))
+        self.assertIn('port = 80', first)
+        self.assertIn('port = 81', second)
+        self.assertEqual(executor.submitted, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import tempfile
+import unittest
+from pathlib import Path
+from batch import collect_jobs, convert_batch
+from test_cli import run_cli
+
+class TestBatchConversion(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / 'configs' / 'nested').mkdir(parents=True)
+        (self.root / 'configs' / 'a.conf').write_text("{ a -> 1 }", encoding='utf-8')
+        (self.root / 'configs' / 'nested' / 'b.conf').write_text("x := 2; { b -> ?(x) }", encoding='utf-8')
+        (self.root / 'configs' / 'broken.conf').write_text("{ c -> }", encoding='utf-8')
+        (self.root / 'single.conf').write_text("{ d -> 4 }", encoding='utf-8')
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_collect_jobs_next_to_inputs(self):
+        """Тест путей результатов рядом с исходниками"""
+        jobs = collect_jobs([self.root / 'configs', self.root / 'single.conf'])
+        targets = [target.relative_to(self.root).as_posix() for _, target in jobs]
+        self.assertEqual(targets, ['configs/a.toml', 'configs/broken.toml',
+                                   'configs/nested/b.toml', 'single.toml'])
+    
+    def test_collect_jobs_output_dir(self):
+        """Тест путей результатов в отдельном каталоге"""
+        out = self.root / 'out'
+        jobs = collect_jobs([self.root / 'configs', self.root / 'single.conf'], out)
+        targets = [target.relative_to(out).as_posix() for _, target in jobs]
+        self.assertEqual(targets, ['configs/a.toml', 'configs/broken.toml',
+                                   'configs/nested/b.toml', 'single.toml'])
+    
+    def test_collect_jobs_duplicate_targets(self):
+        """Тест повторно указанных файлов и разных файлов с одним результатом"""
+        out = self.root / 'out'
+        (self.root / 'other').mkdir()
+        (self.root / 'other' / 'single.conf').write_text("{ d -> 5 }", encoding='utf-8')
+        single = self.root / 'single.conf'
+        jobs = collect_jobs([single, self.root / 'configs', self.root / '.' / 'single.conf'], out)
+        self.assertEqual([path.name for path, _ in jobs], ['single.conf', 'a.conf', 'broken.conf', 'b.conf'])
+        self.assertEqual(len(collect_jobs([single, self.root / 'other' / 'single.conf'])), 2)
+        with self.assertRaisesRegex(ValueError, 'в один результат .*single.toml'):
+            collect_jobs([single, self.root / 'other' / 'single.conf'], out)
+        
+        code, stderr, _ = run_cli('--no-cache', '--output-dir', str(out), str(single),
+                                  str(self.root / 'other' / 'single.conf'))
+        self.assertEqual(code, 1)
+        self.assertIn('в один результат', stderr)
+        self.assertFalse(out.exists())
+    
+    def test_errors_do_not_abort_batch(self):
+        """Тест: ошибка в одном файле не прерывает пакет"""
+        jobs = collect_jobs([self.root / 'configs', self.root / 'single.conf'], self.root / 'out')
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                results = list(convert_batch(jobs, workers=workers, options={'mode': 'fast'}))
+                self.assertEqual([result.input_path for result in results], [job[0] for job in jobs])
+                failed = [result for result in results if not result.ok]
+                self.assertEqual([result.input_path.name for result in failed], ['broken.conf'])
+                self.assertIn('Синтаксическая ошибка', failed[0].error)
+                self.assertFalse(failed[0].output_path.exists())
+                self.assertIn('b = 2', (self.root / 'out' / 'configs' / 'nested' / 'b.toml').read_text(encoding='utf-8'))
+
+if __name__ == '__main__':
+    unittest.main()
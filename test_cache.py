@@ -0,0 +1,107 @@
+import io
+import os
+import pickle
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from cache import ConversionCache
+from unittest import mock
+from converter import ConfigConverter, code_version
+
+class TestConversionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.cache = ConversionCache(self.root / 'cache')
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_key_depends_on_source_and_parts(self):
+        """Тест ключа: исходник, версия и параметры"""
+        key = self.cache.key(b'{ a -> 1 }', '1.0.0', 'fast')
+        self.assertEqual(key, self.cache.key(b'{ a -> 1 }', '1.0.0', 'fast'))
+        self.assertNotEqual(key, self.cache.key(b'{ a -> 2 }', '1.0.0', 'fast'))
+        self.assertNotEqual(key, self.cache.key(b'{ a -> 1 }', '1.0.1', 'fast'))
+        self.assertNotEqual(key, self.cache.key(b'{ a -> 1 }', '1.0.0', 'tomlkit'))
+    
+    def test_get_and_put(self):
+        """Тест записи и чтения"""
+        self.assertIsNone(self.cache.get('missing'))
+        self.cache.put('k', 'a = 1\n')
+        self.assertEqual(self.cache.get('k'), 'a = 1\n')
+    
+    def test_lru_eviction(self):
+        """Тест вытеснения давно не использованных записей"""
+        cache = ConversionCache(self.root / 'small', max_bytes=30)
+        now = time.time()
+        for index, key in enumerate(('used', 'old', 'new')):
+            cache.put(key, 'x' * 10)
+            os.utime(cache._path(key), (now - 100 + index, now - 100 + index))
+        # Обращение к 'used' делает его самым свежим
+        self.assertEqual(cache.get('used'), 'x' * 10)
+        cache.put('newest', 'x' * 10)
+        self.assertIsNone(cache.get('old'))
+        for key in ('used', 'new', 'newest'):
+            self.assertIsNotNone(cache.get(key))
+        self.assertLessEqual(cache.size(), 30)
+    
+    def test_pickle(self):
+        """Тест передачи кэша в другой процесс"""
+        copy = pickle.loads(pickle.dumps(self.cache))
+        copy.put('k', 'a = 1\n')
+        self.assertEqual(self.cache.get('k'), 'a = 1\n')
+    
+    def test_converter_uses_cache(self):
+        """Тест возврата результата из кэша без повторной конвертации"""
+        path = self.root / 'config.conf'
+        path.write_text("x := 2; { a -> ?(x) }", encoding='utf-8')
+        first = ConfigConverter(mode='fast', cache=self.cache).convert_path(path)
+        
+        # Подмена записи показывает, что второй вызов читает кэш
+        key = self.cache.key(path.read_bytes(), code_version(), 'fast')
+        self.cache.put(key, first + '# from cache\n')
+        second = ConfigConverter(mode='fast', cache=self.cache).convert_path(path)
+        self.assertTrue(second.endswith('# from cache\n'))
+        # Другой код конвертера — другие ключи: запись прежнего кода не используется
+        with mock.patch('converter._code_version', code_version() + '-changed'):
+            self.assertFalse(ConfigConverter(mode='fast', cache=self.cache).convert_path(path)
+                             .endswith('# from cache\n'))
+        
+        path.write_text("x := 3; { a -> ?(x) }", encoding='utf-8')
+        third = ConfigConverter(mode='fast', cache=self.cache).convert_path(path)
+        self.assertIn('a = 3', third)
+
+    def test_cache_hit_restamps_header_and_streams(self):
+        """Тест попадания: новый заголовок и потоковая запись в файловый объект"""
+        path = self.root / 'config.conf'
+        path.write_text("x := << 1, 2 >>; { a -> ?(x). t -> { b -> 1 } }", encoding='utf-8')
+        for input_mode in ('text', 'mmap'):
+            with self.subTest(input_mode=input_mode):
+                converter = ConfigConverter(mode='fast', input_mode=input_mode, cache=self.cache)
+                first = converter.convert_path(path)
+                key = self.cache.key(path.read_bytes(), code_version(), 'fast')
+                self.cache.put(key, '# Generated from custom config language on 2000-01-01\n' +
+                               first.split('\n', 1)[1])
+                second = converter.convert_path(path)
+                self.assertNotIn('2000-01-01', second)
+                self.assertTrue(second.startswith('# Generated from custom config language on '))
+                self.assertEqual(second.split('\n', 1)[1], first.split('\n', 1)[1])
+                
+                out = io.StringIO()
+                converter.convert_to_stream(path, out)
+                self.assertEqual(out.getvalue().split('\n', 1)[1], first.split('\n', 1)[1])
+                self.assertNotIn('2000-01-01', out.getvalue())
+    
+    def test_small_cache_still_returns_result(self):
+        """Тест результата при записи, вытесненной сразу после сохранения"""
+        path = self.root / 'config.conf'
+        path.write_text("{ a -> 1 }", encoding='utf-8')
+        cache = ConversionCache(self.root / 'tiny', max_bytes=1)
+        out = io.StringIO()
+        ConfigConverter(mode='fast', cache=cache).convert_to_stream(path, out)
+        self.assertIn('a = 1', out.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+CLI = str(Path(__file__).resolve().parent / 'cli.py')
+
+def run_cli(*args, code=''):
+    """Запуск cli.main в отдельном интерпретаторе; возвращает (код выхода, stderr, загруженные модули)"""
+    script = (
+        "import sys, cli\n"
+        f"sys.argv = ['cli.py'] + {list(args)!r}\n"
+        "try:\n"
+        "    cli.main()\n"
+        "except SystemExit as e:\n"
+        "    code = e.code or 0\n"
+        "else:\n"
+        "    code = 0\n"
+        "print(sorted(sys.modules))\n"
+        "sys.exit(code)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=str(Path(CLI).parent),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    modules = result.stdout.strip().splitlines()[-1]
+    return result.returncode, result.stderr, modules
+
+class TestCheckAndLazyImports(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.good = self.root / 'good.conf'
+        self.good.write_text("x := 1; { a -> ?(x) }", encoding='utf-8')
+        self.bad = self.root / 'bad.conf'
+        self.bad.write_text("x := ?(x); { a -> ?(missing). b -> ?(other) }", encoding='utf-8')
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_check(self):
+        """Тест --check: код выхода и сообщения без генерации TOML"""
+        code, stderr, modules = run_cli('--check', str(self.good))
+        self.assertEqual(code, 0)
+        self.assertNotIn("'tomlkit'", modules)
+        
+        code, stderr, _ = run_cli('--check', str(self.root))
+        self.assertEqual(code, 1)
+        self.assertIn('bad.conf: Ошибка времени выполнения: Циклическая зависимость констант: x -> x', stderr)
+        self.assertIn('bad.conf: Ошибка имени: Неопределенная константа: missing (в ключе a)', stderr)
+        self.assertIn('bad.conf: Ошибка имени: Неопределенная константа: other (в ключе b)', stderr)
+        self.assertIn('Проверено: 2, с ошибками: 1', stderr)
+        self.assertNotIn('good.conf', stderr)
+        self.assertFalse(self.good.with_suffix('.toml').exists())
+    
+    def test_check_reports_all_syntax_errors(self):
+        """Тест --check: все синтаксические ошибки файла за один запуск"""
+        broken = self.root / 'broken.conf'
+        broken.write_text("x := ;\n{ a -> . b -> 2 }\n", encoding='utf-8')
+        code, stderr, _ = run_cli('--check', str(broken))
+        self.assertEqual(code, 1)
+        self.assertIn('broken.conf: Синтаксическая ошибка: Ожидалось значение, '
+                      'получен TokenType.SEMICOLON в 1:6', stderr)
+        self.assertIn('broken.conf: Синтаксическая ошибка: Ожидалось значение, '
+                      'получен TokenType.DOT в 2:8', stderr)
+    
+    def test_help_does_not_import_converter(self):
+        """Тест: --help не импортирует конвертер и tomlkit"""
+        code, _, modules = run_cli('--help')
+        self.assertEqual(code, 0)
+        for module in ("'converter'", "'tomlkit'", "'lexer'"):
+            self.assertNotIn(module, modules)
+    
+    def test_fast_mode_does_not_import_tomlkit(self):
+        """Тест: быстрый режим генератора обходится без tomlkit"""
+        script = ("import sys\nfrom converter import ConfigConverter\n"
+                  "ConfigConverter(mode='fast').convert_string('{ a -> 1 }')\n"
+                  "print('tomlkit' in sys.modules)")
+        result = subprocess.run([sys.executable, '-c', script], cwd=str(Path(CLI).parent),
+                                stdout=subprocess.PIPE, text=True)
+        self.assertEqual(result.stdout.strip(), 'False')
+
+if __name__ == '__main__':
+    unittest.main()
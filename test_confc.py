@@ -0,0 +1,111 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from array import array
+from pathlib import Path
+
+import confc
+from cli import main
+from converter import ConfigConverter, ConversionError
+
+class TestConfc(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_round_trip(self):
+        """Тест записи и чтения всех типов значений"""
+        shared = [1, {'x': 2}]
+        value = {'a': 1, 'b': {'packed': [1, -2, 3], 'c': shared, 'd': shared},
+                 'big': 2 ** 100, 'negative': -2 ** 70, 's': 'строка', 't': True, 'f': 1.5,
+                 'empty': {}, 'empty_list': []}
+        result = confc.loads(confc.dumps(value))
+        self.assertEqual(result, value)
+        self.assertEqual(list(result), list(value))
+        self.assertIs(result['b']['c'], result['b']['d'])
+        self.assertEqual(confc.loads(confc.dumps([array('q', [5]), [True, 2 ** 64]])), [[5], [True, 2 ** 64]])
+        self.assertEqual(type(result['b']['packed']), list)
+        with self.assertRaises(TypeError):
+            confc.dumps({'a': object()})
+    
+    def test_deep_nesting(self):
+        """Тест вложенности глубже лимита рекурсии"""
+        value = 7
+        for _ in range(5000):
+            value = {'a': [value]}
+        result = confc.loads(confc.dumps(value))
+        for _ in range(5000):
+            result = result['a'][0]
+        self.assertEqual(result, 7)
+    
+    def test_bad_header(self):
+        """Тест ошибок формата"""
+        for data in (b'', b'TOML0000', confc.dumps({})[:4] + b'\x09\x00\x00\x00'):
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    confc.loads(data)
+    
+    def test_compile_and_lazy_load(self):
+        """Тест компиляции файла и ленивой загрузки"""
+        source = self.root / 'app.conf'
+        source.write_text("port := 8080; hosts := << 1, 2 >>; "
+                          "{ server -> { port -> ?(port). hosts -> ?(hosts) }. "
+                          "db -> { hosts -> ?(hosts) } }", encoding='utf-8')
+        main(['compile', str(source)])
+        compiled = source.with_suffix('.confc')
+        data = confc.load(compiled)
+        self.assertEqual(data, {'server': {'port': 8080, 'hosts': [1, 2]},
+                                'db': {'hosts': [1, 2]}})
+        
+        table = confc.load(compiled, lazy=True)
+        self.assertIsInstance(table, confc.LazyTable)
+        self.assertEqual(list(table), ['server', 'db'])
+        self.assertIsInstance(table['server'], confc.LazyTable)
+        self.assertEqual(table['server']['port'], 8080)
+        self.assertEqual(table.to_dict(), data)
+        self.assertNotIn('missing', table)
+        table['server'].close()
+        self.assertEqual(table['db']['hosts'], [1, 2])
+        table.close()
+        table.close()
+        
+        # После закрытия файл можно заменить (на Windows открытое отображение мешает)
+        with confc.load(compiled, lazy=True) as table:
+            server = table['server']
+            self.assertEqual(server['port'], 8080)
+        self.assertEqual(server['port'], 8080)
+        with self.assertRaises(ValueError):
+            server['hosts']
+        os.replace(compiled, self.root / 'moved.confc')
+        path = self.root / 'scalar.confc'
+        path.write_bytes(confc.dumps([1, 2]))
+        self.assertEqual(confc.load(path, lazy=True), [1, 2])
+        os.remove(path)
+    
+    def test_compile_error(self):
+        """Тест: ошибка конвертации не оставляет выходного файла"""
+        source = self.root / 'bad.conf'
+        source.write_text("{ a -> ?(missing) }", encoding='utf-8')
+        output = self.root / 'bad.confc'
+        with self.assertRaises(ConversionError):
+            ConfigConverter().compile_to_path(source, output)
+        self.assertFalse(output.exists())
+        self.assertEqual(os.listdir(self.root), ['bad.conf'])
+    
+    def test_load_does_not_import_pipeline(self):
+        """Тест: загрузка не импортирует лексер, парсер и tomlkit"""
+        path = self.root / 'x.confc'
+        path.write_bytes(confc.dumps({'a': {'b': 1}}))
+        script = (f"import sys, confc\nassert confc.load({str(path)!r}, lazy=True)['a']['b'] == 1\n"
+                  "print([m for m in ('lexer', 'parser', 'tomlkit', 'converter') if m in sys.modules])")
+        result = subprocess.run([sys.executable, '-c', script], cwd=str(Path(__file__).resolve().parent),
+                                stdout=subprocess.PIPE, text=True)
+        self.assertEqual(result.stdout.strip(), '[]')
+
+if __name__ == '__main__':
+    unittest.main()
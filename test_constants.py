@@ -0,0 +1,89 @@
+import json
+import unittest
+from constants import ConstantEvaluator, ConstantGraph
+from lexer import Lexer
+from parser import ConstDeclarationNode, Parser
+
+def evaluate(source):
+    evaluator = ConstantEvaluator()
+    result = evaluator.evaluate_all(Parser(Lexer(source, engine='fast').iter_tokens()).parse())
+    return evaluator, result
+
+def graph(source):
+    nodes = Parser(Lexer(source, engine='fast').iter_tokens()).parse()
+    return ConstantGraph([node for node in nodes if isinstance(node, ConstDeclarationNode)])
+
+class TestConstantGraph(unittest.TestCase):
+    def test_forward_reference(self):
+        """Тест ссылки на константу, объявленную ниже"""
+        evaluator, result = evaluate("a := << ?(b), 1 >>; b := 2; { x -> ?(a) }")
+        self.assertEqual(result, {'x': [2, 1]})
+        self.assertEqual(evaluator.constants, {'a': [2, 1], 'b': 2})
+    
+    def test_redeclaration_refers_to_previous(self):
+        """Тест повторного объявления: ссылка на предыдущее значение"""
+        _, result = evaluate("x := 1; y := ?(x); x := << ?(x), 2 >>; { a -> ?(x). b -> ?(y) }")
+        self.assertEqual(result, {'a': [1, 2], 'b': 1})
+    
+    def test_topological_order(self):
+        """Тест порядка вычисления: зависимости раньше зависимых"""
+        order = graph("c := ?(b); b := ?(a); a := 1;").order
+        self.assertEqual(order, [2, 1, 0])
+    
+    def test_cycles_reported_with_paths(self):
+        """Тест обнаружения всех циклов с полным путем"""
+        source = "a := ?(b); b := ?(c); c := ?(a); d := ?(d); e := ?(a);"
+        self.assertEqual(graph(source).cycles, [['a', 'b', 'c', 'a'], ['d', 'd']])
+        with self.assertRaises(RuntimeError) as context:
+            evaluate(source)
+        self.assertIn('a -> b -> c -> a; d -> d', str(context.exception))
+    
+    def test_undefined_constant(self):
+        """Тест ссылки на необъявленную константу"""
+        with self.assertRaises(NameError):
+            evaluate("a := ?(missing); { x -> 1 }")
+    
+    def test_packed_arrays_evaluate_to_lists(self):
+        """Тест: упакованные числовые массивы вычисляются в обычные списки"""
+        _, data = evaluate("a := << 1, 2 >>; { x -> ?(a). y -> << << 3 >>, ?(a) >> }")
+        self.assertEqual(data, {'x': [1, 2], 'y': [[3], [1, 2]]})
+        self.assertIs(type(data['x']), list)
+        self.assertIs(data['x'], data['y'][1])
+        self.assertEqual(json.dumps(data), '{"x": [1, 2], "y": [[3], [1, 2]]}')
+    
+    def test_affected_outputs(self):
+        """Тест: какие значения меняются при изменении константы"""
+        evaluator, _ = evaluate("base := 1; port := ?(base); other := 2;"
+                                "{ server -> { port -> ?(port) }. client -> ?(other). raw -> 3 }")
+        self.assertEqual(evaluator.graph.affected_names(['base']), {'base', 'port'})
+        self.assertEqual(evaluator.affected_outputs('base'), ['server'])
+        self.assertEqual(evaluator.affected_outputs('other'), ['client'])
+    
+    def test_validate_collects_all_errors(self):
+        """Тест проверки: все неопределенные имена и все циклы"""
+        source = ("a := ?(b); b := ?(a); c := ?(missing); d := ?(d);"
+                  "{ x -> ?(gone). y -> << ?(c), ?(also_gone) >> }")
+        nodes = Parser(Lexer(source, engine='fast').iter_tokens()).parse()
+        messages = [f"{type(error).__name__}: {error}" for error in ConstantEvaluator().validate(nodes)]
+        self.assertEqual(messages, [
+            "NameError: Неопределенная константа: missing (в объявлении c)",
+            "RuntimeError: Циклическая зависимость констант: a -> b -> a",
+            "RuntimeError: Циклическая зависимость констант: d -> d",
+            "NameError: Неопределенная константа: gone (в ключе x)",
+            "NameError: Неопределенная константа: also_gone (в ключе y)",
+        ])
+        valid = Parser(Lexer("a := ?(b); b := 1; { x -> ?(a) }").iter_tokens()).parse()
+        self.assertEqual(ConstantEvaluator().validate(valid), [])
+    
+    def test_long_chain(self):
+        """Тест длинной цепочки ссылок без рекурсии"""
+        count = 20_000
+        source = ''.join(f"c{index} := ?(c{index + 1}); " for index in range(count))
+        source += f"c{count} := 7; {{ x -> ?(c0) }}"
+        _, result = evaluate(source)
+        self.assertEqual(result, {'x': 7})
+        with self.assertRaises(RuntimeError):
+            evaluate(source.replace(f"c{count} := 7", f"c{count} := ?(c0)"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from constants import ConstantEvaluator
+from converter import ConfigConverter, ConversionError
+from imports import ModuleCache
+from lexer import Lexer
+from parallel import evaluate_parallel
+from parser import ImportNode, Parser
+
+def parse(source):
+    return Parser(Lexer(source, engine='fast').iter_tokens()).parse()
+
+class TestImports(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / 'common').mkdir()
+        self.write('common/base.conf', 'port := 80;\nhosts := << 1, 2 >>;\nimport "extra.conf";')
+        self.write('common/extra.conf', 'retries := 3;')
+        self.write('service.conf', 'import "common/base.conf";\n'
+                                   'port := 8080;\n'
+                                   '{ port -> ?(port). hosts -> ?(hosts). retries -> ?(retries) }')
+        self.modules = ModuleCache()
+        self.converter = ConfigConverter(engine='fast', mode='fast', modules=self.modules)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def write(self, name, text, mtime_ns=None):
+        path = self.root / name
+        path.write_text(text, encoding='utf-8')
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+    
+    def evaluate(self, name='service.conf'):
+        path = self.root / name
+        return self.converter._evaluate_source(path.read_text(encoding='utf-8'), source_path=path)
+    
+    def test_parse(self):
+        """Тест разбора директивы import и имени import как константы"""
+        nodes = parse('import "a/b.conf";\nimport := 1;\n{ x -> ?(import) }')
+        self.assertIsInstance(nodes[0], ImportNode)
+        self.assertEqual(nodes[0].path, 'a/b.conf')
+        self.assertEqual(ConstantEvaluator().evaluate_all(nodes[1:]), {'x': 1})
+        with self.assertRaises(SyntaxError):
+            parse('import "a.conf"')
+    
+    def test_import(self):
+        """Тест импорта констант: транзитивные импорты и перекрытие своими объявлениями"""
+        data = self.evaluate()
+        self.assertEqual(data['port'], 8080)
+        self.assertEqual(list(data['hosts']), [1, 2])
+        self.assertEqual(data['retries'], 3)
+        self.assertIn('port = 8080', self.converter.convert_path(self.root / 'service.conf'))
+    
+    def test_cache(self):
+        """Тест повторного использования разобранных файлов"""
+        self.evaluate()
+        self.assertEqual((self.modules.hits, self.modules.misses), (0, 2))
+        self.write('other.conf', 'import "common/base.conf";\n{ p -> ?(port) }')
+        self.assertEqual(self.evaluate('other.conf'), {'p': 80})
+        self.evaluate()
+        self.assertEqual((self.modules.hits, self.modules.misses), (2, 2))
+    
+    def test_values_not_shared(self):
+        """Тест независимости результатов конвертаций от изменений прежних результатов"""
+        self.write('app.conf', 'import "common/base.conf";\n'
+                               '{ a -> ?(hosts). b -> ?(hosts). c -> << ?(hosts) >> }')
+        data = self.evaluate('app.conf')
+        self.assertIs(data['a'], data['b'])
+        self.assertIs(data['c'][0], data['a'])
+        data['a'].append(99)
+        self.converter.get(self.root / 'app.conf', 'a').append(98)
+        self.assertEqual(self.evaluate('app.conf')['a'], [1, 2])
+        self.assertIn('a = [1, 2]', self.converter.convert_path(self.root / 'app.conf'))
+        self.assertEqual(self.modules.misses, 2)
+    
+    def test_invalidation(self):
+        """Тест перечитывания измененного файла и файла, изменившего импорт"""
+        self.evaluate()
+        self.write('common/base.conf', 'port := 81;\nhosts := 1;\nimport "extra.conf";', mtime_ns=1)
+        self.assertEqual(self.evaluate()['hosts'], 1)
+        self.write('common/extra.conf', 'retries := 5;', mtime_ns=2)
+        self.assertEqual(self.evaluate()['retries'], 5)
+        self.assertEqual(self.modules.misses, 5)
+    
+    def test_errors(self):
+        """Тест ошибок импорта: отсутствующий файл, цикл, ошибка в импортируемом файле"""
+        self.write('common/extra.conf', 'import "base.conf";')
+        with self.assertRaisesRegex(ImportError, 'Циклический импорт: base.conf -> extra.conf -> base.conf'):
+            self.evaluate()
+        # Конвертируемый файл начинает цепочку: его импорт обратно — цикл с него, без повторного разбора
+        self.write('common/extra.conf', 'import "../service.conf";')
+        misses = self.modules.misses
+        with self.assertRaisesRegex(ImportError,
+                                    'Циклический импорт: service.conf -> base.conf -> extra.conf -> service.conf$'):
+            self.evaluate()
+        self.assertEqual(self.modules.misses, misses + 2)
+        with self.assertRaisesRegex(ConversionError, 'Циклический импорт: service.conf -> base.conf'):
+            self.converter.convert_path(self.root / 'service.conf')
+        self.write('common/extra.conf', 'retries := 3;')
+        self.write('a.conf', 'import "missing.conf";')
+        with self.assertRaisesRegex(ImportError, 'Импортируемый файл не найден'):
+            self.evaluate('a.conf')
+        self.write('b.conf', 'import "c.conf";')
+        self.write('c.conf', 'x := ?(y);')
+        with self.assertRaisesRegex(ImportError, 'Ошибка в импортируемом файле .*c.conf: Неопределенная константа'):
+            self.evaluate('b.conf')
+        with self.assertRaisesRegex(ConversionError, '^Ошибка импорта: Импортируемый файл не найден'):
+            self.converter.convert_path(self.root / 'a.conf')
+        with self.assertRaisesRegex(ImportError, 'без загрузчика'):
+            ConstantEvaluator().evaluate_all(parse('import "a.conf";'))
+    
+    def test_validate(self):
+        """Тест проверки файла с импортами"""
+        self.assertEqual(self.converter.validate(self.root / 'service.conf'), [])
+        self.write('a.conf', 'import "missing.conf";\n{ x -> ?(port) }')
+        errors = self.converter.validate(self.root / 'a.conf')
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(errors[0].startswith('Ошибка импорта: Импортируемый файл не найден'))
+    
+    def test_result_cache_bypassed(self):
+        """Тест конвертации файла с импортами мимо кэша результатов"""
+        from cache import ConversionCache
+        converter = ConfigConverter(engine='fast', mode='fast', modules=self.modules,
+                                    cache=ConversionCache(self.root / 'cache'))
+        self.assertIn('retries = 3', converter.convert_path(self.root / 'service.conf'))
+        self.write('common/extra.conf', 'retries := 4;', mtime_ns=1)
+        self.assertIn('retries = 4', converter.convert_path(self.root / 'service.conf'))
+        # Комментарий между import и путем: директива видна только по AST
+        path = self.write('commented.conf', 'import \' общие\n"common/extra.conf";\n{ r -> ?(retries) }')
+        self.assertIn('r = 4', converter.convert_path(path))
+        self.write('common/extra.conf', 'retries := 5;', mtime_ns=2)
+        self.assertIn('r = 5', converter.convert_path(path))
+        # Слово import без директивы не мешает кэшу
+        path = self.write('plain.conf', "import := 1; ' import\n{ r -> ?(import) }")
+        self.assertIn('r = 1', converter.convert_path(path))
+        self.assertEqual(len(list((self.root / 'cache').glob('*.toml'))), 1)
+    
+    def test_parallel(self):
+        """Тест импорта при параллельном разборе"""
+        path = self.root / 'service.conf'
+        importer = self.modules.importer(str(self.root))
+        result = evaluate_parallel(path.read_text(encoding='utf-8'), workers=2, min_entries=1,
+                                   importer=importer)
+        self.assertEqual(result['retries'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
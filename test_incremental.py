@@ -0,0 +1,122 @@
+import random
+import unittest
+from constants import ConstantEvaluator
+from incremental import IncrementalDocument
+from lexer import Lexer
+from parser import Parser
+
+SOURCE = """' Базовые значения
+base := 8000;
+offset := 80;
+ports := << ?(base), ?(offset) >>;
+{
+    server -> { port -> ?(base). extra -> ?(ports) }.
+    client -> { retries -> 3 }.
+    limits -> << 1, 2, 3 >>
+}
+"""
+
+def full_result(source):
+    """Результат полного разбора либо тип ошибки"""
+    try:
+        nodes = Parser(Lexer(source).iter_tokens()).parse()
+        return ConstantEvaluator().evaluate_all(nodes)
+    except (SyntaxError, NameError, RuntimeError) as e:
+        return type(e)
+
+def apply(document, offset, removed, inserted):
+    """Правка документа; результат либо тип ошибки"""
+    try:
+        document.apply_edit(offset, removed, inserted)
+        return document.result
+    except (SyntaxError, NameError, RuntimeError) as e:
+        return type(e)
+
+class TestIncrementalDocument(unittest.TestCase):
+    def test_initial_result(self):
+        """Тест совпадения с полным разбором"""
+        self.assertEqual(IncrementalDocument(SOURCE).result, full_result(SOURCE))
+    
+    def test_edit_inside_entry(self):
+        """Тест правки внутри записи: переразбирается только она"""
+        document = IncrementalDocument(SOURCE)
+        server = document.items[3].node
+        offset = SOURCE.index('retries -> 3') + len('retries -> ')
+        edit = document.apply_edit(offset, 1, '5')
+        self.assertFalse(edit.full_reparse)
+        self.assertEqual(edit.constants, [])
+        self.assertEqual(edit.entries, ['client'])
+        self.assertEqual(document.result['client'], {'retries': 5})
+        # Незатронутые поддеревья переиспользуются
+        self.assertIs(document.items[3].node, server)
+    
+    def test_edit_constant_reevaluates_dependents(self):
+        """Тест правки константы: пересчитываются только зависимые"""
+        document = IncrementalDocument(SOURCE)
+        offset = SOURCE.index('8000')
+        edit = document.apply_edit(offset, 4, '9000')
+        self.assertFalse(edit.full_reparse)
+        self.assertEqual(edit.constants, ['base', 'ports'])
+        self.assertEqual(edit.entries, ['server'])
+        self.assertEqual(document.result, full_result(document.source))
+    
+    def test_structural_edit_falls_back_to_full_reparse(self):
+        """Тест правки вне единиц разбора"""
+        document = IncrementalDocument(SOURCE)
+        offset = SOURCE.index('}.\n    client') + 2
+        edit = document.apply_edit(offset, 0, ' other -> 1.')
+        self.assertTrue(edit.full_reparse)
+        self.assertEqual(document.result['other'], 1)
+    
+    def test_errors_and_recovery(self):
+        """Тест ошибочной правки и последующего исправления"""
+        document = IncrementalDocument(SOURCE)
+        offset = SOURCE.index('?(offset)') + 2
+        self.assertIs(apply(document, offset, 6, 'missing'), NameError)
+        self.assertEqual(apply(document, offset, 7, 'offset'), full_result(SOURCE))
+    
+    def test_imports(self):
+        """Тест директивы import: константы из загрузчика, правки рядом и в самой директиве"""
+        modules = {'a.conf': {'port': 80, 'hosts': [1, 2]}, 'b.conf': {'port': 81}}
+        loaded = []
+        
+        def importer(path):
+            loaded.append(path)
+            return modules[path]
+        
+        source = 'import "a.conf";\nlocal := ?(port);\n{ x -> ?(local). y -> ?(hosts) }'
+        document = IncrementalDocument(source, importer)
+        self.assertEqual(document.result, {'x': 80, 'y': [1, 2]})
+        self.assertIsNot(document.result['y'], modules['a.conf']['hosts'])
+        
+        edit = document.apply_edit(source.index('?(hosts)'), 8, '?(port)')
+        self.assertFalse(edit.full_reparse)
+        self.assertEqual(document.result, {'x': 80, 'y': 80})
+        self.assertEqual(loaded, ['a.conf'])
+        
+        edit = document.apply_edit(source.index('a.conf'), 1, 'b')
+        self.assertTrue(edit.full_reparse)
+        self.assertEqual(document.result, {'x': 81, 'y': 81})
+        self.assertEqual(loaded, ['a.conf', 'b.conf'])
+        with self.assertRaisesRegex(ImportError, 'без загрузчика'):
+            IncrementalDocument(source)
+    
+    def test_random_edits_match_full_parse(self):
+        """Тест случайных правок против полного разбора"""
+        fragments = ['1', '42', '?(base)', '?(offset)', '?(ports)', ' ', '<< 7 >>',
+                     '{ z -> 1 }', 'name', '.', ',', ';', ' -> ', ' := ']
+        rng = random.Random(2024)
+        document = IncrementalDocument(SOURCE)
+        for _ in range(400):
+            source = document.source
+            offset = rng.randint(0, len(source))
+            removed = rng.randint(0, min(4, len(source) - offset))
+            inserted = rng.choice(fragments) if rng.random() < 0.8 else ''
+            expected = full_result(source[:offset] + inserted + source[offset + removed:])
+            with self.subTest(source=source, offset=offset, removed=removed, inserted=inserted):
+                self.assertEqual(apply(document, offset, removed, inserted), expected)
+            if isinstance(expected, type) and rng.random() < 0.5:
+                document = IncrementalDocument(SOURCE)
+
+if __name__ == '__main__':
+    unittest.main()
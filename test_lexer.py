@@ -0,0 +1,115 @@
+import random
+import unittest
+from pathlib import Path
+from lexer import Lexer, TokenStream, TokenType
+from parser import Parser
+
+EXAMPLES_DIR = Path(__file__).parent
+
+def token_tuples(tokens):
+    return [(t.type, t.value, t.line, t.column) for t in tokens]
+
+def lex_outcome(source, engine):
+    """Токены либо текст ошибки для выбранного движка"""
+    try:
+        return token_tuples(Lexer(source, engine=engine).tokenize())
+    except SyntaxError as e:
+        return ('error', str(e))
+
+class TestFastLexerParity(unittest.TestCase):
+    def assertParity(self, source):
+        expected = lex_outcome(source, 'char')
+        self.assertEqual(lex_outcome(source, 'fast'), expected)
+        self.assertEqual(lex_outcome(source.encode('utf-8'), 'fast'), expected)
+
+    def test_examples(self):
+        """Тест совпадения токенов на примерах"""
+        for name in ('example1.conf', 'example2.conf'):
+            source = (EXAMPLES_DIR / name).read_text(encoding='utf-8')
+            self.assertParity(source)
+
+    def test_valid_constructs(self):
+        """Тест совпадения токенов на корректных конструкциях"""
+        sources = [
+            "",
+            "   \n\t  ",
+            "123",
+            "<< 1, 2, 3 >>",
+            "x := 5;\n{ a -> ?(x). b -> << ?(x), 7 >> }",
+            "' комментарий\n{ ключ -> 1 }",
+            "' комментарий без перевода строки",
+            "abc_1 12abc",
+            "{\r\n  a -> 1\r\n}",
+            "' коммент\n{ ключ -> 1. ab\u00a0cd -> 2 }",
+            "x\x1fy\u2028z",
+            'import "общие/база.conf";\nimport "b.conf";',
+            "1٣ { a -> 12٣٤. b -> 1éa. c -> 7\u00a0} 5١",
+        ]
+        for source in sources:
+            with self.subTest(source=source):
+                self.assertParity(source)
+
+    def test_errors(self):
+        """Тест совпадения сообщений об ошибках"""
+        sources = ["0", "{ a -> 1 } @", "\n\n  ?x", "<", "-", ":", "a -> ²", "1²", "{ a -> 12³ }", '"str', '"a\nb"']
+        for source in sources:
+            with self.subTest(source=source):
+                outcome = lex_outcome(source, 'fast')
+                self.assertEqual(outcome[0], 'error')
+                self.assertEqual(outcome, lex_outcome(source, 'char'))
+                self.assertEqual(lex_outcome(source.encode('utf-8'), 'fast'), outcome)
+
+    def test_random_sources(self):
+        """Тест совпадения токенов на случайных входах"""
+        pieces = ['<<', '>>', '{', '}', '->', '.', ';', ',', ':=', '?(', ')',
+                  'name', '_x1', '42', '7', ' ', '\n', '\t', "' note\n", 'é',
+                  "' заметка\n", '\u00a0', 'ж', '@', '"', '"путь.conf"', '٣', '²']
+        rng = random.Random(12345)
+        for _ in range(300):
+            source = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+            with self.subTest(source=source):
+                self.assertParity(source)
+
+    def test_get_next_token(self):
+        """Тест пошагового получения токенов"""
+        lexer = Lexer("<< 1 >>", engine='fast')
+        types = [lexer.get_next_token().type for _ in range(5)]
+        self.assertEqual(types, [TokenType.ARRAY_START, TokenType.NUMBER,
+                                 TokenType.ARRAY_END, TokenType.EOF, TokenType.EOF])
+
+    def test_unknown_engine(self):
+        """Тест неизвестного движка"""
+        with self.assertRaises(ValueError):
+            Lexer("1", engine='turbo')
+
+class TestTokenStream(unittest.TestCase):
+    def test_peek_and_next(self):
+        """Тест заглядывания вперед и потребления"""
+        stream = TokenStream(Lexer("a := 1;").iter_tokens())
+        self.assertEqual(stream.peek(1).type, TokenType.ASSIGN)
+        self.assertEqual(stream.next().value, 'a')
+        self.assertEqual(stream.next().type, TokenType.ASSIGN)
+        for _ in range(2):
+            stream.next()
+        self.assertEqual(stream.next().type, TokenType.EOF)
+        self.assertEqual(stream.next().type, TokenType.EOF)
+
+    def test_lookahead_is_bounded(self):
+        """Тест ограничения буфера заглядывания"""
+        stream = TokenStream(Lexer("1").iter_tokens())
+        with self.assertRaises(ValueError):
+            stream.peek(2)
+
+    def test_streaming_parse_matches_list_parse(self):
+        """Тест совпадения AST при разборе потока и списка токенов"""
+        source = (EXAMPLES_DIR / 'example2.conf').read_text(encoding='utf-8')
+        source = source.split('{', 1)[0].replace('"Space Adventure"', '7')
+        source += "{ a -> << ?(version_major), { b -> 2 } >>. c -> {} }"
+        for engine in ('char', 'fast'):
+            with self.subTest(engine=engine):
+                streamed = Parser(Lexer(source, engine=engine).iter_tokens()).parse()
+                listed = Parser(Lexer(source).tokenize()).parse()
+                self.assertEqual(repr(streamed), repr(listed))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import sys
+import unittest
+from pathlib import Path
+
+from converter import ConfigConverter
+from parallel import evaluate_parallel, evaluate_serial, prescan
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'benchmarks'))
+from synth import generate
+
+def outcome(function, source):
+    """Результат или (тип, текст) ошибки"""
+    try:
+        return function(source)
+    except Exception as e:
+        return type(e), str(e)
+
+class TestParallel(unittest.TestCase):
+    def parallel(self, source):
+        return evaluate_parallel(source, workers=2, min_entries=1)
+    
+    def test_prescan(self):
+        """Тест границ словарей верхнего уровня"""
+        source = "x := { a -> 1. b -> 2 };\n{ a -> << 1, 2 >>. b -> { c -> 1. d -> 2 } ' . }\n}\n{}"
+        segments = prescan(source)
+        self.assertEqual([(segment.start, segment.end) for segment in segments],
+                         [(25, source.index('}\n{}') + 1), (len(source) - 2, len(source))])
+        self.assertEqual([segment.entries for segment in segments], [2, 0])
+        # Значение объявления узнается по ':=' перед словарем, а не по ';' после него
+        source = "{ a -> 1 } y := 1;\nz := ' комментарий\n { b -> 2 }; { c -> 3 } import \"{.conf\"; { d -> 4 };"
+        self.assertEqual([source[segment.start:segment.end] for segment in prescan(source)],
+                         ["{ a -> 1 }", "{ c -> 3 }", "{ d -> 4 }"])
+        self.assertIsNone(prescan("{ a -> << 1 } >>"))
+        self.assertIsNone(prescan("{ a -> 1 } }"))
+    
+    def test_same_results(self):
+        """Тест совпадения результатов с последовательным разбором"""
+        sources = [
+            generate(size=60_000, depth=3, constants=30, fanout=3, single=True),
+            generate(size=30_000, depth=2, constants=10),
+            "x := { a -> 1 }; { b -> ?(x). c -> << 1, 2 >>. d -> { e -> 1 } } 5 { b -> 7. e -> ?(y) } y := 3;",
+            "{ a -> 1 ' комментарий . }\n. b -> 2 }",
+            "{  }",
+            "{ a -> 1. b -> 2 } y := 1; { a -> ?(y) } z := { a -> 5 };",
+        ]
+        for source in sources:
+            with self.subTest(source=source[:40]):
+                expected = evaluate_serial(source)
+                result = self.parallel(source)
+                self.assertEqual(result, expected)
+                self.assertEqual(list(result), list(expected))
+    
+    def test_same_errors(self):
+        """Тест совпадения ошибок с последовательным разбором"""
+        sources = [
+            "x := 1; { a -> ?(x). b -> ?(y). c -> 2 }",
+            "{ a -> 1. b -> . c -> 2 }",
+            "{ a -> 1. }",
+            "{ a -> 1. b -> 2 } }",
+            "x := ?(y); y := ?(x); { a -> 1. b -> 2 }",
+            "{ a -> 1. b -> 2 };",
+        ]
+        for source in sources:
+            with self.subTest(source=source):
+                expected = outcome(evaluate_serial, source)
+                self.assertIsInstance(expected, tuple)
+                self.assertEqual(outcome(self.parallel, source), expected)
+    
+    def test_converter(self):
+        """Тест ConfigConverter с несколькими процессами"""
+        source = generate(size=20_000, depth=2, constants=10, single=True)
+        serial = ConfigConverter(engine='fast', mode='fast').convert_source(source)
+        parallel = ConfigConverter(engine='fast', mode='fast', workers=2).convert_source(source)
+        self.assertEqual(parallel.split('\n', 1)[1], serial.split('\n', 1)[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,14 @@
+import io
+import os
+import tempfile
 import unittest
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from converter import ConfigConverter
+from constants import ConstantEvaluator
+from lexer import Lexer
+from parser import ConstDeclarationNode, PackedArrayNode, Parser
+from toml_generator import TOMLGenerator
 
 class TestConfigConverter(unittest.TestCase):
     def setUp(self):
@@ -112,11 +121,193 @@ class TestConfigConverter(unittest.TestCase):
         result = self.converter.convert_string(source)
         self.assertIn('servers = ["server1", "server2", "server3"]', result)
     
+    def test_convert_to_stream(self):
+        """Тест потоковой записи TOML"""
+        source = "x := 5; { a -> { b -> ?(x). c -> { d -> 1 } }. e -> 2. f -> {} }"
+        out = io.StringIO()
+        ConfigConverter().convert_to_stream(io.StringIO(source), out)
+        expected = ConfigConverter().convert_string(source)
+        self.assertEqual(out.getvalue().split('\n', 1)[1], expected.split('\n', 1)[1])
+    
+    def test_mmap_input(self):
+        """Тест чтения файла через mmap"""
+        source = "' Заголовок\nимя := 5;\n{ ключ -> { b -> ?(имя) }. e -> << 1, 2 >> }\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'config.conf')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            text_result = ConfigConverter(mode='fast').convert_file(path)
+            mmap_result = ConfigConverter(mode='fast', input_mode='mmap').convert_file(path)
+        self.assertEqual(mmap_result.split('\n', 1)[1], text_result.split('\n', 1)[1])
+        self.assertIn('b = 5', mmap_result)
+    
     def test_dict_in_array(self):
         """Тест словаря в массиве"""
         source = "<< { name -> \"item1\". value -> 100 }, { name -> \"item2\". value -> 200 } >>"
         result = self.converter.convert_string(source)
         self.assertIn('_result = [{ name = "item1", value = 100 }, { name = "item2", value = 200 }]', result)
 
+class TestPackedArrays(unittest.TestCase):
+    def parse_value(self, source):
+        return Parser(Lexer(source).iter_tokens()).parse_value()
+
+    def test_numeric_array_is_packed(self):
+        """Тест упаковки массива из чисел"""
+        node = self.parse_value("<< 1, 2, 3 >>")
+        self.assertIsInstance(node, PackedArrayNode)
+        self.assertEqual(node.values, array('q', [1, 2, 3]))
+        self.assertEqual([element.value for element in node.elements], [1, 2, 3])
+
+    def test_mixed_array_is_not_packed(self):
+        """Тест смешанного массива"""
+        node = self.parse_value("<< 1, 2, ?(x), 4 >>")
+        self.assertNotIsInstance(node, PackedArrayNode)
+        self.assertEqual(len(node.elements), 4)
+
+    def test_overflow_falls_back_to_nodes(self):
+        """Тест чисел, не помещающихся в int64"""
+        node = self.parse_value("<< 1, 99999999999999999999 >>")
+        self.assertNotIsInstance(node, PackedArrayNode)
+        self.assertEqual(ConstantEvaluator().evaluate_node(node), [1, 99999999999999999999])
+
+    def test_packed_array_generation(self):
+        """Тест генерации TOML из упакованного массива"""
+        nodes = Parser(Lexer("n := << 1, 2 >>; { a -> ?(n). b -> << ?(n), << 3 >> >> }").iter_tokens()).parse()
+        result = TOMLGenerator().generate_from_nodes(nodes, ConstantEvaluator())
+        self.assertIn('a = [1, 2]', result)
+        self.assertIn('b = [[1, 2], [3]]', result)
+
+class TestDeepNesting(unittest.TestCase):
+    DEPTH = 5000
+
+    def parse_value(self, source):
+        return Parser(Lexer(source, engine='fast').iter_tokens()).parse_value()
+
+    def test_deep_arrays(self):
+        """Тест массивов с вложенностью глубже лимита рекурсии"""
+        node = self.parse_value('<< ' * self.DEPTH + '7' + ' >>' * self.DEPTH)
+        value = ConstantEvaluator().evaluate_node(node)
+        for _ in range(self.DEPTH - 1):
+            self.assertEqual(len(value), 1)
+            value = value[0]
+        self.assertEqual(value, [7])
+
+    def test_deep_dicts(self):
+        """Тест словарей с вложенностью глубже лимита рекурсии"""
+        node = self.parse_value('{ a -> ' * self.DEPTH + '7' + ' }' * self.DEPTH)
+        value = ConstantEvaluator().evaluate_node(node)
+        for _ in range(self.DEPTH):
+            value = value['a']
+        self.assertEqual(value, 7)
+
+    def test_evaluation_order_and_duplicates(self):
+        """Тест порядка ключей и перезаписи повторяющихся ключей"""
+        node = self.parse_value("{ b -> 1. a -> << { c -> 2 }, 3 >>. b -> 4 }")
+        value = ConstantEvaluator().evaluate_node(node)
+        self.assertEqual(list(value), ['b', 'a'])
+        self.assertEqual(value, {'b': 4, 'a': [{'c': 2}, 3]})
+
+    def test_error_messages(self):
+        """Тест сообщений об ошибках во вложенных структурах"""
+        cases = {
+            "<< 1, { a -> 2 >>": "Ожидался TokenType.DICT_END, получен TokenType.ARRAY_END в 1:16",
+            "{ a -> << 1 2 >> }": "Ожидался TokenType.ARRAY_END, получен TokenType.NUMBER в 1:13",
+            "{ a -> 1. -> 2 }": "Ожидался идентификатор, получен TokenType.ARROW в 1:11",
+            "<< 1, >>": "Ожидалось значение, получен TokenType.ARRAY_END в 1:7",
+        }
+        for source, message in cases.items():
+            with self.subTest(source=source):
+                with self.assertRaises(SyntaxError) as context:
+                    self.parse_value(source)
+                self.assertEqual(str(context.exception), message)
+
+class TestReusableConverter(unittest.TestCase):
+    SOURCES = [f"x := {index + 1}; {{ key{index} -> ?(x). shared -> << ?(x), 2 >> }}" for index in range(40)]
+
+    def body(self, toml_output):
+        return toml_output.split('\n', 1)[1]
+
+    def test_no_state_between_calls(self):
+        """Тест: ключи и константы прошлых вызовов не сохраняются"""
+        for mode in ('tomlkit', 'fast'):
+            converter = ConfigConverter(mode=mode)
+            converter.convert_string("x := 1; { a -> ?(x) }")
+            with self.subTest(mode=mode):
+                self.assertNotIn('a = 1', converter.convert_string("{ b -> 2 }"))
+                with self.assertRaises(ValueError):
+                    converter.convert_string("{ c -> ?(x) }")
+
+    def test_convert_many(self):
+        """Тест пакетной конвертации строк"""
+        converter = ConfigConverter()
+        expected = [self.body(ConfigConverter().convert_string(source)) for source in self.SOURCES]
+        self.assertEqual([self.body(result) for result in converter.convert_many(self.SOURCES)], expected)
+        with self.assertRaises(ValueError) as context:
+            converter.convert_many(["{ a -> 1 }", "{ a -> }"])
+        self.assertIn('исходника 1', str(context.exception))
+
+    def test_threads(self):
+        """Тест одного конвертера в нескольких потоках"""
+        converter = ConfigConverter(mode='fast')
+        expected = [self.body(converter.convert_string(source)) for source in self.SOURCES]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(converter.convert_string, self.SOURCES * 5))
+        self.assertEqual([self.body(result) for result in results], expected * 5)
+
+class TestErrorRecovery(unittest.TestCase):
+    def parse(self, source, engine='char'):
+        lexer = Lexer(source, engine=engine, recover=True)
+        parser = Parser(lexer.iter_tokens(), recover=True, errors=lexer.errors)
+        nodes = parser.parse()
+        return nodes, [str(error) for error in parser.errors]
+
+    def test_all_errors_in_one_pass(self):
+        """Тест сбора всех синтаксических ошибок с позициями"""
+        source = "x := ;\ny := 2;\n{ a -> 1. b -> . c -> << 1, , 3 >>. d -> 4 }\nz := 3 w := 4;\n"
+        for engine in ('char', 'fast'):
+            with self.subTest(engine=engine):
+                nodes, errors = self.parse(source, engine)
+                self.assertEqual(errors, [
+                    "Ожидалось значение, получен TokenType.SEMICOLON в 1:6",
+                    "Ожидалось значение, получен TokenType.DOT в 3:16",
+                    "Ожидалось значение, получен TokenType.COMMA в 3:29",
+                    "Ожидался TokenType.SEMICOLON, получен TokenType.IDENTIFIER в 4:8",
+                ])
+                data = ConstantEvaluator().evaluate_all(nodes)
+                self.assertEqual(data, {'a': 1, 'c': [1, 3], 'd': 4})
+                self.assertEqual([node.name for node in nodes if isinstance(node, ConstDeclarationNode)],
+                                 ['y', 'z', 'w'])
+
+    def test_unclosed_containers(self):
+        """Тест синхронизации на '}' и '>>' внешнего контейнера и на ';'"""
+        nodes, errors = self.parse("{ a -> { b -> 1 c -> 2 }. d -> << 3, { e -> 4 >> }\n{ f -> 5 ;")
+        self.assertEqual(errors, [
+            "Ожидался TokenType.DICT_END, получен TokenType.IDENTIFIER в 1:17",
+            "Ожидался TokenType.DICT_END, получен TokenType.ARRAY_END в 1:47",
+            "Ожидался TokenType.DICT_END, получен TokenType.SEMICOLON в 2:10",
+        ])
+        evaluator = ConstantEvaluator()
+        self.assertEqual([evaluator.evaluate_node(node) for node in nodes],
+                         [{'a': {'b': 1}, 'd': [3, {'e': 4}]}, {'f': 5}])
+
+    def test_unknown_characters(self):
+        """Тест пропуска неизвестных символов лексером"""
+        for engine in ('char', 'fast'):
+            with self.subTest(engine=engine):
+                nodes, errors = self.parse("{ a -> 1 # . b -> 2 }", engine)
+                self.assertEqual(errors, ["Неизвестный символ: '#' в 1:10"])
+                self.assertEqual(len(nodes[0].entries), 2)
+
+    def test_valid_source_and_strict_mode(self):
+        """Тест: корректный текст разбирается без ошибок, строгий режим не меняется"""
+        source = "x := << 1, 2 >>; { a -> ?(x). b -> { c -> 3 } }"
+        nodes, errors = self.parse(source)
+        self.assertEqual(errors, [])
+        self.assertEqual(repr(nodes), repr(Parser(Lexer(source).tokenize()).parse()))
+        with self.assertRaises(SyntaxError):
+            Parser(Lexer("{ a -> . b -> 1 }").tokenize()).parse()
+        with self.assertRaises(SyntaxError):
+            Lexer("{ a -> # }").tokenize()
+
 if __name__ == '__main__':
     unittest.main()
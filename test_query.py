@@ -0,0 +1,125 @@
+import io
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from cli import main
+from converter import ConfigConverter, ConversionError
+from imports import ModuleCache
+from parallel import evaluate_serial
+from query import query
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'benchmarks'))
+from synth import generate
+
+def paths(value, prefix=()):
+    """Все пути ключей значения, включая промежуточные словари"""
+    for key, item in value.items():
+        yield prefix + (key,)
+        if isinstance(item, dict):
+            yield from paths(item, prefix + (key,))
+
+class TestQuery(unittest.TestCase):
+    SOURCE = ("x := { a -> 1. b -> << 2, 3 >> };\n"
+              "unused := ?(missing);\n"
+              "{ g -> { d -> { w -> 1920 }. e -> 5 }. k -> ?(x). ' комментарий . }\n"
+              "  n -> << { m -> 1 } >> }\n"
+              "7\n"
+              "{ k2 -> 1. g -> { e -> 6 } }")
+    
+    def test_same_values(self):
+        """Тест совпадения значений с полным вычислением"""
+        sources = [generate(size=10_000, depth=3, constants=20, fanout=2),
+                   generate(size=10_000, depth=2, constants=10, single=True)]
+        for source in sources:
+            data = evaluate_serial(source)
+            for path in paths(data):
+                with self.subTest(path=path):
+                    expected = data
+                    for key in path:
+                        expected = expected[key]
+                    self.assertEqual(query(source, '.'.join(path)), expected)
+    
+    def test_last_entry_wins(self):
+        """Тест перекрытия ключей, ссылок на константы и значения верхнего уровня"""
+        self.assertEqual(query(self.SOURCE, 'g'), {'e': 6})
+        self.assertEqual(query(self.SOURCE, 'k.a'), 1)
+        self.assertEqual(query(self.SOURCE, 'k.b'), [2, 3])
+        self.assertEqual(query(self.SOURCE, 'n'), [{'m': 1}])
+        self.assertEqual(query(self.SOURCE, '_result'), 7)
+        for key in ('g.d.w', 'zzz', 'k.c', 'n.m', 'k2.x'):
+            with self.subTest(key=key), self.assertRaises(KeyError):
+                query(self.SOURCE, key)
+        with self.assertRaises(ValueError):
+            query(self.SOURCE, 'g..e')
+    
+    def test_dict_before_declaration(self):
+        """Тест словарей верхнего уровня перед объявлениями и порядка вхождений по тексту"""
+        cases = [
+            ("{ a -> 1 } { a -> 2 } y := 1;", 'a'),
+            ("{ a -> { b -> 1 } } { a -> 5 } z := 3;", 'a'),
+            ("{ a -> { b -> 1 } } { a -> 5 } z := 3;", 'a.b'),
+            ("{ a -> 1 }\n{ a -> 2 } x := 1; { a -> ?(x) } y := { a -> 4 };", 'a'),
+            ("{ _result -> 1 } 5 { b -> 2 }", '_result'),
+            ("5\n{ _result -> { c -> 1 } } x := 1;", '_result.c'),
+            ("{ _result -> 1 } 5 x := 1; { _result -> 2 }", '_result'),
+            ("{ a -> 1.\n b -> 2 } 7 { a -> 3 } 8", '_result'),
+        ]
+        for source, key in cases:
+            with self.subTest(source=source, key=key):
+                expected = evaluate_serial(source)
+                for name in key.split('.'):
+                    expected = expected.get(name) if isinstance(expected, dict) else None
+                if expected is None:
+                    with self.assertRaises(KeyError):
+                        query(source, key)
+                else:
+                    self.assertEqual(query(source, key), expected)
+    
+    def test_only_needed_constants(self):
+        """Тест вычисления только нужных констант"""
+        source = "a := 1; b := << ?(a), ?(c) >>; c := ?(b); d := ?(nope);\n{ x -> ?(a). y -> ?(b). z -> ?(d) }"
+        self.assertEqual(query(source, 'x'), 1)
+        with self.assertRaisesRegex(RuntimeError, 'Циклическая зависимость констант'):
+            query(source, 'y')
+        with self.assertRaisesRegex(NameError, 'Неопределенная константа: nope'):
+            query(source, 'z')
+    
+    def test_errors(self):
+        """Тест синтаксических ошибок в найденной записи и в тексте со скобками без пары"""
+        with self.assertRaisesRegex(SyntaxError, 'в 3:17'):
+            query("x := 1;\n{ a -> 1.\n  b -> << 1, ?( >> }", 'b')
+        self.assertEqual(query("{ a -> 1.\n  b -> << 1, ?( >> }", 'a'), 1)
+        with self.assertRaises(SyntaxError):
+            query("{ a -> << 1 } >>", 'a')
+    
+    def test_get(self):
+        """Тест ConfigConverter.get, импортов и подкоманды get"""
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / 'base.conf').write_text('width := 1920;', encoding='utf-8')
+            path = root / 'a.conf'
+            path.write_text(f'import "base.conf";\n{self.SOURCE}\n{{ s -> {{ w -> ?(width) }} }}',
+                            encoding='utf-8')
+            modules = ModuleCache()
+            converter = ConfigConverter(engine='fast', modules=modules)
+            self.assertEqual(converter.get(path, 'g.e'), 6)
+            self.assertEqual(modules.misses, 0)
+            self.assertEqual(converter.get(path, 's.w'), 1920)
+            self.assertEqual(modules.misses, 1)
+            with self.assertRaisesRegex(ConversionError, '^Ошибка: ключ g.x не найден'):
+                converter.get(path, 'g.x')
+            
+            out = io.StringIO()
+            with redirect_stdout(out):
+                main(['get', str(path), 'k'])
+            self.assertEqual(out.getvalue(), 'a = 1\nb = [2, 3]\n')
+            out = io.StringIO()
+            with redirect_stdout(out):
+                main(['get', str(path), 'k.b'])
+            self.assertEqual(out.getvalue(), '[2, 3]\n')
+
+if __name__ == '__main__':
+    unittest.main()
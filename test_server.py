@@ -0,0 +1,86 @@
+import http.client
+import re
+import socket
+import threading
+import unittest
+from converter import ConfigConverter
+from server import ConversionServer
+
+class TestConversionServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ConversionServer(('127.0.0.1', 0), workers=1, options={'mode': 'fast'})
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def request(self, method, path, body=None):
+        connection = http.client.HTTPConnection(*self.server.server_address[:2], timeout=10)
+        try:
+            connection.request(method, path, body=body)
+            response = connection.getresponse()
+            return response.status, dict(response.getheaders()), response.read().decode('utf-8')
+        finally:
+            connection.close()
+    
+    def raw(self, data):
+        """Отправка байтов одним пакетом и чтение всех ответов до закрытия соединения сервером"""
+        with socket.create_connection(self.server.server_address[:2], timeout=10) as connection:
+            connection.sendall(data)
+            chunks = []
+            while True:
+                chunk = connection.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        text = b''.join(chunks).decode('utf-8')
+        return [int(status) for status in re.findall(r'^HTTP/1\.1 (\d+)', text, re.MULTILINE)], text
+    
+    def test_convert(self):
+        """Тест конвертации через POST /convert"""
+        source = "x := 5; { a -> ?(x). b -> << 1, 2 >> }"
+        status, headers, text = self.request('POST', '/convert', source.encode('utf-8'))
+        self.assertEqual(status, 200)
+        expected = ConfigConverter(mode='fast').convert_string(source)
+        self.assertEqual(text.split('\n', 1)[1], expected.split('\n', 1)[1])
+        self.assertRegex(headers['Server-Timing'],
+                         r'^queue;dur=[\d.]+, convert;dur=[\d.]+, total;dur=[\d.]+$')
+    
+    def test_errors(self):
+        """Тест ответов с ошибками"""
+        status, headers, text = self.request('POST', '/convert', "{ a -> ?(missing) }".encode('utf-8'))
+        self.assertEqual(status, 422)
+        self.assertIn('Ошибка имени', text)
+        self.assertIn('total;dur=', headers['Server-Timing'])
+        
+        # Путь импорта из тела запроса не читается
+        status, _, text = self.request('POST', '/convert', b'import "/etc/hostname";\n{ a -> 1 }')
+        self.assertEqual(status, 422)
+        self.assertIn('Ошибка импорта: Импорт недоступен без загрузчика', text)
+        
+        self.assertEqual(self.request('POST', '/other', b'')[0], 404)
+        
+        # Тело запроса по неизвестному пути не разбирается как следующий запрос
+        body = b'{ a -> 1 }'
+        statuses, _ = self.raw(
+            b'POST /other HTTP/1.1\r\nContent-Length: 10\r\n\r\n' + body +
+            b'POST /convert HTTP/1.1\r\nContent-Length: 10\r\n\r\n' + body +
+            b'GET /health HTTP/1.1\r\nConnection: close\r\n\r\n')
+        self.assertEqual(statuses, [404, 200, 200])
+        # Ошибка до чтения тела закрывает соединение; отрицательная длина — 400
+        for length, status in (('-5', 400), ('-1', 400), ('x', 411), (str(1 << 30), 413)):
+            with self.subTest(length=length):
+                statuses, text = self.raw(
+                    f'POST /convert HTTP/1.1\r\nContent-Length: {length}\r\n\r\n'.encode() + body +
+                    b'GET /health HTTP/1.1\r\n\r\n')
+                self.assertEqual(statuses, [status])
+                self.assertIn('Connection: close', text)
+        status, _, text = self.request('GET', '/health')
+        self.assertEqual((status, text), (200, 'ok\n'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import io
+import json
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from converter import ConfigConverter
+from stats import ConversionStats
+from test_cli import run_cli
+
+SOURCE = "base := 8000; ports := << ?(base), 2 >>; { a -> ?(base). b -> { c -> ?(ports). d -> ?(base) } }"
+
+class TestConversionStats(unittest.TestCase):
+    def test_stages_and_counters(self):
+        """Тест этапов, счетчиков токенов, узлов и обращений к константам"""
+        stats = ConversionStats()
+        converter = ConfigConverter(mode='fast')
+        result = converter.convert_source(SOURCE, stats=stats)
+        self.assertEqual(result.split('\n', 1)[1], converter.convert_source(SOURCE).split('\n', 1)[1])
+        self.assertEqual(list(stats.stages), ['lex', 'parse', 'evaluate', 'generate'])
+        self.assertTrue(all(stage.seconds >= 0 and stage.peak_bytes > 0 for stage in stats.stages.values()))
+        self.assertEqual(stats.tokens, 38)
+        self.assertEqual(stats.constants, 2)
+        self.assertEqual(stats.references, {'base': 3, 'ports': 1})
+        self.assertEqual(stats.nodes, 15)
+        report = stats.to_dict()
+        self.assertEqual(set(report), {'stages', 'total_seconds', 'tokens', 'nodes', 'constants', 'references'})
+        self.assertIn('Частые константы: base (3), ports (1)', stats.format())
+    
+    def test_file_without_memory(self):
+        """Тест конвертации файла без замера памяти и в обход кэша"""
+        class Recorder(ConversionStats):
+            def __init__(self):
+                super().__init__(memory=False)
+                self.order = []
+            
+            def record(self, name, seconds, peak_bytes):
+                self.order.append(name)
+                super().record(name, seconds, peak_bytes)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'app.conf'
+            path.write_text(SOURCE, encoding='utf-8')
+            stats = Recorder()
+            out = io.StringIO()
+            ConfigConverter(cache=object()).convert_to_stream(path, out, stats)
+        self.assertEqual(stats.order, ['read', 'lex', 'parse', 'evaluate', 'generate'])
+        self.assertTrue(all(stage.peak_bytes == 0 for stage in stats.stages.values()))
+        self.assertIn('d = 8000', out.getvalue())
+    
+    def test_tracing_already_enabled(self):
+        """Тест этапов при включенной снаружи трассировке, в том числе без reset_peak (Python < 3.9)"""
+        for reset_peak in (getattr(tracemalloc, 'reset_peak', tracemalloc.clear_traces),
+                           tracemalloc.clear_traces):
+            with self.subTest(reset_peak=reset_peak.__name__), \
+                    mock.patch('stats._reset_peak', reset_peak):
+                tracemalloc.start()
+                try:
+                    big = bytearray(4 << 20)
+                    del big
+                    stats = ConversionStats()
+                    ConfigConverter(mode='fast').convert_source(SOURCE, stats=stats)
+                    self.assertTrue(tracemalloc.is_tracing())
+                finally:
+                    tracemalloc.stop()
+                self.assertTrue(all(0 < stage.peak_bytes < 1 << 20 for stage in stats.stages.values()))
+    
+    def test_cli(self):
+        """Тест --stats и --stats-json"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'app.conf'
+            path.write_text(SOURCE, encoding='utf-8')
+            report = Path(tmp) / 'stats.json'
+            code, stderr, modules = run_cli('--no-cache', '--stats', '--stats-json', str(report), str(path))
+            self.assertEqual(code, 0)
+            self.assertIn('Токенов: 38', stderr)
+            self.assertEqual(json.loads(report.read_text(encoding='utf-8'))['references'], {'base': 3, 'ports': 1})
+            
+            code, _, modules = run_cli('--no-cache', str(path))
+            self.assertEqual(code, 0)
+            self.assertNotIn("'stats'", modules)
+            
+            code, stderr, _ = run_cli('--stats', tmp)
+            self.assertEqual(code, 2)
+
+if __name__ == '__main__':
+    unittest.main()
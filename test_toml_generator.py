@@ -0,0 +1,107 @@
+import unittest
+from array import array
+from toml_generator import TOMLGenerator
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+SAMPLES = [
+    {},
+    {'port': 8080, 'enabled': True, 'ratio': 0.5, 'name': 'server'},
+    {'server': {'host': 'localhost', 'ports': [80, 443], 'tls': {'enabled': False}}},
+    {'empty': {}, 'nested': {'only': {'tables': {'x': 1}}}, 'after': 2},
+    {'items': [{'name': 'a', 'value': 1}, {'name': 'b', 'value': 2}], 'matrix': [[1, 2], [], [3]]},
+    {'escapes': 'quote " backslash \\ newline \n tab \t bell \x07 del \x7f', 'юникод': 'значение'},
+    {'my key': 1, 'dotted.key': {'inner': 2}, 'packed': array('q', [1, 2, 3])},
+    {'floats': [1.0, -2.5, 1e16, float('inf')], 'big': 99999999999999999999},
+    {'_result': [1, 2], 'kept': 1},
+]
+
+@unittest.skipIf(tomllib is None, "нужен tomllib (Python 3.11+)")
+class TestFastGenerator(unittest.TestCase):
+    def test_matches_tomlkit(self):
+        """Тест совпадения быстрого режима с tomlkit после разбора tomllib"""
+        for data in SAMPLES:
+            with self.subTest(data=data):
+                fast = TOMLGenerator(mode='fast').generate(data)
+                reference = TOMLGenerator().generate(data)
+                self.assertEqual(tomllib.loads(fast), tomllib.loads(reference))
+
+    def test_nested_inline_tables(self):
+        """Тест вложенных встроенных таблиц, которые не поддерживает tomlkit"""
+        data = {'items': [{'name': 'a', 'meta': {'tags': ['x', 'y']}}]}
+        fast = TOMLGenerator(mode='fast').generate(data)
+        self.assertEqual(tomllib.loads(fast), data)
+
+    def test_deeply_nested_arrays(self):
+        """Тест глубоко вложенных массивов"""
+        value = [1]
+        for _ in range(5000):
+            value = [value]
+        fast = TOMLGenerator(mode='fast').generate({'deep': value})
+        self.assertTrue(fast.endswith('deep = ' + '[' * 5001 + '1' + ']' * 5001 + '\n'))
+
+    def test_layout(self):
+        """Тест раскладки: значения перед подтаблицами"""
+        data = {'a': {'b': {'c': 1}, 'x': 2}, 'y': 3}
+        fast = TOMLGenerator(mode='fast').generate(data)
+        body = fast.split('\n', 1)[1]
+        self.assertEqual(body, 'y = 3\n\n[a]\nx = 2\n\n[a.b]\nc = 1\n')
+
+    def test_unknown_mode(self):
+        """Тест неизвестного режима"""
+        with self.assertRaises(ValueError):
+            TOMLGenerator(mode='slow')
+
+class TestSharedValues(unittest.TestCase):
+    def body(self, mode, memoize, data):
+        return TOMLGenerator(mode=mode, memoize=memoize).generate(data).split('\n', 1)[1]
+    
+    def test_shared_values_convert_once(self):
+        """Тест однократной конвертации значения, на которое много ссылок"""
+        shared = [1, [2, 3], {'k': 4}]
+        packed = array('q', range(1, 100))
+        data = {'a': {'x': shared, 'p': packed}, 'b': {'x': shared, 'p': packed},
+                'c': [shared, shared], 'd': shared}
+        for mode in ('tomlkit', 'fast'):
+            with self.subTest(mode=mode):
+                self.assertEqual(self.body(mode, True, data), self.body(mode, False, data))
+        
+        generator = TOMLGenerator(mode='fast')
+        calls = []
+        convert = generator._shared
+        # Одна обертка на способ конвертации: memo различает способы
+        wrappers = {}
+        generator._shared = lambda value, func: convert(value, wrappers.setdefault(
+            func, lambda v: calls.append(v) or func(v)))
+        generator.generate(data)
+        self.assertEqual(len(calls), 3)
+    
+    @unittest.skipIf(tomllib is None, "нужен tomllib (Python 3.11+)")
+    def test_tables_inside_nested_arrays(self):
+        """Тест массивов из таблиц внутри массивов в режиме tomlkit"""
+        shared = [{'x': 20}]
+        cases = [
+            ({'q': [[{'x': 20}], {'y': 1}]}, 'q = [[{x = 20}], {y = 1}]\n'),
+            ({'q': [{}, [[{}]]]}, 'q = [{}, [[{}]]]\n'),
+            ({'t': shared, 'u': [shared, 2]}, 'u = [[{x = 20}], 2]\n\n[[t]]\nx = 20\n'),
+        ]
+        for data, expected in cases:
+            for memoize in (True, False):
+                with self.subTest(data=data, memoize=memoize):
+                    output = TOMLGenerator(memoize=memoize).generate(data)
+                    self.assertEqual(output.split('\n', 1)[1], expected)
+                    self.assertEqual(tomllib.loads(output), data)
+    
+    def test_memo_reset_between_calls(self):
+        """Тест: измененный между вызовами список конвертируется заново"""
+        value = [1, 2]
+        generator = TOMLGenerator(mode='fast')
+        generator.generate({'a': value})
+        value.append(3)
+        self.assertIn('a = [1, 2, 3]', generator.generate({'a': value}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from watcher import ConfigWatcher
+
+class TestConfigWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.a = self.root / 'a.conf'
+        self.b = self.root / 'b.conf'
+        self.a.write_text("{ a -> 1 }", encoding='utf-8')
+        self.b.write_text("{ b -> 2 }", encoding='utf-8')
+        self.watcher = ConfigWatcher([self.root], options={'mode': 'fast'})
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def bump_mtime(self, path):
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    
+    def converted(self):
+        return sorted(result.input_path.name for result in self.watcher.poll())
+    
+    def test_only_changed_files_are_reconverted(self):
+        """Тест переконвертации только изменившихся файлов"""
+        self.assertEqual(self.converted(), ['a.conf', 'b.conf'])
+        self.assertEqual(self.converted(), [])
+        
+        self.a.write_text("{ a -> 10 }", encoding='utf-8')
+        self.bump_mtime(self.a)
+        self.assertEqual(self.converted(), ['a.conf'])
+        self.assertIn('a = 10', (self.root / 'a.toml').read_text(encoding='utf-8'))
+    
+    def test_touch_without_changes_is_skipped(self):
+        """Тест: изменение mtime без изменения содержимого"""
+        self.converted()
+        self.bump_mtime(self.b)
+        self.assertEqual(self.converted(), [])
+    
+    def test_new_files_and_errors(self):
+        """Тест новых файлов и ошибок конвертации"""
+        self.converted()
+        (self.root / 'c.conf').write_text("{ c -> }", encoding='utf-8')
+        results = self.watcher.poll()
+        self.assertEqual([result.input_path.name for result in results], ['c.conf'])
+        self.assertIn('Синтаксическая ошибка', results[0].error)
+
+    def test_imported_file_changes(self):
+        """Тест переконвертации файла при изменении импортированного им файла"""
+        shared = self.root / 'shared'
+        shared.mkdir()
+        (shared / 'common.conf').write_text('base := 1;', encoding='utf-8')
+        (shared / 'extra.conf').write_text('import "common.conf";', encoding='utf-8')
+        self.a.write_text('import "shared/extra.conf";\n{ a -> ?(base) }', encoding='utf-8')
+        watcher = ConfigWatcher([self.a, self.b], options={'mode': 'fast'})
+        self.assertEqual(sorted(result.input_path.name for result in watcher.poll()), ['a.conf', 'b.conf'])
+        self.assertEqual(watcher.poll(), [])
+        
+        (shared / 'common.conf').write_text('base := 2;', encoding='utf-8')
+        self.bump_mtime(shared / 'common.conf')
+        self.assertEqual([result.input_path.name for result in watcher.poll()], ['a.conf'])
+        self.assertIn('a = 2', (self.root / 'a.toml').read_text(encoding='utf-8'))
+        self.assertEqual(watcher.poll(), [])
+        
+        # Удаленный импорт: ошибка, а затем переконвертация после его появления
+        os.rename(shared / 'common.conf', shared / 'moved.conf')
+        results = watcher.poll()
+        self.assertIn('Импортируемый файл не найден', results[0].error)
+        os.rename(shared / 'moved.conf', shared / 'common.conf')
+        self.assertTrue(watcher.poll()[0].ok)
+
+if __name__ == '__main__':
+    unittest.main()
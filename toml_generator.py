@@ -1,11 +1,115 @@
-import tomlkit
-from typing import Any, Dict
-from datetime import datetime
+import math
+import re
+from array import array
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, TextIO
+
+GENERATOR_MODES = ('tomlkit', 'fast')
+
+@lru_cache(maxsize=None)
+def _tomlkit():
+    """Модуль tomlkit, импортируемый при первом обращении
+    
+    Быстрый режим и проверка синтаксиса обходятся без него.
+    """
+    import tomlkit
+    return tomlkit
+
+_BARE_KEY = re.compile(r'[A-Za-z0-9_-]+')
+
+_ESCAPES = {'"': '\\"', '\\': '\\\\', '\b': '\\b', '\t': '\\t',
+            '\n': '\\n', '\f': '\\f', '\r': '\\r'}
+_NEEDS_ESCAPE = re.compile(r'["\\\x00-\x1f\x7f]')
+
+def _escape_char(match) -> str:
+    char = match.group()
+    return _ESCAPES.get(char) or f"\\u{ord(char):04x}"
+
+def _format_string(value: str) -> str:
+    """Базовая строка TOML в двойных кавычках"""
+    return '"' + _NEEDS_ESCAPE.sub(_escape_char, value) + '"'
+
+def _format_key(key: str) -> str:
+    """Ключ TOML: голый, если возможно, иначе в кавычках"""
+    return key if _BARE_KEY.fullmatch(key) else _format_string(key)
+
+def _format_scalar(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'nan'
+        if math.isinf(value):
+            return 'inf' if value > 0 else '-inf'
+        return repr(value)
+    if isinstance(value, str):
+        return _format_string(value)
+    return _format_string(str(value))
+
+def _format_inline(value: Any) -> str:
+    """Встроенное значение TOML (массивы и встроенные таблицы) без рекурсии"""
+    parts: List[str] = []
+    # Элементы стека: (True, готовый текст) или (False, значение)
+    stack = [(False, value)]
+    
+    while stack:
+        is_text, item = stack.pop()
+        if is_text:
+            parts.append(item)
+        elif isinstance(item, array):
+            parts.append('[' + ', '.join(map(str, item)) + ']')
+        elif isinstance(item, list):
+            pending = [(True, '[')]
+            for index, element in enumerate(item):
+                if index:
+                    pending.append((True, ', '))
+                pending.append((False, element))
+            pending.append((True, ']'))
+            stack.extend(reversed(pending))
+        elif isinstance(item, dict):
+            if not item:
+                parts.append('{}')
+                continue
+            pending = [(True, '{ ')]
+            for index, (key, element) in enumerate(item.items()):
+                if index:
+                    pending.append((True, ', '))
+                pending.append((True, _format_key(key) + ' = '))
+                pending.append((False, element))
+            pending.append((True, ' }'))
+            stack.extend(reversed(pending))
+        else:
+            parts.append(_format_scalar(item))
+    
+    return ''.join(parts)
+
+def generated_header() -> str:
+    """Текст комментария в начале каждого результата"""
+    from datetime import datetime
+    return f"Generated from custom config language on {datetime.now().isoformat()}"
 
 class TOMLGenerator:
-    def __init__(self):
-        self.doc = tomlkit.document()
-        self.doc.add(tomlkit.comment(f"Generated from custom config language on {datetime.now().isoformat()}"))
+    def __init__(self, mode: str = 'tomlkit', memoize: bool = True):
+        if mode not in GENERATOR_MODES:
+            raise ValueError(f"Неизвестный режим генератора: {mode}")
+        self.mode = mode
+        # Вычислитель отдает один и тот же объект для всех ссылок на константу,
+        # поэтому массивы конвертируются один раз на объект: (id, способ) -> (значение, результат).
+        # Значение хранится, чтобы id не переиспользовался до сброса
+        self.memoize = memoize
+        self._memo: Dict[Any, Any] = {}
+        self.header = generated_header()
+        self.doc = None
+        self.reset()
+    
+    def reset(self):
+        """Новый пустой документ tomlkit с заголовком"""
+        if self.mode == 'tomlkit':
+            tomlkit = _tomlkit()
+            self.doc = tomlkit.document()
+            self.doc.add(tomlkit.comment(self.header))
     
     def add_value(self, key: str, value: Any, parent=None):
         """Добавление значения в документ TOML"""
@@ -19,7 +123,7 @@ class TOMLGenerator:
             
             for i, part in enumerate(parts[:-1]):
                 if part not in current:
-                    current[part] = tomlkit.table()
+                    current[part] = _tomlkit().table()
                 current = current[part]
             
             self._set_value(current, parts[-1], value)
@@ -30,13 +134,16 @@ class TOMLGenerator:
         """Установка значения с правильным типом TOML"""
         if isinstance(value, dict):
             # Вложенная таблица
-            table = tomlkit.table()
+            table = _tomlkit().table()
             for sub_key, sub_value in value.items():
                 self._set_value(table, sub_key, sub_value)
             container[key] = table
-        elif isinstance(value, list):
-            # Массив
-            container[key] = self._convert_list(value)
+        elif isinstance(value, (list, array)):
+            if value and all(isinstance(item, dict) for item in value):
+                # Список таблиц под ключом tomlkit записывает массивом таблиц ([[...]])
+                container[key] = self._convert_list(value)
+            else:
+                container[key] = self._shared(value, self._convert_item)
         elif isinstance(value, bool):
             container[key] = value
         elif isinstance(value, int):
@@ -48,30 +155,155 @@ class TOMLGenerator:
         else:
             container[key] = str(value)
     
-    def _convert_list(self, lst: list) -> list:
+    def _convert_list(self, lst) -> list:
         """Конвертация списка с поддержкой вложенных структур"""
+        if isinstance(lst, array):
+            return lst.tolist()
+        
         result = []
         for item in lst:
             if isinstance(item, dict):
-                table = tomlkit.inline_table()
+                table = _tomlkit().inline_table()
                 for key, value in item.items():
                     self._set_value(table, key, value)
                 result.append(table)
-            elif isinstance(item, list):
-                result.append(self._convert_list(item))
+            elif isinstance(item, (list, array)):
+                result.append(self._shared(item, self._convert_item))
             else:
                 result.append(item)
         return result
     
+    def _convert_item(self, lst) -> Any:
+        """Массив tomlkit из списка
+        
+        Список из одних таблиц tomlkit.item превратил бы в массив таблиц,
+        который нельзя вложить в другой массив, поэтому он собирается
+        встроенным массивом явно.
+        """
+        converted = self._convert_list(lst)
+        if converted and all(isinstance(item, dict) for item in converted):
+            result = _tomlkit().array()
+            for table in converted:
+                result.append(table)
+            return result
+        return _tomlkit().item(converted)
+    
+    def _shared(self, value: Any, convert: Callable[[Any], Any]) -> Any:
+        """Результат convert(value), один на объект value в пределах одной генерации"""
+        if not self.memoize:
+            return convert(value)
+        # Один объект может конвертироваться по-разному (массив под ключом и внутри массива)
+        key = (id(value), convert)
+        cached = self._memo.get(key)
+        if cached is None:
+            cached = self._memo[key] = (value, convert(value))
+        return cached[1]
+    
     def generate(self, data: Dict[str, Any]) -> str:
         """Генерация TOML из словаря данных"""
+        self._memo.clear()
+        if self.mode == 'fast':
+            parts: List[str] = []
+            self.write_fast(data, parts.append)
+            return ''.join(parts)
+        
+        # Каждый вызов строит документ заново, без ключей прошлых вызовов
+        self.reset()
         for key, value in data.items():
             if key != '_result':  # Специальное поле для результатов
                 self.add_value(key, value)
         
-        return tomlkit.dumps(self.doc)
+        return _tomlkit().dumps(self.doc)
+    
+    def write(self, data: Dict[str, Any], fp: TextIO):
+        """Потоковая запись TOML в файловый объект
+        
+        Таблицы верхнего уровня сериализуются и записываются по одной,
+        так что в памяти одновременно находится текст только одной таблицы.
+        """
+        self._memo.clear()
+        if self.mode == 'fast':
+            self.write_fast(data, fp.write)
+            return
+        
+        self.reset()
+        tables = []
+        for key, value in data.items():
+            if key == '_result':  # Специальное поле для результатов
+                continue
+            if isinstance(value, dict) and '.' not in key:
+                tables.append((key, value))
+            else:
+                self.add_value(key, value)
+        fp.write(_tomlkit().dumps(self.doc))
+        
+        for key, value in tables:
+            table_doc = _tomlkit().document()
+            self._set_value(table_doc, key, value)
+            fp.write('\n' + _tomlkit().dumps(table_doc))
+    
+    def fragment(self, value: Any) -> str:
+        """Фрагмент TOML для одного значения: содержимое таблицы для словаря, иначе значение
+        
+        Словарь записывается как write_fast, но без строки заголовка.
+        """
+        if not isinstance(value, dict):
+            if isinstance(value, (list, array)):
+                return _format_inline(value) + '\n'
+            return _format_scalar(value) + '\n'
+        parts: List[str] = []
+        self.write_fast(value, parts.append)
+        return ''.join(parts[1:]).lstrip('\n')
     
     def generate_from_nodes(self, nodes, evaluator):
         """Генерация TOML непосредственно из AST узлов"""
         data = evaluator.evaluate_all(nodes)
         return self.generate(data)
+    
+    def write_fast(self, data: Dict[str, Any], write: Callable[[str], Any]):
+        """Прямая запись текста TOML без построения документа tomlkit
+        
+        Внутри каждой таблицы сначала пишутся значения, затем подтаблицы,
+        как это делает tomlkit. Таблицы обходятся с явным стеком.
+        """
+        self._memo.clear()
+        write(f"# {self.header}\n")
+        
+        stack = [((), self._expand_dotted_keys(data))]
+        while stack:
+            path, table = stack.pop()
+            subtables = []
+            lines = []
+            for key, value in table.items():
+                if isinstance(value, dict):
+                    subtables.append((path + (key,), value))
+                elif isinstance(value, (list, array)):
+                    lines.append(f"{_format_key(key)} = {self._shared(value, _format_inline)}\n")
+                else:
+                    lines.append(f"{_format_key(key)} = {_format_scalar(value)}\n")
+            
+            # Заголовок таблицы, содержащей только подтаблицы, не обязателен
+            if path and (lines or not subtables):
+                write(f"\n[{'.'.join(map(_format_key, path))}]\n")
+            if lines:
+                write(''.join(lines))
+            stack.extend(reversed(subtables))
+    
+    def _expand_dotted_keys(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Разворачивание ключей с точкой во вложенные таблицы, как в add_value"""
+        if not any('.' in key or key == '_result' for key in data):
+            return data
+        
+        result: Dict[str, Any] = {}
+        for key, value in data.items():
+            if key == '_result':  # Специальное поле для результатов
+                continue
+            parts = key.split('.')
+            current = result
+            for part in parts[:-1]:
+                child = current.get(part)
+                # Вложенные словари копируются, чтобы не менять входные данные
+                current[part] = child = dict(child) if isinstance(child, dict) else {}
+                current = child
+            current[parts[-1]] = value
+        return result
@@ -0,0 +1,85 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from batch import BatchResult, collect_jobs, convert_one
+from converter import ConfigConverter
+
+Signature = Optional[Tuple[int, int]]
+
+def _signature(path) -> Signature:
+    """(mtime_ns, размер) файла или None, если его нет"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class ConfigWatcher:
+    """Наблюдение за файлами *.conf опросом и переконвертация только изменившихся
+    
+    Изменение определяется по (mtime, размер), а затем подтверждается
+    хэшем содержимого: файл, который тронули без изменения текста, повторно
+    не конвертируется. Новые файлы в наблюдаемых каталогах подхватываются
+    при каждом опросе, удаленные — забываются. Файл с директивами import
+    переконвертируется и при изменении любого импортированного им файла
+    (по (mtime, размер)), в том числе появлении или удалении.
+    """
+    
+    def __init__(self, inputs: Iterable[Path], output_dir: Optional[Path] = None,
+                 options: Optional[Dict[str, Any]] = None, interval: float = 1.0):
+        self.inputs = [Path(path) for path in inputs]
+        self.output_dir = output_dir
+        self.options = options or {}
+        self.interval = interval
+        # Путь -> ((mtime_ns, размер), хэш содержимого, {импортированный файл: (mtime_ns, размер)})
+        # на момент последней конвертации
+        self._state: Dict[Path, Tuple[Tuple[int, int], str, Dict[str, Signature]]] = {}
+        self._converter = ConfigConverter(**self.options)
+    
+    def poll(self) -> List[BatchResult]:
+        """Один проход опроса; возвращает результаты выполненных переконвертаций"""
+        results = []
+        seen = set()
+        
+        for input_path, output_path in collect_jobs(self.inputs, self.output_dir):
+            seen.add(input_path)
+            signature = _signature(input_path)
+            if signature is None:
+                continue
+            
+            previous = self._state.get(input_path)
+            imports_changed = previous is not None and any(
+                _signature(path) != known for path, known in previous[2].items())
+            if previous is not None and previous[0] == signature and not imports_changed:
+                continue
+            
+            try:
+                with open(input_path, 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+            except FileNotFoundError:
+                continue
+            if previous is not None and previous[1] == digest and not imports_changed:
+                self._state[input_path] = (signature, digest, previous[2])
+                continue
+            
+            # Версии импортов снимаются до конвертации: изменение во время нее увидит следующий опрос
+            imports = {path: _signature(path) for path in self._converter.imported_files(input_path)}
+            self._state[input_path] = (signature, digest, imports)
+            results.append(convert_one(input_path, output_path, self.options))
+        
+        for path in list(self._state):
+            if path not in seen:
+                del self._state[path]
+        return results
+    
+    def run(self, report: Callable[[BatchResult], Any], stop: Optional[Callable[[], bool]] = None):
+        """Цикл опроса до KeyboardInterrupt или пока stop() не вернет True"""
+        try:
+            while stop is None or not stop():
+                for result in self.poll():
+                    report(result)
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass